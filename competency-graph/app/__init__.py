@@ -1,19 +1,61 @@
 from flask import Flask
 from pathlib import Path
+import multiprocessing
 
 from app.routes.job_routes import jobs_bp
 from app.routes.graph_routes import main_bp
+from app.routes.metrics_routes import metrics_bp
+from logic import cache_refresher, graph_snapshot, leadership
 
-def create_app():
+def create_app(config=None):
     """
         Create and configure the Flask application.
+
+        Unless GRAPH_SNAPSHOT is disabled in the config, a background thread
+        crawls the full graph once at startup and then every
+        GRAPH_SNAPSHOT_REFRESH_SEC seconds. The last snapshot is kept in
+        GRAPH_SNAPSHOT_FILE and served straight away on the next start. Unless CACHE_REFRESH is disabled,
+        another one revalidates RDF cache entries before they expire.
+
+        Only the process holding BACKGROUND_LOCK_FILE crawls and refreshes the
+        cache. Other workers on the same host load GRAPH_SNAPSHOT_FILE and
+        reload it whenever the leader replaces it. BACKGROUND_JOBS=False starts
+        no threads at all (e.g. the reloader parent of the development server),
+        and neither do multiprocessing children such as the parse workers.
     """
     base_dir = Path(__file__).resolve().parent.parent
     app = Flask(__name__,
                 template_folder=str(base_dir / "templates"),
                 static_folder=str(base_dir / "static"))
+    app.config.setdefault("GRAPH_SNAPSHOT", True)
+    app.config.setdefault("GRAPH_SNAPSHOT_REFRESH_SEC", graph_snapshot.SNAPSHOT_REFRESH_SEC)
+    app.config.setdefault("GRAPH_SNAPSHOT_FILE", graph_snapshot.SNAPSHOT_FILE)
+    app.config.setdefault("CACHE_REFRESH", True)
+    app.config.setdefault("CACHE_REFRESH_INTERVAL_SEC", cache_refresher.REFRESH_INTERVAL_SEC)
+    app.config.setdefault("BACKGROUND_JOBS", True)
+    app.config.setdefault("BACKGROUND_LOCK_FILE", leadership.LEADER_LOCK_FILE)
+    if config:
+        app.config.update(config)
 
     app.register_blueprint(main_bp)
     app.register_blueprint(jobs_bp)
+    app.register_blueprint(metrics_bp)
+
+    # spawn'itud parse-töötaja impordib run.py uuesti (__mp_main__): seal taustatöid ei alustata
+    in_mp_child = multiprocessing.parent_process() is not None
+    if app.config["BACKGROUND_JOBS"] and not in_mp_child and (app.config["GRAPH_SNAPSHOT"] or app.config["CACHE_REFRESH"]):
+        _start_background_jobs(app.config)
+
+    return app
 
-    return app
\ No newline at end of file
+def _start_background_jobs(config):
+    # gunicorn'i N töötajast kraabib ainult üks, teised loevad tema snapshot-faili
+    leader = leadership.acquire(config["BACKGROUND_LOCK_FILE"])
+    if config["GRAPH_SNAPSHOT"]:
+        if leader:
+            graph_snapshot.start_refresher(config["GRAPH_SNAPSHOT_REFRESH_SEC"], config["GRAPH_SNAPSHOT_FILE"])
+        else:
+            graph_snapshot.start_follower(config["GRAPH_SNAPSHOT_FILE"])
+    if config["CACHE_REFRESH"] and leader:
+        # diskcache on protsesside vahel jagatud: üks värskendaja piisab
+        cache_refresher.start_cache_refresher(config["CACHE_REFRESH_INTERVAL_SEC"])
@@ -1,11 +1,36 @@
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, Response, current_app, render_template, request, jsonify
 import asyncio
+import json
+import queue
+import threading
+import time
 
-from logic import graph_utils
-from logic.graph_utils import parse_all_data_async, get_all_data, SKILLS_URL, COMPETENCIES_URL, TEGEVUSNAITAJAD_URL, KNOBITID_URL, normalize_key
+from logic.graph_query import subgraph
+from logic.graph_snapshot import get_snapshot
+from logic.graph_utils import (MAX_DEPTH, CrawlOptions, crawl, crawl_registry, negative_report, normalize_key,
+                               parse_all_data_async)
+from logic.http_cache import PayloadCache, encodings, graph_etag
+from logic.metrics import REGISTRY
+from logic.relations import RELATION_TYPES
 
 main_bp = Blueprint("main", __name__)
 
+STREAM_BATCH = 500        # mitu node'i ühes NDJSON reas
+STREAM_FLUSH_SEC = 0.25   # kraapimise ajal saadetakse poolik rida vähemalt nii tihti
+
+GRAPH_REQUEST_SECONDS = REGISTRY.histogram("graph_request_seconds", "/graph response time by data source",
+                                           ("source",))
+GRAPH_PAYLOAD_SECONDS = REGISTRY.histogram("graph_payload_seconds", "Time spent building /graph nodes and edges")
+GRAPH_NODES_SERVED = REGISTRY.counter("graph_nodes_served_total", "Nodes returned by /graph")
+GRAPH_EDGES_SERVED = REGISTRY.counter("graph_edges_served_total", "Edges returned by /graph")
+SEARCH_SECONDS = REGISTRY.histogram("search_request_seconds", "/search response time")
+GRAPH_HTTP_CACHE = REGISTRY.counter("graph_http_cache_total", "/graph snapshot answers by cache result",
+                                    ("result",))
+GRAPH_PAYLOAD_CACHE_BYTES = REGISTRY.gauge("graph_payload_cache_bytes", "Bytes held by the /graph payload cache")
+
+# snapshot'ist vastatud /graph kehad (ka gzip/br variandid) ETag'i järgi
+GRAPH_PAYLOADS = PayloadCache()
+
 @main_bp.route("/")
 def index():
     return render_template("index.html")
@@ -14,31 +39,91 @@ def index():
 def get_graph_data():
     skill = request.args.get("skill", "").strip()
     limit_recursion = request.args.get("limit_recursion", "false").lower() == "true"
-    max_depth = int(request.args.get("max_depth", 9999999))
+    max_depth = int(request.args.get("max_depth", MAX_DEPTH))
+    relations = request.args.get("relations")
+    relations = [r.strip() for r in relations.split(",") if r.strip()] if relations else None
+    direction = request.args.get("direction") or None
+    stream = request.args.get("stream", "false").lower() in ("1", "true") or \
+        request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"]) == "application/x-ndjson"
 
-    graph_utils.LIMIT_RECURSION = limit_recursion
-    graph_utils.MAX_DEPTH = max_depth
+    options = CrawlOptions(limit_recursion=limit_recursion, max_depth=max_depth)
+    started = time.perf_counter()
 
     try:
-        if not skill:
-            skills = get_all_data(SKILLS_URL)
-            competencies = get_all_data(COMPETENCIES_URL)
-            tegevusnaitajad = get_all_data(TEGEVUSNAITAJAD_URL)
-            knobitid = get_all_data(KNOBITID_URL)
-
-            data_list = skills + competencies + tegevusnaitajad + knobitid
-            skills_set = {normalize_key(s) for s in skills}
-            competencies_set = {normalize_key(c) for c in competencies}
-            tn_set = {normalize_key(t) for t in tegevusnaitajad}
-            knobit_set = {normalize_key(k) for k in knobitid}
+        snapshot = get_snapshot()
+        if snapshot is not None and skill and normalize_key(skill) not in snapshot:
+            # uus/tundmatu oskus: kraabi nagu varem
+            snapshot = None
+
+        etag = None
+        mimetype = "application/x-ndjson" if stream else "application/json"
+        if snapshot is not None:
+            # vastus sõltub ainult snapshot'i versioonist ja parameetritest (ka NDJSON, mida brauser küsib)
+            etag = graph_etag(snapshot.version, normalize_key(skill) if skill else "", limit_recursion,
+                              max_depth if limit_recursion else None,
+                              tuple(sorted(relations)) if relations is not None else None, direction, stream)
+            cached = _cached_graph_response(etag, mimetype)
+            if cached is not None:
+                GRAPH_REQUEST_SECONDS.observe(time.perf_counter() - started, source="cache")
+                return cached
+
+        if snapshot is not None and skill:
+            # üksiku oskuse alamgraaf BFS-iga mälus olevast graafist
+            result = subgraph(snapshot.store, [normalize_key(skill)],
+                              depth=max_depth if limit_recursion else None,
+                              relations=relations, direction=direction)
+            data = {k: snapshot.data[k] for k in result.levels}
+            depths = result.levels
+            source = "subgraph"
+        elif snapshot is not None:
+            # täisgraaf tuleb mälus olevast snapshot'ist, mitte uuest kraapimisest
+            data, depths = snapshot.data, snapshot.depths
+            source = "snapshot"
+            if limit_recursion:
+                data = {k: v for k, v in data.items() if depths.get(k, 0) <= max_depth}
+
+        position = None
+        if snapshot is not None:
+            position = snapshot.position
+            skills_set = snapshot.skills_set
+            competencies_set = snapshot.competencies_set
+            tn_set = snapshot.tn_set
+            knobit_set = snapshot.knobit_set
+        elif not skill:
+            # kategooriad loetakse samal ajal, kui RDF-e juba laetakse
+            data, depths, members = crawl_registry(options=options)
+            source = "registry"
+            skills_set = members.get("oskus", set())
+            competencies_set = members.get("kompetents", set())
+            tn_set = members.get("tegevusnaitaja", set())
+            knobit_set = members.get("knobit", set())
         else:
             data_list = [normalize_key(skill)]
             skills_set = set()
             competencies_set = set()
             tn_set = set()
             knobit_set = set()
+            if stream:
+                # node'id lähevad brauserisse kohe, kui kraapija need valmis saab
+                return _ndjson_response(iter_graph_chunks(
+                    _live_crawl_items(data_list, options),
+                    skills_set, competencies_set, tn_set, knobit_set, relations))
+            data, depths = crawl(data_list, options)
+            source = "live"
 
-        data, depths = asyncio.run(parse_all_data_async(data_list))
+        if stream:
+            items = ((k, info, depths.get(k, -1)) for k, info in data.items())
+            chunks = iter_graph_chunks(items, skills_set, competencies_set, tn_set, knobit_set, relations,
+                                       position=position)
+            if etag is None:
+                return _ndjson_response(chunks)
+            # snapshot'i andmed on mälus: read serialiseeritakse üks kord ja hoitakse nagu JSON-keha
+            body = "".join(_ndjson_lines(chunks)).encode("utf-8")
+            response = _payload_response(*GRAPH_PAYLOADS.store(etag, body, _accepted_encoding()), etag,
+                                         mimetype=mimetype)
+            GRAPH_PAYLOAD_CACHE_BYTES.set(GRAPH_PAYLOADS.nbytes)
+            GRAPH_REQUEST_SECONDS.observe(time.perf_counter() - started, source=source)
+            return response
 
         if not data or all(
             len(info.get("subskills", [])) == 0 and
@@ -48,101 +133,234 @@ def get_graph_data():
         ):
             return jsonify({"error": "Oskust/kompetentsi ei leitud"}), 404
 
-        nodes, edges = [], []
-
-        for key, info in data.items():
-            label = info.get("label", key.replace("_", " "))
-            level = depths.get(key, -1)
-
-            if key in competencies_set:
-                node_label = f"Kompetents: {label}"
-                color = "#f4a261"  # oranž
-                node_type = "kompetents"
-            elif key in tn_set:
-                node_label = f"Tegevusnäitaja: {label}"
-                color = "#2a9d8f"  # roheline
-                node_type = "tegevusnaitaja"
-            elif key in knobit_set:
-                node_label = f"Knobit: {label}"
-                color = "#264653"  # lilla
-                node_type = "knobit"
-            elif key in skills_set:
-                node_label = f"Oskus: {label}"
-                color = "#457b9d"  # sinine
-                node_type = "oskus"
-            else:
-                node_label = f"Tundmatu: {label}"
-                color = "#8d99ae"  # hall
-                node_type = "muu"
-
-            nodes.append({
-                "id": key,
-                "label": node_label,
-                "description": info.get("description", ""),
-                "level": level,
-                "size": 10 + len(info.get("subskills", [])) * 1.5,
-                "link": info.get("link", ""),
-                "esco_link": info.get("esco_link", ""),
-                "esco_vaste": info.get("esco_vaste", ""),
-                "osk_reg_kood": info.get("osk_reg_kood", ""),
-                "skill_verb": info.get("skill_verb", ""),
-                "color": color,
-                "relevant_occupations": info.get("relevant_occupations", []),
-                "type": node_type,
-            })
-
-            # Edges (NB! targetid normaliseeri sama moodi nagu key)
-            for sub in info.get("subskills", []):
-                if sub in data:  # ainult kui target on data-s olemas
-                    edges.append({
-                        "from": sub,
-                        "to": key,
-                        "color": "#e76f51",
-                        "label": "koosneb",
-                        "dashes": True,
-                        "arrows": {"to": {"enabled": True, "type": "vee"}}
-                    })
-
-            # Prerequisites
-            for pre in info.get("prerequisites", []):
-                if pre in data:
-                    edges.append({
-                        "from": pre,
-                        "to": key,
-                        "color": "#00b4d8",
-                        "label": "eeldab"
-                    })
-
-            # Tegevusnäitajad
-            for tn in info.get("tegevusnaitajad", []):
-                if tn in data:
-                    edges.append({
-                        "from": tn,
-                        "to": key,
-                        "color": "#2a9d8f",
-                        "label": "sisaldab Tn"
-                    })
-
-            # Knobitid
-            for kn in info.get("knobitid", []):
-                if kn in data:
-                    edges.append({
-                        "from": kn,
-                        "to": key,
-                        "color": "#6a4c93",
-                        "label": "sisaldab knobitit"
-                    })
-
-            for tn_req in info.get("tn_eeldab", []):
-                if tn_req in data:
-                    edges.append({
-                        "from": tn_req,
-                        "to": key,
-                        "color": "#0077b6",
-                        "label": "Tn eeldab"
-                    })
-
-        return jsonify({"nodes": nodes, "edges": edges})
+        with GRAPH_PAYLOAD_SECONDS.time():
+            nodes, edges = build_graph_payload(data, depths, skills_set, competencies_set, tn_set, knobit_set,
+                                               relations=relations, position=position)
+        GRAPH_NODES_SERVED.inc(len(nodes))
+        GRAPH_EDGES_SERVED.inc(len(edges))
+        if etag is not None:
+            body = (current_app.json.dumps({"nodes": nodes, "edges": edges}) + "\n").encode("utf-8")
+            response = _payload_response(*GRAPH_PAYLOADS.store(etag, body, _accepted_encoding()), etag)
+            GRAPH_PAYLOAD_CACHE_BYTES.set(GRAPH_PAYLOADS.nbytes)
+        else:
+            response = jsonify({"nodes": nodes, "edges": edges})
+        GRAPH_REQUEST_SECONDS.observe(time.perf_counter() - started, source=source)
+        return response
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+def _accepted_encoding():
+    return request.accept_encodings.best_match(encodings())
+
+def _payload_response(body, encoding, etag, status=200, mimetype="application/json"):
+    response = Response(body, status=status, mimetype=mimetype)
+    response.set_etag(etag, weak=True)
+    # brauser võib vastust hoida, aga peab enne kasutamist ETag'iga üle küsima
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+def _cached_graph_response(etag, mimetype="application/json"):
+    """
+    304 when the client already holds `etag`, the stored body (in the best
+    encoding the client accepts) when the payload cache has it, else None.
+    """
+    if request.if_none_match.contains_weak(etag):
+        GRAPH_HTTP_CACHE.inc(result="not_modified")
+        return _payload_response(b"", None, etag, status=304)
+    cached = GRAPH_PAYLOADS.fetch(etag, _accepted_encoding())
+    if cached is None:
+        GRAPH_HTTP_CACHE.inc(result="miss")
+        return None
+    GRAPH_HTTP_CACHE.inc(result="hit")
+    GRAPH_PAYLOAD_CACHE_BYTES.set(GRAPH_PAYLOADS.nbytes)
+    return _payload_response(*cached, etag, mimetype=mimetype)
+
+@main_bp.route("/graph/broken")
+def get_broken_pages():
+    """
+    Pages the crawler currently skips (404, unparseable RDF, timeouts) with the
+    failure kind and when it was recorded.
+    """
+    return jsonify(negative_report())
+
+@main_bp.route("/search")
+def search_skills():
+    """
+    Ranked typeahead over the snapshot's node labels, descriptions, ESCO vaste
+    and osk_reg_kood, diacritic-insensitive and typo-tolerant. Returns a JSON
+    list of {value, text, type, score} (tom-select's default value/label fields).
+    """
+    query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", 20, type=int)
+    if not query:
+        return jsonify([])
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return jsonify({"error": "Graafi snapshot pole veel valmis"}), 503
+
+    with SEARCH_SECONDS.time():
+        hits = snapshot.search_index().search(query, limit=max(1, min(limit, 100)))
+    return jsonify([{"value": h["key"], "text": h["label"], "type": h["type"], "score": h["score"]}
+                    for h in hits])
+
+def _node_payload(key, info, level, skills_set, competencies_set, tn_set, knobit_set, position=None):
+    label = info.get("label", key.replace("_", " "))
+
+    if key in competencies_set:
+        node_label = f"Kompetents: {label}"
+        color = "#f4a261"  # oranž
+        node_type = "kompetents"
+    elif key in tn_set:
+        node_label = f"Tegevusnäitaja: {label}"
+        color = "#2a9d8f"  # roheline
+        node_type = "tegevusnaitaja"
+    elif key in knobit_set:
+        node_label = f"Knobit: {label}"
+        color = "#264653"  # lilla
+        node_type = "knobit"
+    elif key in skills_set:
+        node_label = f"Oskus: {label}"
+        color = "#457b9d"  # sinine
+        node_type = "oskus"
+    else:
+        node_label = f"Tundmatu: {label}"
+        color = "#8d99ae"  # hall
+        node_type = "muu"
+
+    node = {
+        "id": key,
+        "label": node_label,
+        "description": info.get("description", ""),
+        "level": level,
+        "size": 10 + len(info.get("subskills", [])) * 1.5,
+        "link": info.get("link", ""),
+        "esco_link": info.get("esco_link", ""),
+        "esco_vaste": info.get("esco_vaste", ""),
+        "osk_reg_kood": info.get("osk_reg_kood", ""),
+        "skill_verb": info.get("skill_verb", ""),
+        "color": color,
+        "relevant_occupations": info.get("relevant_occupations", []),
+        "type": node_type,
+    }
+
+    # serveris arvutatud paigutus (snapshot'ist), brauser ei pea füüsikat jooksutama
+    xy = position(key) if position is not None else None
+    if xy is not None:
+        node["x"], node["y"] = round(xy[0], 1), round(xy[1], 1)
+    return node
+
+def _edge_payloads(key, info, relations=None):
+    """
+    Yield (target, edge) for every relation listed on node `key`; the edge
+    points from the target to `key`. Colour and label come from the relation
+    registry (logic.relations).
+    """
+    # NB! targetid on normaliseeritud sama moodi nagu key
+    for rel in RELATION_TYPES:
+        if relations is not None and rel.field not in relations:
+            continue
+        for target in info.get(rel.field, ()):
+            yield target, rel.edge(key, target)
+
+def build_graph_payload(data, depths, skills_set, competencies_set, tn_set, knobit_set, relations=None,
+                        position=None):
+    """
+    Build vis-network nodes and edges from crawled graph data.
+    If `relations` is given, only edges of those relation fields are emitted.
+    `position(key)` returns precomputed (x, y) coordinates or None.
+    """
+    nodes, edges = [], []
+    relations = set(relations) if relations else None
+
+    for key, info in data.items():
+        nodes.append(_node_payload(key, info, depths.get(key, -1),
+                                   skills_set, competencies_set, tn_set, knobit_set, position))
+        for target, edge in _edge_payloads(key, info, relations):
+            if target in data:  # ainult kui target on data-s olemas
+                edges.append(edge)
+
+    return nodes, edges
+
+def iter_graph_chunks(items, skills_set, competencies_set, tn_set, knobit_set, relations=None,
+                      batch=STREAM_BATCH, position=None):
+    """
+    Turn (key, info, level) items into {"nodes", "edges"} chunks as they arrive.
+
+    An edge is sent once both of its ends have been sent; edges whose other end
+    never arrives are dropped, like in build_graph_payload. A None item flushes
+    the current partial chunk (used as a heartbeat while a crawl is running).
+    """
+    relations = set(relations) if relations else None
+    emitted, waiting = set(), {}
+    nodes, edges = [], []
+
+    for item in items:
+        if item is not None:
+            key, info, level = item
+            nodes.append(_node_payload(key, info, level, skills_set, competencies_set, tn_set, knobit_set,
+                                       position))
+            emitted.add(key)
+            for target, edge in _edge_payloads(key, info, relations):
+                if target in emitted:
+                    edges.append(edge)
+                else:
+                    waiting.setdefault(target, []).append(edge)
+            edges.extend(waiting.pop(key, ()))
+        if (nodes or edges) and (item is None or len(nodes) >= batch):
+            yield {"nodes": nodes, "edges": edges}
+            nodes, edges = [], []
+
+    if nodes or edges:
+        yield {"nodes": nodes, "edges": edges}
+
+def _live_crawl_items(data_list, options):
+    """
+    Run a crawl in a background thread and yield (key, info, level) for each node
+    as soon as it is parsed, or None every STREAM_FLUSH_SEC while waiting.
+    """
+    q = queue.Queue()
+    done = object()
+
+    def on_node(key, info, depth):
+        q.put((key, info, depth))
+
+    def run():
+        try:
+            asyncio.run(parse_all_data_async(data_list, options, on_node=on_node))
+        except Exception as e:
+            q.put(e)
+        finally:
+            q.put(done)
+
+    threading.Thread(target=run, name="graph-stream-crawl", daemon=True).start()
+    while True:
+        try:
+            item = q.get(timeout=STREAM_FLUSH_SEC)
+        except queue.Empty:
+            yield None
+            continue
+        if item is done:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+def _ndjson_lines(chunks):
+    sent = 0
+    try:
+        for chunk in chunks:
+            sent += len(chunk["nodes"])
+            yield json.dumps(chunk, ensure_ascii=False) + "\n"
+        if not sent:
+            yield json.dumps({"error": "Oskust/kompetentsi ei leitud"}) + "\n"
+    except Exception as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+
+def _ndjson_response(chunks):
+    return Response(_ndjson_lines(chunks), mimetype="application/x-ndjson")
@@ -1,8 +1,23 @@
 from flask import Blueprint, request, jsonify, render_template
-from logic.job_utils import load_jobs, save_jobs
+from logic.coverage import coverage_index
+from logic.graph_snapshot import get_snapshot
+from logic.job_utils import get_job_store, load_jobs
 
 jobs_bp = Blueprint("jobs", __name__)
 
+def _target_job_id(payload, store):
+    """
+    Job id from a request body with either "id" (stable) or "index" (list position).
+    Returns (job_id, error).
+    """
+    if payload.get("id") is not None:
+        job_id = payload["id"]
+        if not isinstance(job_id, int) or isinstance(job_id, bool):
+            return None, "Invalid id"
+        return job_id, None
+    job_id = store.id_at(payload.get("index"))
+    return job_id, None if job_id is not None else "Invalid index"
+
 @jobs_bp.route("/ametikohad")
 def job_list():
     """
@@ -22,21 +37,19 @@ def create_job():
         }
 
     Returns:
-        JSON: { "success": true }
+        JSON: { "success": true, "id": 5 }
     """
-    jobs = load_jobs()
-    jobs.append(request.json)
-    save_jobs(jobs)
-    return jsonify(success=True)
+    job_id = get_job_store().create(request.json)
+    return jsonify(success=True, id=job_id)
 
 @jobs_bp.route("/edit_job", methods=["POST"])
 def edit_job():
     """
-    Edit an existing job entry by index.
+    Edit an existing job entry by id (or by list index).
 
     Request JSON:
         {
-            "index": 0,
+            "id": 3,                 # või "index": 0
              "job": {
                   "name": "Updated Job Title",
                   "skills": ["newSkill"]
@@ -47,33 +60,109 @@ def edit_job():
         JSON: { "success": true } on success
                { "success": false, "error": "Invalid index" } on failure
     """
-    index = request.json.get("index")
-    updated = request.json.get("job")
-    jobs = load_jobs()
-    if 0 <= index < len(jobs):
-        jobs[index] = updated
-        save_jobs(jobs)
+    store = get_job_store()
+    job_id, error = _target_job_id(request.json, store)
+    if error is None and store.update(job_id, request.json.get("job")):
         return jsonify(success=True)
-    return jsonify(success=False, error="Invalid index")
+    return jsonify(success=False, error=error or "Invalid id")
 
 @jobs_bp.route("/delete_job", methods=["POST"])
 def delete_job():
     """
-    Delete a job entry by index.
+    Delete a job entry by id (or by list index).
 
     Request JSON:
         {
-            "index": 2
+            "id": 3                  # või "index": 2
         }
 
     Returns:
         JSON: { "success": true } on success
                { "success": false, "error": "Invalid index" } on failure
     """
-    index = request.json.get("index")
-    jobs = load_jobs()
-    if 0 <= index < len(jobs):
-        del jobs[index]
-        save_jobs(jobs)
+    store = get_job_store()
+    job_id, error = _target_job_id(request.json, store)
+    if error is None and store.delete(job_id):
         return jsonify(success=True)
-    return jsonify(success=False, error="Invalid index")
\ No newline at end of file
+    return jsonify(success=False, error=error or "Invalid id")
+
+def _coverage():
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return None
+    return coverage_index(snapshot, get_job_store())
+
+@jobs_bp.route("/jobs/match", methods=["GET", "POST"])
+def match_jobs():
+    """
+    Rank all jobs by how much of their required skills (including transitive
+    prerequisites, subskills and tegevusnäitajad) a candidate already covers.
+
+    Request:
+        GET  /jobs/match?skill=Oskus_A&skill=Oskus_B&limit=20&expand=true
+        POST { "skills": ["Oskus_A", "Oskus_B"], "limit": 20, "expand": true }
+
+    Returns:
+        JSON: { "skills": [...], "unresolved": [...],
+                "jobs": [{ "id", "name", "coverage", "required", "matched", "missing", "gap" }] }
+    """
+    if request.method == "POST":
+        payload = request.get_json(silent=True) or {}
+        skills = payload.get("skills") or []
+        limit = payload.get("limit", 20)
+        expand = bool(payload.get("expand", True))
+    else:
+        skills = request.args.getlist("skill")
+        limit = request.args.get("limit", 20, type=int)
+        expand = request.args.get("expand", "true").lower() in ("1", "true")
+    if not isinstance(skills, list) or not isinstance(limit, int) or limit < 1:
+        return jsonify({"error": "Vigane päring"}), 400
+
+    index = _coverage()
+    if index is None:
+        return jsonify({"error": "Graafi snapshot pole veel valmis"}), 503
+    return jsonify(index.rank(skills, expand=expand, limit=limit))
+
+@jobs_bp.route("/jobs/<int:job_id>/requirements")
+def job_requirements(job_id):
+    """
+    Full set of skills a job requires after following its skills' requirements.
+
+    Returns:
+        JSON: { "id", "name", "required": [...], "unresolved": [...] }
+    """
+    index = _coverage()
+    if index is None:
+        return jsonify({"error": "Graafi snapshot pole veel valmis"}), 503
+    result = index.requirements(job_id)
+    if result is None:
+        return jsonify({"error": "Ametit ei leitud"}), 404
+    return jsonify(result)
+
+@jobs_bp.route("/skills/lookup")
+def lookup_skill():
+    """
+    Jobs and relevant occupations that need a skill (by key or label).
+
+    Request:
+        GET /skills/lookup?skill=Analüütiline_mõtlemine
+
+    Returns:
+        JSON: { "skill": "Analüütiline_mõtlemine", "jobs": [{ "id", "name" }],
+                "occupations": [{ "uri", "label" }] }
+    """
+    skill = request.args.get("skill", "").strip()
+    if not skill:
+        return jsonify({"error": "Parameeter 'skill' puudub"}), 400
+
+    snapshot = get_snapshot()
+    key, aliases, occupations = None, {skill}, []
+    if snapshot is not None:
+        key = snapshot.occupations.resolve(skill)
+        aliases = snapshot.occupations.aliases(skill)
+        occupations = snapshot.occupations.occupations(skill)
+    return jsonify({
+        "skill": key or skill,
+        "jobs": get_job_store().lookup_skill(*aliases),
+        "occupations": occupations,
+    })
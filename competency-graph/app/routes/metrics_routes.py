@@ -0,0 +1,12 @@
+from flask import Blueprint, Response
+
+from logic.metrics import REGISTRY
+
+metrics_bp = Blueprint("metrics", __name__)
+
+@metrics_bp.route("/metrics")
+def metrics():
+    """
+    Crawl, cache and /graph metrics in the Prometheus text format.
+    """
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
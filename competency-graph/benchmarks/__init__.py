@@ -0,0 +1,7 @@
+"""
+Offline benchmarks: a local stub of the oppekava.edu.ee registry serving
+synthetic Special:ExportRDF pages and category listings, and a runner that
+measures crawl throughput, parse time, peak memory and /graph latency.
+
+    python -m benchmarks.run --sizes 1000 10000 100000 --fanout 3 --latency-ms 20
+"""
@@ -0,0 +1,66 @@
+"""
+Cold import time of the web app, i.e. what every gunicorn worker pays on start.
+
+    python -m benchmarks.imports --module app --repeat 5
+
+Each sample is a fresh interpreter that imports the module once. Reports the
+median import time and which heavy libraries the import pulled in; the web
+app should load none of HEAVY_MODULES until a crawl or export needs them.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# teegid, mida rakenduse käivitus ei tohi laadida (kraapija/ekspordi teed laadivad ise)
+HEAVY_MODULES = ("aiohttp", "requests", "bs4", "rdflib", "IPython", "pyvis", "networkx")
+IMPORT_BUDGET_MS = 1000
+
+ROOT = Path(__file__).resolve().parent.parent
+_PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = (time.perf_counter() - started) * 1000\n"
+    "print(json.dumps({{'ms': elapsed, 'modules': sorted(sys.modules)}}))\n"
+)
+
+
+def measure_import(module="app", repeat=3):
+    """
+    Import `module` in `repeat` fresh interpreters. Returns median/min ms and
+    the HEAVY_MODULES that were loaded.
+    """
+    samples, loaded = [], set()
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)],
+                              cwd=ROOT, capture_output=True, text=True, check=True)
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        modules = set(result["modules"])
+        loaded |= {m for m in HEAVY_MODULES if m in modules}
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1),
+        "heavy_loaded": sorted(loaded),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    result = measure_import(args.module, args.repeat)
+    print(json.dumps(result))
+    # nullist erinev väljumiskood, kui eelarve on ületatud või mõni raske teek laaditi
+    return 0 if result["median_ms"] <= args.budget_ms and not result["heavy_loaded"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Crawl and /graph benchmarks against a local stub registry.
+
+    python -m benchmarks.run --sizes 1000 10000 100000 --fanout 3 --latency-ms 20
+
+Every size runs in its own subprocess (so peak RSS is per size) and reports:
+- cold crawl: pages/sec, parse ms/page (measured in the parse worker) and
+  parse-queue wait ms/page with an empty disk cache,
+- warm crawl: pages/sec when every page is served from the cache,
+- snapshot build and layout time,
+- end-to-end /graph latency (full JSON, one skill's subgraph, NDJSON stream)
+  through the Flask test client, median of --repeat requests,
+- peak RSS of the benchmark process itself ("main") and of the largest
+  parse worker ("workers"); the workers are separate processes, so the main
+  figure alone misses the memory used by parsing.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from unittest import mock
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.stub_server import StubRegistryServer
+from benchmarks.synthetic import SyntheticRegistry
+from logic import graph_snapshot
+from logic import graph_utils as gu
+from logic.rate_control import AdaptiveLimiter
+from logic.rdf_cache import RdfCache
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+BENCH_RATE = 5000          # stub'i vastu ei ole mõtet piirata, mõõdame kraapijat
+BENCH_CONCURRENCY = 64
+
+
+def peak_rss_mb(who="self"):
+    """
+    Peak RSS in MB of this process (`who="self"`) or of the largest child that
+    has already exited and been waited for (`who="children"`).
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN if who == "children" else resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KiB, macOS: baidid
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _crawl_stats(category_urls, requests_before, server):
+    started = time.perf_counter()
+    data, depths, members = asyncio.run(gu.crawl_registry_async(category_urls))
+    elapsed = time.perf_counter() - started
+    summary = gu.last_crawl_summary() or {}
+    counts, seconds = summary.get("counts", {}), summary.get("seconds", {})
+    parsed = counts.get("parsed", 0)
+    stats = {
+        "sec": round(elapsed, 3),
+        "nodes": len(data),
+        "pages_per_sec": round(len(data) / elapsed, 1) if elapsed else None,
+        "http_requests": sum(server.requests.values()) - requests_before,
+        "parsed": parsed,
+        "parse_ms_per_page": round(1000 * seconds.get("parse_sec", 0.0) / parsed, 3) if parsed else None,
+        "parse_wait_ms_per_page": round(1000 * seconds.get("parse_wait_sec", 0.0) / parsed, 3) if parsed else None,
+        "record_cache_hits": counts.get("record_cache_hits", 0),
+    }
+    return stats, (data, depths, members)
+
+
+def _time_requests(client, url, repeat):
+    timings, status, size = [], None, 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        resp = client.get(url)
+        body = resp.get_data()
+        timings.append(time.perf_counter() - started)
+        status, size = resp.status_code, len(body)
+    return {"status": status, "bytes": size, "median_ms": round(1000 * statistics.median(timings), 2),
+            "max_ms": round(1000 * max(timings), 2)}
+
+
+def run_size(size, fanout=3, latency_ms=0.0, jitter_ms=0.0, dangling=0.0, repeat=5,
+             rate=BENCH_RATE, concurrency=BENCH_CONCURRENCY, seed=0):
+    """
+    One benchmark run in this process. Returns a dict of results.
+    """
+    from app import create_app  # Flask alles siin, et --help oleks kiire
+
+    registry = SyntheticRegistry(size, fanout=fanout, dangling=dangling, seed=seed)
+    result = {"size": size, "fanout": fanout, "latency_ms": latency_ms, "dangling": dangling,
+              "edges": registry.edge_count()}
+
+    with ExitStack() as stack:
+        server = stack.enter_context(StubRegistryServer(registry, latency_ms=latency_ms, jitter_ms=jitter_ms))
+        tmp = stack.enter_context(tempfile.TemporaryDirectory())
+        cache = RdfCache(tmp)
+        stack.callback(cache.close)
+        stack.enter_context(mock.patch.multiple(
+            gu,
+            BASE_RDF=server.rdf_base(),
+            CACHE=cache,
+            LIMITER=AdaptiveLimiter(rate=rate, concurrency=concurrency, max_rate=rate,
+                                    max_concurrency=concurrency),
+            MAX_CONCURRENCY=concurrency,
+            CRAWL_SUMMARY=False,
+        ))
+        category_urls = server.category_urls()
+
+        result["cold"], _ = _crawl_stats(category_urls, 0, server)
+        result["warm"], (data, depths, members) = _crawl_stats(
+            category_urls, sum(server.requests.values()), server)
+
+        started = time.perf_counter()
+        snapshot = graph_snapshot.GraphSnapshot(
+            data, depths, members.get("oskus", ()), members.get("kompetents", ()),
+            members.get("tegevusnaitaja", ()), members.get("knobit", ()))
+        result["snapshot_sec"] = round(time.perf_counter() - started, 3)
+        started = time.perf_counter()
+        snapshot.layout()
+        result["layout_sec"] = round(time.perf_counter() - started, 3)
+
+        previous = graph_snapshot.get_snapshot()
+        graph_snapshot.publish_snapshot(snapshot)
+        stack.callback(graph_snapshot.publish_snapshot, previous)
+        client = create_app({"GRAPH_SNAPSHOT": False, "CACHE_REFRESH": False}).test_client()
+        skill = registry.members["kompetents"][0]
+        result["graph"] = {
+            "full": _time_requests(client, "/graph", repeat),
+            "skill": _time_requests(client, f"/graph?skill={skill}", repeat),
+            "stream": _time_requests(client, "/graph?stream=true", repeat),
+        }
+
+    # RUSAGE_CHILDREN näeb ainult lõpetatud ja ära oodatud töötajaid: sulge parse-pool enne mõõtmist
+    gu.shutdown_parse_executor()
+    result["peak_rss_mb"] = {"main": peak_rss_mb("self"), "workers": peak_rss_mb("children")}
+    return result
+
+
+def _print_table(results):
+    header = ("size", "cold p/s", "parse ms", "wait ms", "warm p/s", "layout s", "/graph ms", "skill ms", "stream ms", "main RSS MB", "worker RSS MB")
+    print(" ".join(f"{h:>10}" for h in header))
+    for r in results:
+        row = (r["size"], r["cold"]["pages_per_sec"], r["cold"]["parse_ms_per_page"],
+               r["cold"]["parse_wait_ms_per_page"], r["warm"]["pages_per_sec"],
+               r["layout_sec"], r["graph"]["full"]["median_ms"], r["graph"]["skill"]["median_ms"],
+               r["graph"]["stream"]["median_ms"], r["peak_rss_mb"]["main"], r["peak_rss_mb"]["workers"])
+        print(" ".join(f"{'-' if v is None else v:>10}" for v in row))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--dangling", type=float, default=0.0, help="share of links to missing pages")
+    parser.add_argument("--repeat", type=int, default=5, help="requests per /graph measurement")
+    parser.add_argument("--rate", type=float, default=BENCH_RATE, help="limiter req/s against the stub")
+    parser.add_argument("--concurrency", type=int, default=BENCH_CONCURRENCY)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per size")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    options = dict(fanout=args.fanout, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                   dangling=args.dangling, repeat=args.repeat, rate=args.rate, concurrency=args.concurrency)
+
+    if args.single:
+        # alamprotsess: üks suurus, tulemus stdout'i viimasele reale
+        print(json.dumps(run_size(args.sizes[0], **options)))
+        return 0
+
+    results = []
+    for size in args.sizes:
+        cmd = [sys.executable, "-m", "benchmarks.run", "--single", "--sizes", str(size),
+               "--fanout", str(args.fanout), "--latency-ms", str(args.latency_ms),
+               "--jitter-ms", str(args.jitter_ms), "--dangling", str(args.dangling),
+               "--repeat", str(args.repeat), "--rate", str(args.rate), "--concurrency", str(args.concurrency)]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            return proc.returncode
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(result)
+        if args.json:
+            print(json.dumps(result), flush=True)
+
+    if not args.json:
+        _print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Local aiohttp stand-in for oppekava.edu.ee.
+
+Serves `/a/Special:ExportRDF/<page>` from a SyntheticRegistry and
+`/a/Kategooria:Haridus:<Kategooria>` listings paginated like MediaWiki (links
+to `/a/<page>` plus a `pagefrom=` link to the next page). Runs its own event
+loop in a background thread so the crawler under test can use asyncio.run.
+"""
+import asyncio
+import random
+import socket
+import threading
+from collections import Counter
+from html import escape
+
+from aiohttp import web
+
+from logic import graph_utils
+
+# registri kategooria-URL-i lõpp -> SyntheticRegistry.members võti
+CATEGORY_PATHS = {url.rsplit("/", 1)[-1]: name for name, url in graph_utils.CATEGORY_URLS.items()}
+
+
+class StubRegistryServer:
+    """
+    Start with `start()` (returns the base URL) and stop with `stop()`, or use
+    as a context manager. `requests` counts served requests by kind.
+    `category_faults` maps a listing offset (`pagefrom`) to HTTP statuses that
+    the next requests for that page get instead of the listing, in order.
+    """
+
+    def __init__(self, registry, latency_ms=0.0, jitter_ms=0.0, page_size=200, seed=0):
+        self.registry = registry
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.page_size = page_size
+        self.requests = Counter()
+        self.category_faults = {}
+        self._rng = random.Random(seed)
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self.base_url = None
+
+    # --- handlers ---
+    async def _delay(self):
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._rng.uniform(0, self.jitter))
+
+    async def _rdf(self, request):
+        await self._delay()
+        body = self.registry.render(request.match_info["page"])
+        if body is None:
+            self.requests["missing"] += 1
+            raise web.HTTPNotFound()
+        self.requests["rdf"] += 1
+        return web.Response(body=body, content_type="application/rdf+xml")
+
+    async def _category(self, request):
+        await self._delay()
+        name = CATEGORY_PATHS.get(request.match_info["category"])
+        if name is None:
+            raise web.HTTPNotFound()
+        start = int(request.query.get("pagefrom", 0))
+        faults = self.category_faults.get(start)
+        if faults:
+            self.requests["category_fault"] += 1
+            return web.Response(status=faults.pop(0), headers={"Retry-After": "0"})
+        self.requests["category"] += 1
+        keys = self.registry.members.get(name, [])
+        page = keys[start:start + self.page_size]
+        links = [f'<li><a href="/a/{escape(k)}">{escape(k.replace("_", " "))}</a></li>' for k in page]
+        if start + self.page_size < len(keys):
+            links.append(f'<a href="{request.path}?pagefrom={start + self.page_size}#mw-pages">'
+                         f"järgmine lehekülg</a>")
+        html = "<html><body><ul>" + "".join(links) + "</ul></body></html>"
+        return web.Response(text=html, content_type="text/html")
+
+    # --- lifecycle ---
+    def start(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+
+        app = web.Application()
+        app.router.add_get("/a/Special:ExportRDF/{page}", self._rdf)
+        app.router.add_get("/a/{category:Kategooria:Haridus:[^/]+}", self._category)
+
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._runner = web.AppRunner(app, access_log=None)
+            self._loop.run_until_complete(self._runner.setup())
+            self._loop.run_until_complete(web.TCPSite(self._runner, "127.0.0.1", port).start())
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="stub-registry", daemon=True)
+        self._thread.start()
+        ready.wait()
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # --- crawler wiring ---
+    def category_urls(self):
+        return {name: f"{self.base_url}/a/{path}" for path, name in CATEGORY_PATHS.items()}
+
+    def rdf_base(self):
+        return f"{self.base_url}/a/Special:ExportRDF/"
@@ -0,0 +1,134 @@
+"""
+Synthetic competency registries rendered as SMW Special:ExportRDF pages.
+
+Node kinds follow the real registry (kompetents, oskus, tegevusnäitaja,
+knobit) and edges use the real predicate URIs, so the crawler parses the
+pages exactly like live ones. Pages are rendered on request; only the
+adjacency lists are kept in memory.
+"""
+import random
+from xml.sax.saxutils import escape
+
+from logic import graph_utils as gu
+
+WIKI = "http://oppekava.edu.ee/a/Special:URIResolver/"
+PROPERTY = WIKI + "Property-3A"
+
+# (kategooria nimi, nime prefiks, osakaal)
+KINDS = (
+    ("kompetents", "Kompetents", 0.10),
+    ("oskus", "Oskus", 0.60),
+    ("tegevusnaitaja", "Tn", 0.20),
+    ("knobit", "Knobit", 0.10),
+)
+
+_HEADER = """<?xml version="1.0" encoding="UTF-8" ?>
+<!DOCTYPE rdf:RDF[
+  <!ENTITY rdf 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'>
+  <!ENTITY rdfs 'http://www.w3.org/2000/01/rdf-schema#'>
+  <!ENTITY swivt 'http://semantic-mediawiki.org/swivt/1.0#'>
+  <!ENTITY wiki '{wiki}'>
+  <!ENTITY property '{prop}'>
+]>
+<rdf:RDF xmlns:rdf="&rdf;" xmlns:rdfs="&rdfs;" xmlns:swivt="&swivt;"
+         xmlns:property="&property;" xmlns:schema="https://schema.org/"
+         xmlns:edu="https://schema.edu.ee/">
+""".format(wiki=WIKI, prop=PROPERTY)
+
+
+def _prop(uri):
+    # property:Haridus-3AosaOskus kujul QName
+    return "property:" + str(uri)[len(PROPERTY):]
+
+
+class SyntheticRegistry:
+    """
+    `n` pages split over the four categories. Every kompetents and oskus lists
+    about `fanout` sub-skills (always later oskused, so the osaOskus graph is a
+    DAG) and half as many prerequisites; competencies and tegevusnäitajad link
+    to tegevusnäitajad and knobitid. A `dangling` share of links points to
+    pages that do not exist (the stub answers 404).
+    """
+
+    def __init__(self, n, fanout=3, dangling=0.0, seed=0):
+        self.n = n
+        self.fanout = fanout
+        rng = random.Random(seed)
+
+        self.members = {}
+        start = 0
+        for i, (name, prefix, share) in enumerate(KINDS):
+            count = n - start if i == len(KINDS) - 1 else max(1, int(n * share))
+            self.members[name] = [f"{prefix}_{j:06d}" for j in range(count)]
+            start += count
+        self.pages = {key for keys in self.members.values() for key in keys}
+
+        oskus = self.members["oskus"]
+        tn = self.members["tegevusnaitaja"]
+        knobit = self.members["knobit"]
+
+        def pick(pool, k, after=None):
+            # indeksid range'ist, et saba ei kopeeritaks iga võtme jaoks (O(n²))
+            indices = range(after + 1 if after is not None else 0, len(pool))
+            if not indices:
+                return []
+            picked = [pool[i] for i in rng.sample(indices, min(k, len(indices)))]
+            return [f"Puuduv_{rng.randrange(n)}" if rng.random() < dangling else p for p in picked]
+
+        # out[key] = {predikaat: [naabrid]}
+        self.out = {}
+        for key in self.members["kompetents"]:
+            self.out[key] = {
+                gu.OSAOSKUS: pick(oskus, fanout),
+                gu.KOMP_SISALDAB_TN: pick(tn, fanout),
+            }
+        for idx, key in enumerate(oskus):
+            self.out[key] = {
+                gu.OSAOSKUS: pick(oskus, fanout, after=idx),
+                gu.SEOTUD_OSKUS: pick(oskus, max(1, fanout // 2), after=idx),
+            }
+        for idx, key in enumerate(tn):
+            self.out[key] = {
+                gu.TN_SISALDAB_KNOBITIT: pick(knobit, fanout),
+                gu.TN_EELDAB: pick(tn, 1, after=idx),
+            }
+        for key in knobit:
+            self.out[key] = {}
+
+        # SMW ekspordis on ka sissetulevad osaOskus/eeldusOskus seosed
+        self.into = {}
+        for key, rels in self.out.items():
+            for pred in gu.IN_RELATIONS:
+                for target in rels.get(pred, ()):
+                    self.into.setdefault(target, {}).setdefault(pred, []).append(key)
+
+    def __len__(self):
+        return self.n
+
+    def edge_count(self):
+        return sum(len(v) for rels in self.out.values() for v in rels.values())
+
+    def render(self, key):
+        """
+        RDF/XML page for `key`, or None if the page does not exist.
+        """
+        if key not in self.pages:
+            return None
+        label = key.replace("_", " ")
+        parts = [_HEADER, f'  <swivt:Subject rdf:about="&wiki;{key}">\n',
+                 f"    <schema:name>{escape(label)}</schema:name>\n",
+                 f"    <rdfs:label>{escape(label)}</rdfs:label>\n",
+                 f"    <schema:description>Sünteetiline kirje {escape(label)}</schema:description>\n",
+                 f'    <{_prop(gu.OSK_REG_KOOD)} rdf:datatype="http://www.w3.org/2001/XMLSchema#string">'
+                 f"{key[-6:]}</{_prop(gu.OSK_REG_KOOD)}>\n"]
+        for pred, targets in self.out[key].items():
+            for target in targets:
+                parts.append(f'    <{_prop(pred)} rdf:resource="&wiki;{target}"/>\n')
+        parts.append("  </swivt:Subject>\n")
+        for pred, sources in self.into.get(key, {}).items():
+            for source in sources:
+                parts.append(f'  <swivt:Subject rdf:about="&wiki;{source}">\n'
+                             f'    <{_prop(pred)} rdf:resource="&wiki;{key}"/>\n'
+                             f"  </swivt:Subject>\n")
+        parts.append("</rdf:RDF>\n")
+        return "".join(parts).encode("utf-8")
@@ -0,0 +1,117 @@
+"""
+Background refresh of the RDF disk cache.
+
+Blob freshness is stored per entry (`fresh_until` in the rdf_meta record, with
+jitter so one big crawl does not expire all at once). A daemon thread wakes up
+every REFRESH_INTERVAL_SEC, picks the entries that expire soonest (within
+REFRESH_AHEAD_SEC) and revalidates them at a low rate: at most REFRESH_PER_SEC
+of its own, and every request still goes through the crawler's shared adaptive
+LIMITER. A 304 just extends the entry; a 200 replaces the blob and the parsed
+record, so user-facing crawls keep finding warm entries.
+
+Pages that are gone (404/410) lose their blob and meta. Pages in the negative
+cache are skipped, and any other failed refresh moves `fresh_until` forward by
+about REFRESH_RETRY_SEC. Dead pages therefore cannot fill every batch.
+"""
+import asyncio
+import heapq
+import random
+import threading
+import time
+
+from logic import graph_utils
+
+REFRESH_INTERVAL_SEC = 60 * 5      # kui tihti aeguvaid kirjeid otsitakse
+REFRESH_AHEAD_SEC = 60 * 60 * 12   # värskenda kirjeid, mis aeguvad selle aja jooksul
+REFRESH_BATCH = 300                # max kirjeid ühe tsükli kohta
+REFRESH_PER_SEC = 1                # taustapäringute lagi (lisaks jagatud LIMITER'ile)
+REFRESH_RETRY_SEC = 60 * 60 * 6    # ebaõnnestunud värskendus lükatakse nii palju edasi (± jitter)
+
+_META_PREFIX = "rdf_meta_v1:"
+_refresher = None
+
+
+def due_entries(now=None, ahead=REFRESH_AHEAD_SEC, limit=REFRESH_BATCH):
+    """
+    Skill names whose cached blob stops being fresh within `ahead` seconds,
+    soonest (or longest expired) first.
+    """
+    now = time.time() if now is None else now
+    due = []
+    for key in graph_utils.CACHE.iterkeys(prefix=_META_PREFIX):
+        skill = key[len(_META_PREFIX):]
+        if graph_utils._negative_key(skill) in graph_utils.CACHE:
+            continue  # teadaolevalt katkine: oota NEGATIVE_TTL lõpuni
+        # peek: tausta skaneerimine ei tohi cache'i tabamuste statistikat paisutada
+        meta = graph_utils.CACHE.peek(key)
+        if meta is None:
+            continue
+        fresh_until = meta.get("fresh_until", meta["checked_at"] + graph_utils.CACHE_TTL)
+        if fresh_until - now < ahead:
+            due.append((fresh_until, skill))
+    return [skill for _, skill in heapq.nsmallest(limit, due)]
+
+
+async def refresh_due(now=None, limit=REFRESH_BATCH, per_sec=REFRESH_PER_SEC):
+    """
+    Revalidate up to `limit` entries that are about to expire. Returns the
+    number of entries refreshed successfully.
+    """
+    skills = due_entries(now=now, limit=limit)
+    if not skills:
+        return 0
+
+    # aiohttp laaditakse alles siin, mitte rakenduse käivitusel
+    import aiohttp
+    from aiolimiter import AsyncLimiter
+
+    limiter = AsyncLimiter(per_sec, time_period=1)
+    refreshed = 0
+    async with aiohttp.ClientSession(headers=graph_utils.HEADERS) as session:
+        for skill in skills:
+            async with limiter:
+                try:
+                    await graph_utils._load_record(session, skill, revalidate=True)
+                    refreshed += 1
+                except Exception as e:
+                    print(f"[warn] cache refresh failed for {skill}: {e}")
+                    _postpone(skill)
+    return refreshed
+
+
+def _postpone(skill, now=None):
+    # ilma selleta jääks ebaõnnestunud kirje järjekorra etteotsa ja küsitaks igas tsüklis uuesti
+    meta_key = graph_utils._meta_key(skill)
+    meta = graph_utils.CACHE.peek(meta_key)
+    if meta is None:
+        return
+    now = time.time() if now is None else now
+    jitter = graph_utils.CACHE_TTL_JITTER
+    # REFRESH_AHEAD_SEC juurde: kirje muutub uuesti "aeguvaks" alles ~REFRESH_RETRY_SEC pärast
+    retry = REFRESH_RETRY_SEC * random.uniform(1 - jitter, 1 + jitter)
+    meta = dict(meta, fresh_until=now + REFRESH_AHEAD_SEC + retry)
+    graph_utils.CACHE.set(meta_key, meta, expire=graph_utils.CACHE_RETAIN)
+
+
+def start_cache_refresher(interval=REFRESH_INTERVAL_SEC):
+    """
+    Start the daemon refresh thread. Calling it again while the thread is alive is a no-op.
+    """
+    global _refresher
+    if _refresher is not None and _refresher.is_alive():
+        return _refresher
+
+    def _loop():
+        while True:
+            started = time.monotonic()
+            try:
+                refreshed = asyncio.run(refresh_due())
+                if refreshed:
+                    print(f"[cache] refreshed {refreshed} RDF entries")
+            except Exception as e:
+                print(f"[warn] cache refresh cycle failed: {e}")
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    _refresher = threading.Thread(target=_loop, name="rdf-cache-refresher", daemon=True)
+    _refresher.start()
+    return _refresher
@@ -0,0 +1,310 @@
+"""
+Job-to-competency coverage over the crawled graph.
+
+A skill requires everything reachable from it through eeldusOskus
+(prerequisites), osaOskus (subskills) and KompSisaldabTn (tegevusnäitajad).
+`Closures` precomputes these transitive closures once per graph snapshot as
+packed bitsets (one bit per node id): strongly connected components are found
+with Tarjan's algorithm and the condensation is folded sinks-first, so every
+closure row is the OR of its successors' rows. When the full matrix would not
+fit in CLOSURE_MAX_BYTES, rows are computed on demand by BFS and memoised.
+
+`CoverageIndex` ORs the closures of each job's skills into one row per job, so
+scoring a candidate skill set against every job is a single vectorised AND +
+popcount over the job matrix.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from logic.graph_query import _gather
+from logic.graph_utils import normalize_key
+
+REQUIREMENT_RELATIONS = ("prerequisites", "subskills", "tegevusnaitajad")
+CLOSURE_MAX_BYTES = 256 * 1024 ** 2   # üle selle arvutatakse sulundid päringu ajal (BFS)
+CLOSURE_CACHE_ROWS = 4096             # BFS-režiimis meelde jäetud ridade arv
+MISSING_LIMIT = 20                    # mitu puuduvat oskust töö kohta välja näidata
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(packed):
+    # bitte rea kohta (viimane telg); ridade laius on 8 baidi kordne, loeme uint64 kaupa
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(packed.view(np.uint64)).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT[packed].sum(axis=-1, dtype=np.int64)
+
+
+def _successors(store, relations):
+    # kõigi nõude-seoste servad ühes CSR-is
+    n = len(store.keys)
+    src_parts, dst_parts = [], []
+    for rel in relations:
+        adj = store.relations[rel]
+        src_parts.append(np.repeat(np.arange(n), np.diff(adj.indptr)))
+        dst_parts.append(adj.indices.astype(np.int64))
+    src, dst = np.concatenate(src_parts), np.concatenate(dst_parts)
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, dst[order]
+
+
+def _strongly_connected(n, indptr, indices):
+    """
+    Iterative Tarjan. Returns (component per node, component count); components
+    are numbered in reverse topological order, so successors come first.
+    """
+    ip, ind = indptr.tolist(), indices.tolist()
+    index, low = [-1] * n, [0] * n
+    on_stack, comp = [False] * n, [-1] * n
+    stack, counter, ncomp = [], 0, 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [[root, ip[root]]]
+        while work:
+            frame = work[-1]
+            v, pos = frame
+            if pos < ip[v + 1]:
+                frame[1] += 1
+                w = ind[pos]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append([w, ip[w]])
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+            work.pop()
+            if work and low[v] < low[work[-1][0]]:
+                low[work[-1][0]] = low[v]
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    comp[w] = ncomp
+                    if w == v:
+                        break
+                ncomp += 1
+    return np.asarray(comp, dtype=np.int64), ncomp
+
+
+class Closures:
+    """
+    Transitive requirement closure of every node of a GraphStore, as packed
+    bitsets. A node's closure includes the node itself.
+    """
+
+    def __init__(self, store, relations=REQUIREMENT_RELATIONS, max_bytes=CLOSURE_MAX_BYTES):
+        self.store = store
+        self.n = len(store.keys)
+        self.width = (self.n + 63) // 64 * 8   # baite rea kohta, 64 biti kaupa
+        self.indptr, self.indices = _successors(store, relations)
+        self._labels = {}
+        for i, attrs in enumerate(store.attrs):
+            label = attrs[0]
+            if label:
+                self._labels.setdefault(str(label).strip().casefold(), i)
+        self._lock = threading.Lock()
+        self._rows = OrderedDict()
+
+        self.component, ncomp = _strongly_connected(self.n, self.indptr, self.indices)
+        if ncomp * self.width <= max_bytes:
+            self.matrix = self._fold(ncomp)
+        else:
+            self.matrix = None  # liiga suur: read BFS-iga päringu ajal
+
+    def _fold(self, ncomp):
+        comp = self.component
+        matrix = np.zeros((ncomp, self.width), dtype=np.uint8)
+        # iga komponendi oma liikmed
+        ids = np.arange(self.n)
+        np.bitwise_or.at(matrix, (comp, ids >> 3), (128 >> (ids & 7)).astype(np.uint8))
+
+        # komponentide vahelised servad CSR-ina
+        rows = np.repeat(np.arange(self.n), np.diff(self.indptr))
+        csrc, cdst = comp[rows], comp[self.indices]
+        keep = csrc != cdst
+        pairs = np.unique(np.stack([csrc[keep], cdst[keep]], axis=1), axis=0) if keep.any() \
+            else np.empty((0, 2), dtype=np.int64)
+        cptr = np.zeros(ncomp + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs[:, 0], minlength=ncomp), out=cptr[1:])
+        cind = pairs[:, 1]
+
+        # Tarjan nummerdab järglased enne: üks läbimine järjekorras piisab
+        for c in range(ncomp):
+            succ = cind[cptr[c]:cptr[c + 1]]
+            if succ.size:
+                matrix[c] |= np.bitwise_or.reduce(matrix[succ], axis=0)
+        return matrix
+
+    def _bfs_row(self, node_id):
+        seen = np.zeros(self.n, dtype=bool)
+        seen[node_id] = True
+        frontier = np.array([node_id], dtype=np.int64)
+        while frontier.size:
+            found, _ = _gather(self.indptr, self.indices, frontier)
+            found = np.unique(found)
+            frontier = found[~seen[found]]
+            seen[frontier] = True
+        row = np.zeros(self.width, dtype=np.uint8)
+        packed = np.packbits(seen)
+        row[:packed.size] = packed
+        return row
+
+    # --- päringud ---
+    def resolve(self, name):
+        """
+        Node id for a skill key or label (case-insensitive), or None.
+        """
+        key = normalize_key(str(name))
+        node_id = self.store.key_to_id.get(key)
+        if node_id is None:
+            node_id = self._labels.get(str(name).strip().casefold())
+        return node_id
+
+    def row(self, node_id):
+        if self.matrix is not None:
+            return self.matrix[self.component[node_id]]
+        with self._lock:
+            row = self._rows.get(node_id)
+            if row is not None:
+                self._rows.move_to_end(node_id)
+                return row
+        row = self._bfs_row(node_id)
+        with self._lock:
+            self._rows[node_id] = row
+            while len(self._rows) > CLOSURE_CACHE_ROWS:
+                self._rows.popitem(last=False)
+        return row
+
+    def union(self, node_ids):
+        out = np.zeros(self.width, dtype=np.uint8)
+        for node_id in node_ids:
+            out |= self.row(node_id)
+        return out
+
+    def single(self, node_ids):
+        # ainult antud node'id, ilma sulundita
+        out = np.zeros(self.width, dtype=np.uint8)
+        ids = np.asarray(list(node_ids), dtype=np.int64)
+        np.bitwise_or.at(out, ids >> 3, (128 >> (ids & 7)).astype(np.uint8))
+        return out
+
+    def keys_of(self, row, limit=None):
+        ids = np.flatnonzero(np.unpackbits(row, count=self.n))
+        if limit is not None:
+            ids = ids[:limit]
+        return [self.store.keys[i] for i in ids]
+
+    def requirements(self, key):
+        node_id = self.resolve(key)
+        return [] if node_id is None else self.keys_of(self.row(node_id))
+
+    @property
+    def nbytes(self):
+        rows = self.matrix.nbytes if self.matrix is not None else sum(r.nbytes for r in self._rows.values())
+        return rows + self.component.nbytes + self.indptr.nbytes + self.indices.nbytes
+
+
+class CoverageIndex:
+    """
+    Required-skill bitset of every job (its skills plus their closures).
+    """
+
+    def __init__(self, closures, jobs):
+        self.closures = closures
+        self.jobs = [(job["id"], job.get("name", "")) for job in jobs]
+        self._position = {job_id: i for i, (job_id, _) in enumerate(self.jobs)}
+        self.unresolved = {}
+        self.required = np.zeros((len(self.jobs), closures.width), dtype=np.uint8)
+        for i, job in enumerate(jobs):
+            ids, missing = self._resolve_all(job.get("skills", ()))
+            self.required[i] = closures.union(ids)
+            if missing:
+                self.unresolved[job["id"]] = missing
+        self.sizes = _popcount(self.required)
+
+    def _resolve_all(self, names):
+        ids, missing = [], []
+        for name in names:
+            node_id = self.closures.resolve(name)
+            if node_id is None:
+                missing.append(name)
+            else:
+                ids.append(node_id)
+        return ids, missing
+
+    def requirements(self, job_id):
+        """
+        Full required-skill keys of one job, or None for an unknown id.
+        """
+        i = self._position.get(job_id)
+        if i is None:
+            return None
+        return {
+            "id": job_id,
+            "name": self.jobs[i][1],
+            "required": self.closures.keys_of(self.required[i]),
+            "unresolved": self.unresolved.get(job_id, []),
+        }
+
+    def rank(self, skills, expand=True, limit=20, missing_limit=MISSING_LIMIT):
+        """
+        Score every job against a candidate's skills. With `expand`, having a
+        skill counts as having everything it requires. Jobs are ordered by the
+        share of their required skills the candidate covers.
+        """
+        ids, unresolved = self._resolve_all(skills)
+        have = self.closures.union(ids) if expand else self.closures.single(ids)
+
+        matched = _popcount(self.required & have)
+        coverage = np.divide(matched, self.sizes, out=np.zeros(len(self.jobs)), where=self.sizes > 0)
+        order = np.lexsort((-matched, -coverage))
+        if limit is not None:
+            order = order[:limit]
+
+        ranked = []
+        for i in order:
+            job_id, name = self.jobs[i]
+            gap = self.required[i] & ~have
+            ranked.append({
+                "id": job_id,
+                "name": name,
+                "coverage": round(float(coverage[i]), 4),
+                "required": int(self.sizes[i]),
+                "matched": int(matched[i]),
+                "missing": int(self.sizes[i] - matched[i]),
+                "gap": self.closures.keys_of(gap, limit=missing_limit),
+            })
+        return {"skills": [self.closures.store.keys[i] for i in ids], "unresolved": unresolved, "jobs": ranked}
+
+
+_index_lock = threading.Lock()
+_index = (None, None)
+
+
+def coverage_index(snapshot, job_store):
+    """
+    CoverageIndex for the given snapshot and the job store's current contents,
+    rebuilt only when either of them changes.
+    """
+    global _index
+    key = (snapshot.version, id(job_store), job_store.revision)
+    cached_key, index = _index
+    if cached_key == key:
+        return index
+    with _index_lock:
+        cached_key, index = _index
+        if cached_key != key:
+            index = CoverageIndex(snapshot.closures(), job_store.all())
+            _index = (key, index)
+    return index
@@ -0,0 +1,198 @@
+"""
+Compact binary snapshot of a GraphStore that loads by memory-mapping.
+
+Reloading the full registry from this file takes milliseconds. It avoids
+both a re-crawl and a GraphML parse.
+
+File layout:
+
+    b"CGSNAP\\x01\\n"   magic and format version
+    uint64 (LE)         header length
+    header              JSON: node count, relation and attribute names,
+                        category names, build time and the offset, dtype
+                        and shape of every array
+    arrays              each aligned to ALIGN bytes
+
+The node table is columnar:
+- keys are one NUL-separated UTF-8 blob;
+- `present`, `depth`, category flags (one bit per category) and the optional
+  layout are plain arrays;
+- every attribute field is an offsets array into a blob of JSON-encoded
+  values. An empty slice means the attribute is missing.
+
+Every relation keeps its four CSR/CSC arrays (int64 indptr, int32 indices),
+so loading never sorts. Attributes are decoded per node on access.
+"""
+import json
+import mmap
+import os
+import time
+
+import numpy as np
+
+from logic.graph_store import ATTR_FIELDS, GraphStore
+
+MAGIC = b"CGSNAP\x01\n"
+FORMAT_VERSION = 1
+ALIGN = 64
+_LEN = np.dtype("<u8")
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+class _AttrTable:
+    """
+    Read-only `store.attrs` over the file's attribute columns: `attrs[i]` is
+    the node's attribute tuple, decoded on access.
+    """
+
+    def __init__(self, columns, n):
+        self._columns = columns   # [(offsets, blob), ...] ATTR_FIELDS järjekorras
+        self._n = n
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if not -self._n <= i < self._n:
+            raise IndexError(i)
+        i %= self._n
+        return tuple(_decode(offsets, blob, i) for offsets, blob in self._columns)
+
+    def __iter__(self):
+        return (self[i] for i in range(self._n))
+
+
+def _decode(offsets, blob, i):
+    start, end = int(offsets[i]), int(offsets[i + 1])
+    if start == end:
+        return None
+    return json.loads(bytes(blob[start:end]))
+
+
+def _text_column(values):
+    # (offsets, blob): väärtus i on blob[offsets[i]:offsets[i + 1]]
+    encoded = [b"" if v is None else json.dumps(v, ensure_ascii=False).encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def save_binary(path, store, members=None, layout=None, built_at=None):
+    """
+    Write `store` to `path`. `members` is {category name: node keys} (at most
+    eight categories). Keys missing from the store are dropped. `layout` is an
+    optional (len(store.keys), 2) position array. The file is written next
+    to `path` and then renamed over it, so readers never see a partial file.
+    """
+    members = members or {}
+    if len(members) > 8:
+        raise ValueError("at most 8 member categories fit in the flag column")
+    n_keys = len(store.keys)
+    n_attrs = len(store.attrs)
+
+    arrays = {}
+    arrays["keys"] = np.frombuffer("\0".join(store.keys).encode("utf-8"), dtype=np.uint8)
+    arrays["present"] = np.asarray(store.present, dtype=bool)
+    arrays["depth"] = np.asarray(store.depth, dtype=np.int32)
+    flags = np.zeros(n_keys, dtype=np.uint8)
+    for bit, keys in enumerate(members.values()):
+        ids = [store.key_to_id[k] for k in keys if k in store.key_to_id]
+        flags[np.asarray(ids, dtype=np.int64)] |= np.uint8(1 << bit)
+    arrays["flags"] = flags
+    if layout is not None:
+        arrays["layout"] = np.asarray(layout, dtype=np.float32).reshape(n_keys, 2)
+    for index, field in enumerate(ATTR_FIELDS):
+        offsets, blob = _text_column(store.attrs[i][index] for i in range(n_attrs))
+        arrays[f"attr.{field}.offsets"] = offsets
+        arrays[f"attr.{field}.blob"] = blob
+    for rel, adj in store.relations.items():
+        arrays[f"rel.{rel}.indptr"] = np.asarray(adj.indptr, dtype=np.int64)
+        arrays[f"rel.{rel}.indices"] = np.asarray(adj.indices, dtype=np.int32)
+        arrays[f"rel.{rel}.rindptr"] = np.asarray(adj.rindptr, dtype=np.int64)
+        arrays[f"rel.{rel}.rindices"] = np.asarray(adj.rindices, dtype=np.int32)
+
+    layout_info, offset = {}, 0
+    for name, arr in arrays.items():
+        layout_info[name] = {"offset": offset, "dtype": arr.dtype.str, "shape": list(arr.shape)}
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "keys": n_keys,
+        "nodes": n_attrs,
+        "built_at": time.time() if built_at is None else built_at,
+        "attr_fields": list(ATTR_FIELDS),
+        "relations": list(store.relations),
+        "members": list(members),
+        "arrays": layout_info,
+    }).encode("utf-8")
+    data_start = -(-(len(MAGIC) + _LEN.itemsize + len(header)) // ALIGN) * ALIGN
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array(len(header), dtype=_LEN).tobytes())
+        f.write(header)
+        for name, arr in arrays.items():
+            f.seek(data_start + layout_info[name]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+
+class BinarySnapshot:
+    """
+    Result of `load_binary`: the GraphStore plus what was saved alongside it.
+    """
+
+    def __init__(self, store, members, layout, built_at):
+        self.store = store
+        self.members = members    # {kategooria: [node võtmed]}
+        self.layout = layout      # (n, 2) float32 või None
+        self.built_at = built_at
+
+
+def load_binary(path, use_mmap=True):
+    """
+    Load a file written by `save_binary`. With `use_mmap` the arrays are
+    read-only views into the mapped file, so pages are read only when used.
+    Without it the whole file is read into memory.
+    """
+    with open(path, "rb") as f:
+        if use_mmap:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = f.read()
+    if bytes(buf[:len(MAGIC)]) != MAGIC:
+        raise SnapshotFormatError(f"{path}: not a graph snapshot file")
+    header_len = int(np.frombuffer(buf, dtype=_LEN, count=1, offset=len(MAGIC))[0])
+    header_start = len(MAGIC) + _LEN.itemsize
+    header = json.loads(bytes(buf[header_start:header_start + header_len]))
+    if header.get("version") != FORMAT_VERSION or header["attr_fields"] != list(ATTR_FIELDS):
+        raise SnapshotFormatError(f"{path}: unsupported snapshot format")
+    data_start = -(-(header_start + header_len) // ALIGN) * ALIGN
+
+    def array(name):
+        info = header["arrays"][name]
+        dtype = np.dtype(info["dtype"])
+        count = int(np.prod(info["shape"], dtype=np.int64))
+        arr = np.frombuffer(buf, dtype=dtype, count=count, offset=data_start + info["offset"])
+        return arr.reshape(info["shape"])
+
+    n_keys, n_nodes = header["keys"], header["nodes"]
+    keys = bytes(array("keys")).decode("utf-8").split("\0") if n_keys else []
+    if len(keys) != n_keys:
+        raise SnapshotFormatError(f"{path}: key table does not match header")
+    columns = [(array(f"attr.{f}.offsets"), array(f"attr.{f}.blob")) for f in ATTR_FIELDS]
+    relations = {rel: tuple(array(f"rel.{rel}.{part}") for part in ("indptr", "indices", "rindptr", "rindices"))
+                 for rel in header["relations"]}
+    store = GraphStore.from_arrays(keys, array("present"), _AttrTable(columns, n_nodes),
+                                   relations, array("depth"))
+
+    flags = array("flags")
+    members = {name: [keys[i] for i in np.flatnonzero(flags & np.uint8(1 << bit))]
+               for bit, name in enumerate(header["members"])}
+    layout = array("layout") if "layout" in header["arrays"] else None
+    return BinarySnapshot(store, members, layout, header["built_at"])
@@ -0,0 +1,116 @@
+"""
+Streaming GraphML export of the crawled graph.
+
+`GraphMLWriter` writes each node, and the edges it lists, the moment it is
+added. It can take nodes straight from the crawler's `on_node` callback or
+from a lazy `GraphStore.as_data()` view. No networkx graph or XML tree is
+built, so memory stays bounded by the set of node ids. That set is needed
+to declare, at the end, the edge targets that were never crawled.
+
+Edges point from a node to the neighbour in its own list (`data[key][rel]`)
+and carry the relation name.
+"""
+import json
+import re
+from xml.sax.saxutils import escape, quoteattr
+
+from logic.graph_store import ATTR_FIELDS, RELATIONS
+
+GRAPHML_NS = "http://graphml.graphdrawing.org/xmlns"
+# XML 1.0 ei luba neid juhtmärke ka escape'ituna
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _text(value):
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False)
+    return _INVALID_XML.sub("", value)
+
+
+class GraphMLWriter:
+    """
+    Incremental GraphML writer. Use as a context manager or call `close()`;
+    `out` is a path or a text file opened for writing.
+    """
+
+    def __init__(self, out):
+        self._own = isinstance(out, (str, bytes)) or hasattr(out, "__fspath__")
+        self._out = open(out, "w", encoding="utf-8") if self._own else out
+        self._nodes = set()
+        self._targets = set()
+        self.node_count = 0
+        self.edge_count = 0
+        self._closed = False
+        self._write_header()
+
+    def _write_header(self):
+        w = self._out.write
+        w("<?xml version='1.0' encoding='utf-8'?>\n")
+        w(f'<graphml xmlns="{GRAPHML_NS}">\n')
+        for field in ATTR_FIELDS:
+            w(f'  <key id="{field}" for="node" attr.name="{field}" attr.type="string" />\n')
+        w('  <key id="depth" for="node" attr.name="depth" attr.type="int" />\n')
+        w('  <key id="relation" for="edge" attr.name="relation" attr.type="string" />\n')
+        w('  <graph edgedefault="directed">\n')
+
+    def add_node(self, key, info, depth=None):
+        """
+        Write node `key` with its attributes and outgoing edges. Adding a key
+        a second time is a no-op.
+        """
+        if key in self._nodes:
+            return
+        self._nodes.add(key)
+        self._targets.discard(key)
+        self.node_count += 1
+
+        w = self._out.write
+        w(f"    <node id={quoteattr(_text(key))}>\n")
+        for field in ATTR_FIELDS:
+            value = info.get(field)
+            if value not in (None, "", [], {}):
+                w(f'      <data key="{field}">{escape(_text(value))}</data>\n')
+        if depth is not None:
+            w(f'      <data key="depth">{int(depth)}</data>\n')
+        w("    </node>\n")
+
+        source = quoteattr(_text(key))
+        for rel in RELATIONS:
+            for target in dict.fromkeys(info.get(rel) or ()):
+                if target not in self._nodes:
+                    self._targets.add(target)
+                w(f"    <edge source={source} target={quoteattr(_text(target))}>"
+                  f'<data key="relation">{rel}</data></edge>\n')
+                self.edge_count += 1
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        w = self._out.write
+        # kraapimata sihtnode'id, et iga serva mõlemad otsad oleks deklareeritud
+        for key in sorted(self._targets):
+            w(f"    <node id={quoteattr(_text(key))} />\n")
+        w("  </graph>\n</graphml>\n")
+        if self._own:
+            self._out.close()
+        else:
+            self._out.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_graphml(out, data, depths=None):
+    """
+    Write a whole `data` mapping (a crawl result or `GraphStore.as_data()`)
+    as GraphML. Returns (node count, edge count).
+    """
+    depths = depths or {}
+    with GraphMLWriter(out) as writer:
+        for key, info in data.items():
+            writer.add_node(key, info, depths.get(key))
+    return writer.node_count, writer.edge_count
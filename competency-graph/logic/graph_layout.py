@@ -0,0 +1,148 @@
+"""
+Server-side graph layout with NumPy.
+
+Positions are computed once per graph snapshot and shipped with the nodes, so
+the browser can draw the graph with physics turned off.
+
+Two layouts are available:
+- "force": Fruchterman-Reingold with vectorised forces. Repulsion is exact
+  (pairwise, in chunks) for small graphs and uses a grid density field
+  convolved via FFT for large ones, so one iteration is O(n + grid²).
+- "hierarchical": one row per BFS level (the crawler's `depths`), ordered
+  within the row by the barycentre of the neighbours in the row above.
+"""
+import numpy as np
+
+from logic.graph_store import RELATIONS
+
+LAYOUT_MODE = "force"          # "force" | "hierarchical"
+LAYOUT_ITERATIONS = 150
+NODE_SPACING = 60.0            # ideaalne servapikkus (vis koordinaatides)
+EXACT_REPULSION_MAX = 500      # sellest suuremal graafil ruudustiku-põhine tõukejõud
+GRID_SIZE = 128
+GRAVITY = 0.02                 # hoiab lahtised komponendid keskme lähedal
+LEVEL_GAP = 150.0
+LAYOUT_SEED = 0
+
+
+def _edge_arrays(store, ids):
+    # kõigi seoste servad kompaktsetes indeksites, mõlemad otsad `ids` hulgas
+    remap = np.full(len(store.keys), -1, dtype=np.int64)
+    remap[ids] = np.arange(len(ids))
+    src_parts, dst_parts = [], []
+    for rel in RELATIONS:
+        adj = store.relations[rel]
+        rows = np.repeat(np.arange(len(store.keys)), np.diff(adj.indptr))
+        src, dst = remap[rows], remap[adj.indices]
+        keep = (src >= 0) & (dst >= 0) & (src != dst)
+        src_parts.append(src[keep])
+        dst_parts.append(dst[keep])
+    return np.concatenate(src_parts), np.concatenate(dst_parts)
+
+
+def _exact_repulsion(pos, k, chunk=512):
+    # sum_j k²/d² * (p_i - p_j) = p_i * sum_j w_ij - (W @ p)_i
+    disp = np.empty_like(pos)
+    sq = (pos ** 2).sum(1)
+    for start in range(0, len(pos), chunk):
+        block = pos[start:start + chunk]
+        d2 = sq[start:start + chunk, None] + sq[None, :] - 2 * block @ pos.T
+        w = k * k / np.maximum(d2, 1e-9)
+        w[np.arange(len(block)), np.arange(start, start + len(block))] = 0.0
+        disp[start:start + chunk] = block * w.sum(1)[:, None] - w @ pos
+    return disp
+
+
+def _grid_repulsion(pos, k, grid=GRID_SIZE):
+    # tihedusväli ruudustikul, potentsiaal = tihedus * (-k² log r) FFT konvolutsiooniga
+    lo = pos.min(0)
+    cell = (pos.max(0) - lo).max() / grid + 1e-9
+    idx = np.clip(((pos - lo) / cell).astype(np.int64), 0, grid - 1)
+    rho = np.zeros((2 * grid, 2 * grid))
+    np.add.at(rho, (idx[:, 0], idx[:, 1]), 1.0)
+
+    offsets = np.fft.fftfreq(2 * grid, d=1.0 / (2 * grid)) * cell
+    r = np.hypot(offsets[:, None], offsets[None, :])
+    kernel = -k * k * np.log(np.maximum(r, cell / 2))
+    phi = np.fft.irfft2(np.fft.rfft2(rho) * np.fft.rfft2(kernel), s=rho.shape)[:grid, :grid]
+
+    gx, gy = np.gradient(phi, cell)
+    return -np.stack([gx[idx[:, 0], idx[:, 1]], gy[idx[:, 0], idx[:, 1]]], axis=1)
+
+
+def force_layout(n, src, dst, iterations=LAYOUT_ITERATIONS, seed=LAYOUT_SEED):
+    """
+    Fruchterman-Reingold layout for `n` nodes and edges (src[i], dst[i]).
+    Returns an (n, 2) float array.
+    """
+    rng = np.random.default_rng(seed)
+    k = NODE_SPACING
+    side = k * np.sqrt(max(n, 1))
+    pos = rng.uniform(-side / 2, side / 2, (n, 2))
+    if n < 2:
+        return pos
+
+    temperature = side / 10
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        disp = _exact_repulsion(pos, k) if n <= EXACT_REPULSION_MAX else _grid_repulsion(pos, k)
+
+        if src.size:
+            delta = pos[src] - pos[dst]
+            dist = np.sqrt((delta ** 2).sum(1)) + 1e-9
+            pull = delta * (dist / k)[:, None]
+            for axis in (0, 1):
+                disp[:, axis] -= np.bincount(src, pull[:, axis], minlength=n)
+                disp[:, axis] += np.bincount(dst, pull[:, axis], minlength=n)
+
+        disp -= pos * GRAVITY * k
+        length = np.sqrt((disp ** 2).sum(1)) + 1e-9
+        pos += disp / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature -= cooling
+    return pos
+
+
+def hierarchical_layout(levels, src, dst):
+    """
+    Row per level (unknown levels, -1, go to the bottom row); within a row nodes
+    are ordered by the mean x of their neighbours in the row above.
+    """
+    levels = np.asarray(levels, dtype=np.int64).copy()
+    n = len(levels)
+    levels[levels < 0] = levels.max(initial=0) + 1
+    x = np.zeros(n)
+
+    # mõlemasuunalised naabrid barütsentri jaoks
+    a = np.concatenate([src, dst])
+    b = np.concatenate([dst, src])
+    for level in np.unique(levels):
+        row = np.flatnonzero(levels == level)
+        above = levels[b] == level - 1
+        sums = np.bincount(a[above], x[b[above]], minlength=n)
+        counts = np.bincount(a[above], minlength=n)
+        bary = np.where(counts[row] > 0, sums[row] / np.maximum(counts[row], 1), np.arange(len(row)))
+        order = row[np.argsort(bary, kind="stable")]
+        x[order] = (np.arange(len(row)) - (len(row) - 1) / 2) * NODE_SPACING
+
+    return np.stack([x, levels * LEVEL_GAP], axis=1)
+
+
+def compute_layout(store, mode=None):
+    """
+    Layout for all crawled nodes of a GraphStore. Returns a float32 array with a
+    row per store id; rows of dangling (not crawled) ids are NaN.
+    """
+    mode = mode or LAYOUT_MODE
+    ids = np.flatnonzero(store.present)
+    src, dst = _edge_arrays(store, ids)
+
+    if mode == "hierarchical":
+        pos = hierarchical_layout(store.depth[ids], src, dst)
+    elif mode == "force":
+        pos = force_layout(len(ids), src, dst)
+    else:
+        raise ValueError(f"Unknown layout mode: {mode}")
+
+    out = np.full((len(store.keys), 2), np.nan, dtype=np.float32)
+    out[ids] = pos
+    return out
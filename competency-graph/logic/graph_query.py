@@ -0,0 +1,99 @@
+"""
+Depth-limited subgraph queries over a GraphStore.
+
+`subgraph` runs a level-synchronous BFS: every level expands the whole frontier
+at once with vectorised CSR/CSC slicing, so a query costs time proportional to
+the part of the graph it returns, not to the registry size.
+"""
+import numpy as np
+
+# Kraapija järgib osaOskus ja eeldusOskus seoseid mõlemas suunas, ülejäänuid ainult alla.
+from logic.relations import DEFAULT_DIRECTIONS, RELATIONS
+DIRECTIONS = ("out", "in", "both")
+
+
+class SubgraphResult:
+    """
+    Query result: `levels` maps node key -> BFS level (seeds are 0) and `edges`
+    holds (relation, node_key, neighbour_key) triples where `node_key` lists
+    `neighbour_key` in its relation field and both ends are in the result.
+    """
+
+    def __init__(self, levels, edges):
+        self.levels = levels
+        self.edges = edges
+
+    def __len__(self):
+        return len(self.levels)
+
+
+def _gather(indptr, indices, frontier):
+    # kõigi frontier-node'ide naabrite slice'id ühe vektoroperatsiooniga
+    starts = indptr[frontier]
+    lengths = indptr[frontier + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=indices.dtype), lengths
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(total)], lengths
+
+
+def _plan(relations, direction):
+    relations = RELATIONS if relations is None else tuple(relations)
+    plan = []
+    for rel in relations:
+        if rel not in RELATIONS:
+            raise ValueError(f"Unknown relation: {rel}")
+        d = DEFAULT_DIRECTIONS[rel] if direction is None else direction
+        if d not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {d}")
+        plan.append((rel, d in ("out", "both"), d in ("in", "both")))
+    return plan
+
+
+def subgraph(store, seeds, depth=None, relations=None, direction=None):
+    """
+    Collect the nodes within `depth` hops of `seeds` (unlimited if None).
+
+    `relations` limits the relation types followed (default: all) and
+    `direction` is "out", "in" or "both"; None uses DEFAULT_DIRECTIONS, which
+    mirrors what the crawler follows. Seeds that are not in the store are ignored.
+    """
+    plan = _plan(relations, direction)
+    n = len(store.keys)
+    level = np.full(n, -1, dtype=np.int32)
+
+    seed_ids = [store.key_to_id[k] for k in seeds if store.has_node(k)]
+    frontier = np.unique(np.asarray(seed_ids, dtype=np.int32))
+    level[frontier] = 0
+
+    d = 0
+    while frontier.size and (depth is None or d < depth):
+        parts = []
+        for rel, forward, backward in plan:
+            adj = store.relations[rel]
+            if forward:
+                parts.append(_gather(adj.indptr, adj.indices, frontier)[0])
+            if backward:
+                parts.append(_gather(adj.rindptr, adj.rindices, frontier)[0])
+        nxt = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int32)
+        # ainult kraabitud node'id, mida pole veel nähtud
+        nxt = nxt[(level[nxt] < 0) & store.present[nxt]]
+        d += 1
+        level[nxt] = d
+        frontier = nxt
+
+    members = np.flatnonzero(level >= 0)
+    levels = {store.keys[i]: int(level[i]) for i in members}
+
+    edges = []
+    in_result = level >= 0
+    for rel, _, _ in plan:
+        adj = store.relations[rel]
+        targets, lengths = _gather(adj.indptr, adj.indices, members)
+        sources = np.repeat(members, lengths)
+        keep = in_result[targets]
+        for u, v in zip(sources[keep], targets[keep]):
+            edges.append((rel, store.keys[u], store.keys[v]))
+
+    return SubgraphResult(levels, edges)
@@ -0,0 +1,299 @@
+"""
+Resident in-memory snapshot of the crawled competency graph.
+
+The full registry crawl is expensive, so it is done once at startup (and then
+periodically in a background thread) instead of on every `/graph` request.
+Each crawl produces a new immutable `GraphSnapshot` which replaces the previous
+one with a single reference assignment, so readers never see a half-built graph.
+"""
+import itertools
+import os
+import threading
+import time
+from pathlib import Path
+
+from logic.coverage import Closures
+from logic.graph_binary import load_binary, save_binary
+from logic.graph_layout import compute_layout
+from logic.graph_store import GraphStore
+from logic.graph_utils import crawl_registry, normalize_key
+from logic.metrics import REGISTRY
+from logic.search_index import SearchIndex
+from logic.skill_index import OccupationIndex
+
+# =========================
+#   CONFIGURATION FLAGS
+# =========================
+SNAPSHOT_REFRESH_SEC = 60 * 60 * 6   # kui tihti täisgraaf uuesti kraabitakse
+SNAPSHOT_POLL_SEC = 60               # kui tihti mitte-juht protsess snapshot-faili muutust kontrollib
+# binaarne koopia viimasest snapshot'ist: käivitusel loetakse see (mmap) kraapimise asemel
+SNAPSHOT_FILE = Path(__file__).resolve().parent.parent / "graph_snapshot.bin"
+# kategooriate nimed snapshot-failis (sama mis CATEGORY_URLS võtmed)
+_MEMBER_NAMES = ("oskus", "kompetents", "tegevusnaitaja", "knobit")
+
+_versions = itertools.count(1)
+_current = None
+_build_lock = threading.Lock()
+_refresher = None
+_follower = None
+
+
+class GraphSnapshot:
+    """
+    Result of one full registry crawl together with the category membership
+    needed to classify nodes. The graph itself lives in a compact GraphStore;
+    `data` and `depths` are read-only views in the crawler's dict shape.
+    """
+
+    def __init__(self, data, depths, skills, competencies, tegevusnaitajad, knobitid, store=None):
+        self.store = store if store is not None else GraphStore.from_data(data, depths)
+        self.data = self.store.as_data()
+        self.depths = self.store.as_depths()
+        self.skills_set = {normalize_key(s) for s in skills}
+        self.competencies_set = {normalize_key(c) for c in competencies}
+        self.tn_set = {normalize_key(t) for t in tegevusnaitajad}
+        self.knobit_set = {normalize_key(k) for k in knobitid}
+        self.occupations = OccupationIndex(self.store)
+        self.version = next(_versions)
+        self.built_at = time.time()
+        self._layout = None
+        self._layout_lock = threading.Lock()
+        self._closures = None
+        self._search = None
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def layout(self):
+        """
+        Node positions as an array indexed by store id, computed on first use
+        and then shared by every request served from this snapshot.
+        """
+        if self._layout is None:
+            with self._layout_lock:
+                if self._layout is None:
+                    self._layout = compute_layout(self.store)
+        return self._layout
+
+    def closures(self):
+        """
+        Transitive requirement closures (see logic.coverage), computed on first
+        use like the layout.
+        """
+        if self._closures is None:
+            with self._layout_lock:
+                if self._closures is None:
+                    self._closures = Closures(self.store)
+        return self._closures
+
+    def search_index(self):
+        """
+        Typeahead index over node labels, descriptions, ESCO vaste and
+        osk_reg_kood (see logic.search_index), built on first use.
+        """
+        if self._search is None:
+            with self._layout_lock:
+                if self._search is None:
+                    self._search = SearchIndex(self.store, kind=self.kind)
+        return self._search
+
+    def kind(self, key):
+        """
+        Node type as used in /graph payloads: kompetents, tegevusnaitaja, knobit, oskus or muu.
+        """
+        if key in self.competencies_set:
+            return "kompetents"
+        if key in self.tn_set:
+            return "tegevusnaitaja"
+        if key in self.knobit_set:
+            return "knobit"
+        if key in self.skills_set:
+            return "oskus"
+        return "muu"
+
+    def position(self, key):
+        """
+        (x, y) of a crawled node, or None for keys outside the snapshot.
+        """
+        if not self.store.has_node(key):
+            return None
+        x, y = self.layout()[self.store.id_of(key)]
+        return float(x), float(y)
+
+
+def build_snapshot():
+    """
+    Crawl the whole registry and return a new GraphSnapshot (does not publish it).
+    Raises RuntimeError if a category listing could not be read completely.
+    """
+    data, depths, members = crawl_registry()
+    missing = [name for name in _MEMBER_NAMES if name not in members]
+    if missing:
+        # poolik liikmesus ei tohi head snapshot'i üle kirjutada
+        raise RuntimeError(f"incomplete category listing: {', '.join(missing)}")
+    return GraphSnapshot(data, depths,
+                         members.get("oskus", ()), members.get("kompetents", ()),
+                         members.get("tegevusnaitaja", ()), members.get("knobit", ()))
+
+
+def save_snapshot(snapshot, path):
+    """
+    Write `snapshot` (store, category membership and layout) to `path` in the
+    binary format of logic.graph_binary.
+    """
+    members = dict(zip(_MEMBER_NAMES, (snapshot.skills_set, snapshot.competencies_set,
+                                       snapshot.tn_set, snapshot.knobit_set)))
+    save_binary(path, snapshot.store, members, layout=snapshot.layout(), built_at=snapshot.built_at)
+
+
+def load_snapshot(path):
+    """
+    GraphSnapshot from a file written by `save_snapshot`, or None if there is
+    no usable file. The graph arrays stay memory-mapped.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        saved = load_binary(path)
+    except (OSError, ValueError) as e:
+        print(f"[warn] could not load graph snapshot file {path}: {e}")
+        return None
+    snapshot = GraphSnapshot(None, None, *(saved.members.get(name, ()) for name in _MEMBER_NAMES),
+                             store=saved.store)
+    snapshot.built_at = saved.built_at
+    snapshot._layout = saved.layout
+    return snapshot
+
+
+def get_snapshot():
+    """
+    Return the currently published snapshot or None if the first build has not finished.
+    """
+    return _current
+
+
+def publish_snapshot(snapshot):
+    """
+    Atomically replace the published snapshot.
+    """
+    global _current
+    _current = snapshot
+    return snapshot
+
+
+def refresh_snapshot(path=None):
+    """
+    Build a new snapshot and publish it. Concurrent calls are serialised so that
+    only one crawl runs at a time. With `path` the new snapshot is also saved
+    there for the next start.
+    """
+    with _build_lock:
+        snapshot = build_snapshot()
+        if not snapshot.data:
+            # tühja tulemusega (nt võrguviga) ei kirjuta head snapshot'i üle
+            print("[warn] snapshot build returned no data, keeping previous snapshot")
+            return _current
+        # paigutus, sulundid ja otsinguindeks arvutatakse enne avaldamist, et esimene päring ei peaks ootama
+        snapshot.layout()
+        snapshot.closures()
+        snapshot.search_index()
+        publish_snapshot(snapshot)
+        if path:
+            try:
+                save_snapshot(snapshot, path)
+            except OSError as e:
+                print(f"[warn] could not save graph snapshot to {path}: {e}")
+        return snapshot
+
+
+@REGISTRY.collector
+def _snapshot_metrics():
+    snapshot = _current
+    if snapshot is None:
+        return []
+    return [
+        ("graph_snapshot_version", "gauge", "Version of the published graph snapshot", [({}, snapshot.version)]),
+        ("graph_snapshot_nodes", "gauge", "Nodes in the published graph snapshot", [({}, len(snapshot))]),
+        ("graph_snapshot_age_seconds", "gauge", "Seconds since the published snapshot was built",
+         [({}, time.time() - snapshot.built_at)]),
+        ("graph_snapshot_store_bytes", "gauge", "Bytes held in the snapshot's index arrays",
+         [({}, snapshot.store.nbytes)]),
+    ]
+
+
+def start_refresher(interval=SNAPSHOT_REFRESH_SEC, path=None):
+    """
+    Start a daemon thread that builds the snapshot immediately and then every
+    `interval` seconds. Calling it again while the thread is alive is a no-op.
+
+    With `path`, a snapshot saved there is published first. The first crawl
+    then waits until that snapshot is `interval` seconds old.
+    """
+    global _refresher
+    if _refresher is not None and _refresher.is_alive():
+        return _refresher
+
+    def _loop():
+        wait = 0.0
+        saved = load_snapshot(path)
+        if saved is not None and _current is None:
+            publish_snapshot(saved)
+            wait = interval - (time.time() - saved.built_at)
+        while True:
+            time.sleep(max(0.0, wait))
+            started = time.monotonic()
+            try:
+                refresh_snapshot(path)
+            except Exception as e:
+                print(f"[warn] snapshot refresh failed: {e}")
+            wait = interval - (time.monotonic() - started)
+
+    _refresher = threading.Thread(target=_loop, name="graph-snapshot-refresher", daemon=True)
+    _refresher.start()
+    return _refresher
+
+
+def reload_if_changed(path, seen=None):
+    """
+    Publish the snapshot saved at `path` if the file changed since `seen`
+    (its previous mtime_ns). Returns the mtime_ns that is now published, or
+    `seen` when nothing changed.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return seen
+    if mtime == seen:
+        return seen
+    saved = load_snapshot(path)
+    if saved is None:
+        return seen
+    publish_snapshot(saved)
+    return mtime
+
+
+def start_follower(path, poll=SNAPSHOT_POLL_SEC):
+    """
+    Start a daemon thread for processes that do not crawl themselves: it
+    publishes the snapshot file at `path` and again every time the leader
+    replaces it. Calling it again while the thread is alive is a no-op.
+    """
+    global _follower
+    if _follower is not None and _follower.is_alive():
+        return _follower
+
+    def _loop():
+        seen = None
+        while True:
+            try:
+                seen = reload_if_changed(path, seen)
+            except Exception as e:
+                print(f"[warn] snapshot reload failed: {e}")
+            time.sleep(poll)
+
+    _follower = threading.Thread(target=_loop, name="graph-snapshot-follower", daemon=True)
+    _follower.start()
+    return _follower
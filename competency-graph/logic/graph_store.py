@@ -0,0 +1,219 @@
+"""
+Compact, integer-indexed store for the crawled graph.
+
+Node keys are interned to consecutive integer ids. Node attributes are kept as
+fixed-order tuples and every relation (subskills, prerequisites, ...) is stored
+twice as NumPy arrays: CSR (node -> listed neighbours) and CSC (neighbour ->
+nodes that list it), so both directions are O(1) to locate and O(degree) to read.
+
+The old `data` dict shape can still be read through `as_data()`, which builds
+each node dict on access instead of keeping them all in memory.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+# node-dict väljad, mis on seoste listid (data[key][rel] = [naabri võtmed]); vt logic.relations
+from logic.relations import RELATIONS
+ATTR_FIELDS = ("label", "uri", "description", "link", "esco_link", "esco_vaste",
+               "osk_reg_kood", "skill_verb", "relevant_occupations")
+# alati olemas olevad listid, mida kraapija kunagi ei täida
+_EMPTY_LIST_FIELDS = ("competencies",)
+_MISSING = None
+
+
+class _Adjacency:
+    """
+    One relation as CSR (forward) plus CSC (reverse) index arrays.
+    """
+    __slots__ = ("indptr", "indices", "rindptr", "rindices")
+
+    def __init__(self, src, dst, n):
+        src = np.asarray(src, dtype=np.int32)
+        dst = np.asarray(dst, dtype=np.int32)
+        self.indptr, self.indices = self._compress(src, dst, n)
+        self.rindptr, self.rindices = self._compress(dst, src, n)
+
+    @classmethod
+    def from_arrays(cls, indptr, indices, rindptr, rindices):
+        # valmis massiividest (nt mmap'itud binaarsnapshot), ilma uuesti sortimata
+        adj = cls.__new__(cls)
+        adj.indptr, adj.indices, adj.rindptr, adj.rindices = indptr, indices, rindptr, rindices
+        return adj
+
+    @staticmethod
+    def _compress(rows, cols, n):
+        # stabiilne sort hoiab iga node'i naabrid kraapimise järjekorras
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr, cols[order]
+
+    def out(self, node_id):
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def into(self, node_id):
+        return self.rindices[self.rindptr[node_id]:self.rindptr[node_id + 1]]
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.rindptr.nbytes + self.rindices.nbytes
+
+
+class GraphStore:
+    """
+    Read-only graph built from the crawler's `data` / `depths` dicts.
+
+    Ids cover crawled nodes and also dangling neighbours that were referenced but
+    never crawled; `has_node` tells them apart.
+    """
+
+    def __init__(self, keys, present, attrs, relations, depths):
+        self.keys = keys
+        self.key_to_id = {k: i for i, k in enumerate(keys)}
+        self.present = present
+        self.attrs = attrs
+        self.depth = depths
+        self.relations = relations
+        self._len = int(present.sum())
+
+    @classmethod
+    def from_data(cls, data, depths=None):
+        depths = depths or {}
+        keys = list(data.keys())
+        key_to_id = {k: i for i, k in enumerate(keys)}
+
+        def intern(k):
+            i = key_to_id.get(k)
+            if i is None:
+                i = key_to_id[k] = len(keys)
+                keys.append(k)
+            return i
+
+        attrs = []
+        edges = {rel: ([], []) for rel in RELATIONS}
+        for key, info in data.items():
+            node_id = key_to_id[key]
+            attrs.append(tuple(info.get(f, _MISSING) for f in ATTR_FIELDS))
+            for rel in RELATIONS:
+                src, dst = edges[rel]
+                for target in dict.fromkeys(info.get(rel, ())):
+                    src.append(node_id)
+                    dst.append(intern(target))
+
+        present = np.zeros(len(keys), dtype=bool)
+        present[:len(data)] = True
+        depth = np.full(len(keys), -1, dtype=np.int32)
+        for k, d in depths.items():
+            i = key_to_id.get(k)
+            if i is not None:
+                depth[i] = d
+        relations = {rel: _Adjacency(src, dst, len(keys)) for rel, (src, dst) in edges.items()}
+        return cls(keys, present, attrs, relations, depth)
+
+    @classmethod
+    def from_arrays(cls, keys, present, attrs, relations, depths):
+        """
+        Store over ready-made arrays; `relations` maps each relation to its
+        (indptr, indices, rindptr, rindices). Used by logic.graph_binary.
+        """
+        relations = {rel: _Adjacency.from_arrays(*arrays) for rel, arrays in relations.items()}
+        return cls(keys, present, attrs, relations, depths)
+
+    # --- lookups ---
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, key):
+        return self.has_node(key)
+
+    def has_node(self, key):
+        i = self.key_to_id.get(key)
+        return i is not None and bool(self.present[i])
+
+    def id_of(self, key):
+        return self.key_to_id[key]
+
+    def neighbours(self, rel, key, direction="out"):
+        """
+        Keys linked to `key` by relation `rel`: "out" follows the node's own list
+        (e.g. its subskills), "in" returns the nodes that list `key`.
+        """
+        i = self.key_to_id.get(key)
+        if i is None:
+            return []
+        adj = self.relations[rel]
+        ids = adj.out(i) if direction == "out" else adj.into(i)
+        return [self.keys[j] for j in ids]
+
+    def node(self, key):
+        """
+        Node dict in the crawler's `data[key]` shape.
+        """
+        i = self.key_to_id.get(key)
+        if i is None or not self.present[i]:
+            raise KeyError(key)
+        info = {f: v for f, v in zip(ATTR_FIELDS, self.attrs[i]) if v is not _MISSING}
+        for rel in RELATIONS:
+            info[rel] = [self.keys[j] for j in self.relations[rel].out(i)]
+        for f in _EMPTY_LIST_FIELDS:
+            info[f] = []
+        return info
+
+    def as_data(self):
+        return _DataView(self)
+
+    def as_depths(self):
+        return _DepthView(self)
+
+    @property
+    def nbytes(self):
+        """
+        Bytes held in the index arrays (excludes the key and attribute objects).
+        """
+        return (self.present.nbytes + self.depth.nbytes
+                + sum(adj.nbytes for adj in self.relations.values()))
+
+
+class _DataView(Mapping):
+    """
+    Lazy `data` dict: node dicts are built on access.
+    """
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, key):
+        return self._store.node(key)
+
+    def __contains__(self, key):
+        return self._store.has_node(key)
+
+    def __iter__(self):
+        store = self._store
+        return (store.keys[i] for i in np.flatnonzero(store.present))
+
+    def __len__(self):
+        return len(self._store)
+
+
+class _DepthView(Mapping):
+    """
+    Lazy `depths` dict over the store's depth array (nodes without a depth are absent).
+    """
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, key):
+        i = self._store.key_to_id.get(key)
+        if i is None or self._store.depth[i] < 0:
+            raise KeyError(key)
+        return int(self._store.depth[i])
+
+    def __iter__(self):
+        store = self._store
+        return (store.keys[i] for i in np.flatnonzero(store.depth >= 0))
+
+    def __len__(self):
+        return int((self._store.depth >= 0).sum())
@@ -1,78 +1,198 @@
-import ssl
+from __future__ import annotations
 
-from IPython.core.display import Math
-from pyvis import node
+import ssl
 
 ssl._create_default_https_context = ssl._create_unverified_context
 
 # --- Std lib / 3rd party ---
+# Rasked teegid (aiohttp, requests, bs4, rdflib) imporditakse alles neid kasutavates
+# funktsioonides, et `create_app` ja gunicorni worker'id käivituksid kiiresti.
+import importlib
+import json
+import os
+import random
+import sys
 import time
-import asyncio, aiohttp, async_timeout
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import unquote
-
-from aiolimiter import AsyncLimiter
-from diskcache import Cache
-
-from rdflib import Graph, Namespace, URIRef
-from rdflib.namespace import RDFS
-
-from pyvis.network import Network
-import networkx as nx
+import threading
+import multiprocessing
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio, async_timeout
+from urllib.parse import unquote, urljoin
 
 import re
+import xml.etree.ElementTree as ET
+
+from logic.metrics import REGISTRY, crawl_summary, track, track_peak
+from logic.rate_control import AdaptiveLimiter
+from logic.rdf_cache import RdfCache
+from logic.rdf_extract import as_index, parse_triples
+from logic.relations import BY_FIELD, IN_PREDICATES, OUT_PREDICATES, RELATION_TYPES, split_triples
+from logic.singleflight import SingleFlight
 
 # =========================
 #      CONSTANTS / RDF
 # =========================
-EDU = Namespace("https://schema.edu.ee/")
-SCHEMA = Namespace("https://schema.org/")
+# predikaadid on tavalised stringid; rdflib'i Namespace'id (EDU, SCHEMA, RDFS) annab __getattr__
+EDU_NS = "https://schema.edu.ee/"
+SCHEMA_NS = "https://schema.org/"
+SCHEMA_NAME = SCHEMA_NS + "name"
+SCHEMA_DESCRIPTION = SCHEMA_NS + "description"
+RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
 BASE_RDF = "https://oppekava.edu.ee/a/Special:ExportRDF/"
 DISPLAY_URL = "https://oppekava.edu.ee/a/"
 SKILLS_URL = "https://oppekava.edu.ee/a/Kategooria:Haridus:Oskus"
 COMPETENCIES_URL = "https://oppekava.edu.ee/a/Kategooria:Haridus:Kompetents"
 TEGEVUSNAITAJAD_URL = "https://oppekava.edu.ee/a/Kategooria:Haridus:Tegevusnaitaja"
 KNOBITID_URL = "https://oppekava.edu.ee/a/Kategooria:Haridus:Knobit"
+CATEGORY_URLS = {
+    "oskus": SKILLS_URL,
+    "kompetents": COMPETENCIES_URL,
+    "tegevusnaitaja": TEGEVUSNAITAJAD_URL,
+    "knobit": KNOBITID_URL,
+}
 
-ESCO_LINK = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3Aesco_link")
-ESCO_VASTE = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3Aesco_vaste")
-OSK_REG_KOOD = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3Aosk_reg_kood")
-VERB = URIRef("https://schema.edu.ee/verb")
-RELEVANT_OCCUPATION = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3ASchema-3ArelevantOccupation")
+ESCO_LINK = "http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3Aesco_link"
+ESCO_VASTE = "http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3Aesco_vaste"
+OSK_REG_KOOD = "http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3Aosk_reg_kood"
+VERB = "https://schema.edu.ee/verb"
+RELEVANT_OCCUPATION = "http://oppekava.edu.ee/a/Special:URIResolver/Property-3ASchema-3ArelevantOccupation"
 
+# seoste predikaadid tulevad registrist (logic.relations)
+OSAOSKUS = BY_FIELD["subskills"].predicate
+SEOTUD_OSKUS = BY_FIELD["prerequisites"].predicate
+SEOTUD = "http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3Aseotud"
 
-OSAOSKUS = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3AosaOskus")
-SEOTUD_OSKUS = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3AeeldusOskus")
-SEOTUD = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3Aseotud")
+KOMP_SISALDAB_TN = BY_FIELD["tegevusnaitajad"].predicate
+TN_SISALDAB_KNOBITIT = BY_FIELD["knobitid"].predicate
+TN_EELDAB = BY_FIELD["tn_eeldab"].predicate
+KNOBITI_LIIK = "http://oppekava.edu.ee/a/Special:URIResolver/Property-3AKnobitiLiik"
 
-KOMP_SISALDAB_TN = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3AKompSisaldabTn")
-TN_SISALDAB_KNOBITIT = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3ATnSisaldabKnobitit")
-TN_EELDAB = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3AHaridus-3ATnEeldab")
-KNOBITI_LIIK = URIRef("http://oppekava.edu.ee/a/Special:URIResolver/Property-3AKnobitiLiik")
+_LAZY_MODULES = ("aiohttp", "requests")
+
+def __getattr__(name):
+    """
+    Laisad mooduli atribuudid: graph_utils.aiohttp / .requests ja rdflib'i
+    Namespace'id EDU, SCHEMA, RDFS laaditakse alles esimesel kasutamisel.
+    """
+    if name in _LAZY_MODULES:
+        value = importlib.import_module(name)
+    elif name in ("EDU", "SCHEMA", "RDFS"):
+        from rdflib import Namespace
+        from rdflib.namespace import RDFS
+        value = {"EDU": Namespace(EDU_NS), "SCHEMA": Namespace(SCHEMA_NS), "RDFS": RDFS}[name]
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
 
 # =========================
 #   CONFIGURATION FLAGS
 # =========================
-LIMIT_RECURSION = False
+LIMIT_RECURSION = False       # vaikeväärtused CrawlOptions'ile (nt CLI jaoks)
 MAX_DEPTH = 999_999_999
 EXPORT_GRAPHML = True
+RDF_EXTRACTOR = "stream"      # "stream" (iterparse, ainult vajalikud predikaadid) | "rdflib" (täisgraaf)
+EXTRACTOR_VERSION = 1         # tõsta, kui extract_record'i väljund muutub (tühistab ainult kirjete cache'i)
 
 # --- Async loader config ---
-MAX_CONCURRENCY = 32          # mitu RDF päringut korraga
-REQS_PER_SEC = 8              # kiirus serveri vastu
+MAX_CONCURRENCY = 32          # algne paralleelsus; AdaptiveLimiter kohandab seda
+REQS_PER_SEC = 8              # algne kiirus serveri vastu; AdaptiveLimiter kohandab seda
+MAX_REQS_PER_SEC = 64         # adaptiivse kiiruse ülempiir
 HTTP_TIMEOUT_SEC = 15
 RETRIES = 4                   # eksponentsiaalne backoff
-CACHE_TTL = 60 * 60 * 24 * 14 # 14 päeva
-
-CACHE = Cache("./rdf_cache")
-SEM = asyncio.Semaphore(MAX_CONCURRENCY)
-RATE = AsyncLimiter(REQS_PER_SEC, time_period=1)
+MAX_CATEGORY_PAGES = 500      # kaitse lõputu "järgmine lehekülg" ahela vastu
+CACHE_TTL = 60 * 60 * 24 * 3  # 3 päeva värske, siis tingimuslik päring (ETag / Last-Modified)
+CACHE_TTL_JITTER = 0.2        # ±20% CACHE_TTL-ist, et ühe kraapimise kirjed korraga ei aeguks
+CACHE_RETAIN = 60 * 60 * 24 * 90  # kaua blob't revalideerimiseks alles hoitakse
+NEGATIVE_TTL = 60 * 60 * 6    # kaua 404 / katkise RDF-i / timeout'iga lehte vahele jäetakse
+NEGATIVE_STATUSES = (404, 410)  # neid ei proovita uuesti
+CACHE_SIZE_LIMIT = 2 * 1024 ** 3  # ketta-cache'i eelarve baitides, üle selle LRU eviction
+CACHE_COMPRESSION = "auto"    # "auto" (zstd kui olemas, muidu zlib) | "zstd" | "zlib" | "none"
+
+# --- Parse executor ---
+PARSE_EXECUTOR = "auto"       # "auto" | "process" | "thread" | "inline"
+PARSE_WORKERS = None          # None -> os.cpu_count()
+
+CACHE = RdfCache("./rdf_cache", size_limit=CACHE_SIZE_LIMIT, compression=CACHE_COMPRESSION)
+# AIMD: kiirendab, kuni server on terve, aeglustab 429/503/timeout'i peale (jagatud kõigi event loop'ide vahel)
+LIMITER = AdaptiveLimiter(rate=REQS_PER_SEC, concurrency=MAX_CONCURRENCY, max_rate=MAX_REQS_PER_SEC)
 HEADERS = {
     "User-Agent": "skills-crawler/1.0 (+contact: you@example.com)",
     "Accept-Encoding": "gzip, deflate",
 }
 
+# =========================
+#         METRICS
+# =========================
+CRAWL_SUMMARY = True          # prindi iga kraapimise lõpus struktureeritud ajakokkuvõte (JSON rida)
+
+FETCH_SECONDS = REGISTRY.histogram("crawl_fetch_seconds", "RDF page request latency by result", ("result",))
+LIMITER_WAIT_SECONDS = REGISTRY.histogram("crawl_limiter_wait_seconds", "Time spent waiting for a limiter slot")
+PARSE_SECONDS = REGISTRY.histogram("crawl_parse_seconds", "RDF extraction time per page, measured in the worker")
+PARSE_WAIT_SECONDS = REGISTRY.histogram("crawl_parse_wait_seconds",
+                                        "Time a page spent queued for a parse worker and in transfer")
+STAGE_SECONDS = REGISTRY.histogram("crawl_stage_seconds", "Seconds from crawl start until a stage finished",
+                                   ("stage",), buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 3600))
+BYTES_DOWNLOADED = REGISTRY.counter("crawl_bytes_downloaded_total", "RDF/XML bytes downloaded")
+RETRIES_TOTAL = REGISTRY.counter("crawl_retries_total", "Retried RDF requests by reason", ("reason",))
+RECORDS_TOTAL = REGISTRY.counter("crawl_records_total", "Node records by source", ("source",))
+CATEGORY_PAGES = REGISTRY.counter("crawl_category_pages_total", "Category listing pages read")
+NODES_TOTAL = REGISTRY.counter("crawl_nodes_total", "Nodes produced by crawls")
+EDGES_TOTAL = REGISTRY.counter("crawl_edges_total", "Edges produced by crawls")
+QUEUE_DEPTH = REGISTRY.gauge("crawl_queue_depth", "Pages waiting in the crawl queue")
+
+_last_summary = None
+
+@REGISTRY.collector
+def _cache_and_limiter_metrics():
+    stats = CACHE.stats()
+    tiers = stats["tiers"].items()
+    families = [
+        ("rdf_cache_hits_total", "counter", "Disk cache hits by key tier",
+         [({"tier": t}, c["hits"]) for t, c in tiers]),
+        ("rdf_cache_misses_total", "counter", "Disk cache misses by key tier",
+         [({"tier": t}, c["misses"]) for t, c in tiers]),
+        ("rdf_cache_hit_ratio", "gauge", "Disk cache hit ratio", [({}, stats["hit_rate"])]),
+        ("rdf_cache_bytes_saved_total", "counter", "Bytes saved by compression", [({}, stats["bytes_saved"])]),
+        ("rdf_cache_evictions_total", "counter", "Entries evicted by the byte budget", [({}, stats["evictions"])]),
+        ("rdf_cache_volume_bytes", "gauge", "Disk cache size on disk", [({}, stats["volume"])]),
+    ]
+    limiter = LIMITER.stats()
+    families += [
+        ("crawl_limiter_rate", "gauge", "Current adaptive request rate (req/s)", [({}, limiter["rate"])]),
+        ("crawl_limiter_concurrency", "gauge", "Current adaptive concurrency limit", [({}, limiter["concurrency"])]),
+        ("crawl_limiter_in_flight", "gauge", "Requests in flight", [({}, limiter["in_flight"])]),
+    ]
+    return families
+
+def last_crawl_summary():
+    """
+    Viimase lõpetatud kraapimise kokkuvõte (vt metrics.CrawlSummary) või None.
+    """
+    return _last_summary
+
+@dataclass(frozen=True)
+class CrawlOptions:
+    """
+    Ühe kraapimise seaded. Antakse igale kutsele kaasa (mitte mooduli globaalidena),
+    et paralleelsed päringud üksteise seadeid üle ei kirjutaks. Hashable, et
+    identsed kraapimised saaks kokku liita.
+    """
+    limit_recursion: bool = False
+    max_depth: int = MAX_DEPTH
+
+    @classmethod
+    def from_globals(cls):
+        return cls(limit_recursion=LIMIT_RECURSION, max_depth=MAX_DEPTH)
+
+    def key(self):
+        """
+        Kokkuliitmise võti: ilma limit_recursion'ita max_depth tulemust ei mõjuta.
+        """
+        return (self.limit_recursion, self.max_depth if self.limit_recursion else None)
+
 # =========================
 #       UTILITIES
 # =========================
@@ -137,216 +257,579 @@ def _skill_key(skill_name: str) -> str:
 # =========================
 #       SCRAPER
 # =========================
+def _parse_category_page(html: bytes, page_url: str):
+    """
+    Tagastab kategoorialehe data ID-d ja järgmise lehekülje URL-i (või None).
+    """
+    from bs4 import BeautifulSoup
+
+    datas = set()
+    next_url = None
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Leia kõik lingid, mis viitavad /a/ ja EI sisalda kategooria või erileht prefiksit
+    for link in soup.find_all("a", href=True):
+        href = link["href"]
+        if href.startswith("/a/") and not href.startswith("/a/Kategooria") and not href.startswith("/a/Eri:"):
+            datas.add(href.split("/a/")[-1])
+        elif "pagefrom=" in href and next_url is None:
+            # MediaWiki "järgmine lehekülg" link
+            next_url = urljoin(page_url, href)
+    return datas, next_url
+
 def get_all_data(category_url: str):
     """
-    Loeb kategoorialehelt data ID-d (URL-i viimased osad).
+    Loeb kategoorialehelt data ID-d (URL-i viimased osad), järgides "järgmine lehekülg" linke.
     """
+    import requests
+
     datas = set()
+    url, seen = category_url, set()
     try:
-        response = requests.get(category_url, timeout=20)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # Leia kõik lingid, mis viitavad /a/ ja EI sisalda kategooria või erileht prefiksit
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            if href.startswith("/a/") and not href.startswith("/a/Kategooria") and not href.startswith("/a/Eri:"):
-                datas.add(href.split("/a/")[-1])
+        while url and url not in seen and len(seen) < MAX_CATEGORY_PAGES:
+            seen.add(url)
+            response = requests.get(url, timeout=20)
+            response.raise_for_status()
+            page_datas, url = _parse_category_page(response.content, url)
+            datas |= page_datas
 
         print(f"Found {len(datas)} data from {category_url}")
     except Exception as e:
         print(f"Error retrieving data from {category_url}: {e}")
     return [normalize_key(d) for d in datas]
 
+async def _fetch_category_page(session: aiohttp.ClientSession, url: str) -> bytes:
+    """
+    Üks kategooria lehekülg sama korduskatsete poliitikaga nagu _fetch_rdf: 429/503 antakse
+    LIMITER'ile teada (Retry-After), slot vabastatakse ja sama lehekülge küsitakse uuesti.
+    RETRIES katse järel FetchError(kind="category").
+    """
+    reason = None
+    for attempt in range(RETRIES):
+        if attempt:
+            RETRIES_TOTAL.inc(reason=reason)
+            track("retries")
+        slot = None
+        try:
+            async with LIMITER.slot() as slot:
+                async with async_timeout.timeout(HTTP_TIMEOUT_SEC):
+                    async with session.get(url, headers=HEADERS, ssl=False) as resp:
+                        slot.observe(resp)
+                        if slot.throttled:
+                            reason = "throttled"
+                            continue
+                        resp.raise_for_status()
+                        return await resp.read()
+        except asyncio.TimeoutError:
+            reason = "timeout"
+        except Exception:
+            reason = "error"
+        # slot on vabastatud: backoff ei hoia kinni paralleelsuse kohta
+        if attempt + 1 < RETRIES:
+            await asyncio.sleep(0.5 * (2 ** attempt))
+    raise FetchError(url, "category", f"{reason} after {RETRIES} attempts")
+
+async def iter_category_keys(session: aiohttp.ClientSession, category_url: str):
+    """
+    Asünkroonne generaator: loeb kategooria lehekülgi jagatud sessiooniga ja annab
+    normaliseeritud võtmed välja kohe, kui iga lehekülg on käes.
+    Lehekülg, mida ka korduskatsetega kätte ei saa, katkestab loendi FetchError'iga,
+    et poolikut liikmete hulka ei peetaks täielikuks.
+    """
+    url, seen, found = category_url, set(), 0
+    while url and url not in seen and len(seen) < MAX_CATEGORY_PAGES:
+        # seen'i lisatakse alles õnnestunud lehekülg: korduskatse jätkab samast offset'ist
+        html = await _fetch_category_page(session, url)
+        seen.add(url)
+        CATEGORY_PAGES.inc()
+        track("category_pages")
+        page_datas, url = _parse_category_page(html, url)
+        found += len(page_datas)
+        for d in page_datas:
+            yield normalize_key(d)
+    print(f"Found {found} data from {category_url}")
+
 # =========================
 #    ASYNC RDF LOADING
 # =========================
-async def _fetch_rdf(session: aiohttp.ClientSession, skill_name: str) -> bytes:
+def _cache_validators(resp, checked_at: float) -> dict:
+    """
+    Vastuse valideerijad järgmise tingimusliku päringu jaoks.
+    """
+    return {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "checked_at": checked_at,
+        "fresh_until": checked_at + CACHE_TTL * random.uniform(1 - CACHE_TTL_JITTER, 1 + CACHE_TTL_JITTER),
+    }
+
+def _default_meta(now: float) -> dict:
+    """
+    Metakirje blob'ile, millel seda pole (enne valideerijaid kirjutatud või meta kirjutamine
+    ebaõnnestus). Valideerijaid pole, seega järgmine kontroll on tingimusteta GET; fresh_until
+    hajutatakse 0..CACHE_TTL peale, et taustavärskendaja need järk-järgult üle küsiks.
+    """
+    return {"etag": None, "last_modified": None, "checked_at": now - CACHE_TTL,
+            "fresh_until": now + CACHE_TTL * random.uniform(0, 1)}
+
+def _meta_is_fresh(meta: dict, now: float = None) -> bool:
+    now = time.time() if now is None else now
+    # fresh_until'ita (vanemad) metakirjed: checked_at + CACHE_TTL
+    return now < meta.get("fresh_until", meta["checked_at"] + CACHE_TTL)
+
+def _blob_key(skill_name: str) -> str:
+    return f"rdf_v2:{skill_name}"
+
+def _meta_key(skill_name: str) -> str:
+    return f"rdf_meta_v1:{skill_name}"
+
+def _record_key(skill_name: str) -> str:
+    return f"rec_v{EXTRACTOR_VERSION}:{skill_name}"
+
+def _negative_key(skill_name: str) -> str:
+    return f"neg_v1:{skill_name}"
+
+class FetchError(RuntimeError):
+    """
+    Lehte ei saanud kätte või parsida. `kind` on "404", "parse", "timeout" või "error";
+    `cached` on tõene, kui viga tuli negatiivsest cache'ist (päringut ei tehtud).
+    """
+    def __init__(self, skill_name: str, kind: str, detail: str = "", cached: bool = False):
+        super().__init__(f"{skill_name}: {kind}" + (f" ({detail})" if detail else ""))
+        self.skill_name = skill_name
+        self.kind = kind
+        self.detail = detail
+        self.cached = cached
+
+def _remember_failure(skill_name: str, kind: str, detail: str = "") -> FetchError:
+    CACHE.set(_negative_key(skill_name), {"kind": kind, "detail": detail, "at": time.time()},
+              expire=NEGATIVE_TTL)
+    return FetchError(skill_name, kind, detail)
+
+def negative_report() -> list:
+    """
+    Praegu negatiivses cache'is olevad lehed (nt rippuvad osaOskus/eeldusOskus lingid),
+    uusimad eespool: [{"skill", "kind", "detail", "at"}].
+    """
+    prefix = _negative_key("")
+    report = []
+    # ainult neg_v1: vahemik, mitte kogu cache; peek ei loe seda cache'i tabamuseks
+    for key in CACHE.iterkeys(prefix=prefix):
+        entry = CACHE.peek(key)
+        if entry is not None:
+            report.append({"skill": key[len(prefix):], **entry})
+    return sorted(report, key=lambda e: e["at"], reverse=True)
+
+async def _fetch_rdf(session: aiohttp.ClientSession, skill_name: str, revalidate: bool = False) -> bytes:
     """
     Võrgupäring RDF-XML-ile koos ketta-cache, paralleelsuse ja backoffiga.
+    Kui cache'itud blob on vanem kui CACHE_TTL (või revalidate=True), küsitakse serverilt
+    tingimuslikult (If-None-Match / If-Modified-Since) ja 304 korral kasutatakse vana blob'i edasi.
+    Uue blob'i allalaadimine kustutab selle oskuse parsitud kirje.
     """
-    cache_key = f"rdf_v2:{skill_name}"
+    cache_key = _blob_key(skill_name)
+    meta_key = _meta_key(skill_name)
     cached = CACHE.get(cache_key)
+    meta = None
     if cached is not None:
-        # ka hit'i puhul jookse läbi fix (kui mõni vana v2 sisse satub)
-        fixed = fix_decimal_commas(cached)
-        if fixed != cached:
-            CACHE.set(cache_key, fixed, expire=CACHE_TTL)
-        return fixed
+        meta = CACHE.get(meta_key)
+        if meta is None and not revalidate:
+            # valideerijateta (vanad) kirjed võivad olla parandamata; oletusmeta teeb need
+            # taustavärskendajale nähtavaks, muidu ei küsitaks neid kunagi üle
+            fixed = fix_decimal_commas(cached)
+            if fixed != cached:
+                CACHE.set(cache_key, fixed, expire=CACHE_RETAIN)
+            CACHE.set(meta_key, _default_meta(time.time()), expire=CACHE_RETAIN)
+            return fixed
+        if meta is not None and not revalidate and _meta_is_fresh(meta):
+            return cached
 
     url = BASE_RDF + skill_name
-    async with SEM, RATE:
-        for attempt in range(RETRIES):
-            try:
+    headers = dict(HEADERS)
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    timeouts = 0
+    reason = None
+    for attempt in range(RETRIES):
+        if attempt:
+            RETRIES_TOTAL.inc(reason=reason)
+            track("retries")
+        slot = None
+        try:
+            async with LIMITER.slot() as slot:
+                LIMITER_WAIT_SECONDS.observe(slot.waited)
+                track("limiter_wait_sec", slot.waited)
                 async with async_timeout.timeout(HTTP_TIMEOUT_SEC):
-                    async with session.get(url, headers=HEADERS, ssl=False) as resp:
+                    async with session.get(url, headers=headers, ssl=False) as resp:
+                        slot.observe(resp)
+                        if slot.throttled:
+                            # LIMITER peatab uued päringud (Retry-After / backoff), proovi uuesti
+                            reason = "throttled"
+                            _observe_fetch(slot, reason)
+                            continue
+                        if resp.status == 304 and cached is not None and meta is not None:
+                            new_meta = _cache_validators(resp, time.time())
+                            new_meta["etag"] = new_meta["etag"] or meta.get("etag")
+                            new_meta["last_modified"] = new_meta["last_modified"] or meta.get("last_modified")
+                            CACHE.set(meta_key, new_meta, expire=CACHE_RETAIN)
+                            CACHE.touch(cache_key, expire=CACHE_RETAIN)
+                            _observe_fetch(slot, "not_modified")
+                            return cached
+                        if resp.status in NEGATIVE_STATUSES:
+                            # puuduv leht: uuesti proovimine ei aita; vana koopiat pole enam vaja värskendada
+                            _observe_fetch(slot, "missing")
+                            for key in (cache_key, meta_key, _record_key(skill_name)):
+                                CACHE.delete(key)
+                            raise _remember_failure(skill_name, "404", f"HTTP {resp.status}")
                         resp.raise_for_status()
                         blob = await resp.read()
                         blob = fix_decimal_commas(blob)  # ⬅️ parandame ENNE cache’i
-                        CACHE.set(cache_key, blob, expire=CACHE_TTL)
+                        CACHE.delete(_record_key(skill_name))
+                        CACHE.set(cache_key, blob, expire=CACHE_RETAIN)
+                        CACHE.set(meta_key, _cache_validators(resp, time.time()), expire=CACHE_RETAIN)
+                        _observe_fetch(slot, "ok")
+                        BYTES_DOWNLOADED.inc(len(blob))
+                        track("bytes_downloaded", len(blob))
                         return blob
-            except Exception:
-                await asyncio.sleep(0.5 * (2 ** attempt))
-        raise RuntimeError(f"Failed to fetch {skill_name} after {RETRIES} attempts")
-
-def _parse_graph_from_bytes(xml_bytes: bytes) -> Graph:
+        except FetchError:
+            raise
+        except asyncio.TimeoutError:
+            timeouts += 1
+            reason = "timeout"
+            _observe_fetch(slot, reason)
+        except Exception:
+            reason = "error"
+            _observe_fetch(slot, reason)
+        # slot on vabastatud: backoff ei hoia kinni paralleelsuse kohta
+        if attempt + 1 < RETRIES:
+            await asyncio.sleep(0.5 * (2 ** attempt))
+    if timeouts == RETRIES:
+        raise _remember_failure(skill_name, "timeout", f"{RETRIES} x {HTTP_TIMEOUT_SEC}s")
+    raise FetchError(skill_name, "error", f"failed after {RETRIES} attempts")
+
+def _observe_fetch(slot, result: str):
+    if slot is None:
+        return
+    elapsed = time.monotonic() - slot.started
+    FETCH_SECONDS.observe(elapsed, result=result)
+    track("fetches")
+    track("fetch_sec", elapsed)
+
+def _parse_graph_from_bytes(xml_bytes: bytes):
+    from rdflib import Graph
     g = Graph()
     g.parse(data=xml_bytes, format="xml")
     return g
 
-def _extract_subject_and_description(g: Graph, skill_name: str):
+def _extract_subject_and_description(g, skill_name: str):
+    g = as_index(g)
     subject_uri = None
     description = ""
     label_match = uri_to_label(skill_name).lower()
 
-    for s in g.subjects(predicate=SCHEMA.name):
-        name_val = str(g.value(s, SCHEMA.name, default="")).strip().lower()
+    for s in g.subjects(predicate=SCHEMA_NAME):
+        name_val = str(g.value(s, SCHEMA_NAME, default="")).strip().lower()
         if name_val == label_match:
             subject_uri = s
-            description = str(g.value(s, SCHEMA.description, default=""))
+            description = str(g.value(s, SCHEMA_DESCRIPTION, default=""))
             break
 
     if subject_uri is None:
-        for s in g.subjects(predicate=RDFS.label):
-            name_val = str(g.value(s, RDFS.label, default="")).strip().lower()
+        for s in g.subjects(predicate=RDFS_LABEL):
+            name_val = str(g.value(s, RDFS_LABEL, default="")).strip().lower()
             if name_val == label_match:
                 subject_uri = s
-                description = str(g.value(s, SCHEMA.description, default=""))
+                description = str(g.value(s, SCHEMA_DESCRIPTION, default=""))
                 break
 
     if subject_uri is None:
-        subject_uri = URIRef(BASE_RDF + skill_name)
+        subject_uri = g.uri(BASE_RDF + skill_name)
 
     return subject_uri, description
 
+# predikaadid, mida _process_one vajab; stream-režiimis jäetakse ainult need alles
+OUT_RELATIONS = OUT_PREDICATES
+IN_RELATIONS = IN_PREDICATES
+EXTRACT_PREDICATES = frozenset(str(p) for p in (
+    SCHEMA_NAME, SCHEMA_DESCRIPTION, RDFS_LABEL,
+    ESCO_LINK, ESCO_VASTE, OSK_REG_KOOD, VERB, RELEVANT_OCCUPATION,
+    *OUT_RELATIONS,
+))
+
+def _record_from_graph(g, skill_name: str) -> dict:
+    """
+    Koostab kompaktse kirje (ainult stringid/listid) nii rdflib Graph'ist kui TripleIndex'ist.
+    """
+    g = as_index(g)
+    subject_uri, description = _extract_subject_and_description(g, skill_name)
+
+    relevant_occupations = []
+    for occ in g.objects(subject=subject_uri, predicate=RELEVANT_OCCUPATION):
+        occ_uri = str(occ)
+        occ_label = str(g.value(occ, RDFS_LABEL, default=uri_to_label(occ_uri)))
+        relevant_occupations.append({
+            "uri": occ_uri,
+            "label": occ_label
+        })
+
+    # kõik seosed ühe läbimisega üle lehe tripletite (mõlemas suunas)
+    objects, subjects = split_triples(g.triples(), str(subject_uri))
+
+    return {
+        "subject": str(subject_uri),
+        "description": str(description),
+        "esco_link": str(g.value(subject_uri, ESCO_LINK, default="")),
+        "esco_vaste": str(g.value(subject_uri, ESCO_VASTE, default="")),
+        "osk_reg_kood": str(g.value(subject_uri, OSK_REG_KOOD, default="")),
+        "skill_verb": str(g.value(subject_uri, VERB, default="")),
+        "relevant_occupations": relevant_occupations,
+        "objects": objects,
+        "subjects": subjects,
+    }
+
+def extract_record(xml_bytes: bytes, skill_name: str, mode: str = None) -> dict:
+    """
+    Parsib ühe lehe RDF-i ja tagastab _process_one jaoks vajaliku kirje.
+    Vaikimisi stream-parser; kui see XML-iga hakkama ei saa, proovitakse rdflib'iga.
+    """
+    mode = mode or RDF_EXTRACTOR
+    if mode == "stream":
+        try:
+            return _record_from_graph(parse_triples(xml_bytes, EXTRACT_PREDICATES), skill_name)
+        except (ET.ParseError, ValueError) as e:
+            print(f"[warn] {skill_name}: stream parse failed ({e}), falling back to rdflib")
+    return _record_from_graph(_parse_graph_from_bytes(xml_bytes), skill_name)
+
+def _timed_extract(xml_bytes: bytes, skill_name: str, mode: str = None):
+    """
+    extract_record koos töötajas mõõdetud parsimisajaga: (kirje, sekundid).
+    """
+    started = time.perf_counter()
+    rec = extract_record(xml_bytes, skill_name, mode)
+    return rec, time.perf_counter() - started
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+def _gil_disabled() -> bool:
+    # free-threaded (3.13t+) build'is saab parsida lõimedes
+    return hasattr(sys, "_is_gil_enabled") and not sys._is_gil_enabled()
+
+def get_parse_executor():
+    """
+    Tagastab jagatud parse-executori (luuakse esimesel kasutusel) või None, kui
+    PARSE_EXECUTOR == "inline". "auto" valib free-threaded build'is lõimed, muidu protsessid.
+    """
+    global _parse_pool
+    kind = PARSE_EXECUTOR
+    if kind == "auto":
+        kind = "thread" if _gil_disabled() else "process"
+    if kind == "inline":
+        return None
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            workers = PARSE_WORKERS or os.cpu_count() or 1
+            if kind == "thread":
+                _parse_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rdf-parse")
+            else:
+                # spawn: fork mitmelõimelisest Flaski protsessist pole turvaline
+                _parse_pool = ProcessPoolExecutor(max_workers=workers,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+        return _parse_pool
+
+def shutdown_parse_executor():
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=True, cancel_futures=True)
+            _parse_pool = None
+
+def _replace_broken_pool(broken):
+    """
+    Sulgeb katkise jagatud pooli ja tagastab uue (või None, kui parsitakse inline).
+    Kui mõni teine kutse on pooli juba asendanud, tagastab selle.
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is broken:
+            _parse_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+    return get_parse_executor()
+
+async def _extract_off_loop(xml_bytes: bytes, skill_name: str, executor=None) -> dict:
+    """
+    Käivitab extract_record'i executoris, et XML-i parsimine ei blokeeriks event loop'i.
+    Töötaja saadab tagasi ainult kompaktse kirje.
+    """
+    started = time.perf_counter()
+    if executor is None:
+        rec, parse_sec = _timed_extract(xml_bytes, skill_name)
+    else:
+        loop = asyncio.get_running_loop()
+        try:
+            rec, parse_sec = await loop.run_in_executor(executor, _timed_extract, xml_bytes, skill_name,
+                                                        RDF_EXTRACTOR)
+        except BrokenProcessPool:
+            # katkine pool asendatakse uuega; alles teise katkestuse korral parsitakse loop'is
+            fresh = _replace_broken_pool(executor)
+            try:
+                if fresh is None:
+                    raise BrokenProcessPool("no parse executor")
+                rec, parse_sec = await loop.run_in_executor(fresh, _timed_extract, xml_bytes, skill_name,
+                                                            RDF_EXTRACTOR)
+            except BrokenProcessPool:
+                print(f"[warn] parse pool broke, parsing {skill_name} inline")
+                rec, parse_sec = _timed_extract(xml_bytes, skill_name)
+    # parsimine ja ootamine eraldi: järjekord ja pickle'i edasi-tagasi ei lähe parse_sec'i alla
+    wait_sec = max(0.0, time.perf_counter() - started - parse_sec)
+    PARSE_SECONDS.observe(parse_sec)
+    PARSE_WAIT_SECONDS.observe(wait_sec)
+    track("parse_sec", parse_sec)
+    track("parse_wait_sec", wait_sec)
+    return rec
+
+def _blob_is_fresh(skill_name: str) -> bool:
+    meta = CACHE.get(_meta_key(skill_name))
+    # metata blob pole värske: _fetch_rdf kirjutab sellele oletusmeta
+    return meta is not None and _meta_is_fresh(meta)
+
+async def _load_record(session: aiohttp.ClientSession, skill_name: str, executor=None,
+                       revalidate: bool = False) -> dict:
+    """
+    Tagastab oskuse parsitud kirje. Kirjed on cache'is võtmega (oskus, EXTRACTOR_VERSION)
+    ja kehtivad seni, kuni nende blob on värske või server vastab 304-ga, nii et soe
+    kraapimine XML-i üldse ei loe ega parsi. revalidate=True küsib serverilt alati üle,
+    v.a negatiivses cache'is olevaid lehti, mida ei küsita enne NEGATIVE_TTL möödumist.
+    """
+    failure = CACHE.get(_negative_key(skill_name))
+    if failure is not None:
+        # teadaolevalt katkine leht: ära proovi enne NEGATIVE_TTL möödumist uuesti
+        RECORDS_TOTAL.inc(source="negative")
+        track("negative_hits")
+        raise FetchError(skill_name, failure["kind"], failure.get("detail", ""), cached=True)
+
+    rec_key = _record_key(skill_name)
+    rec = CACHE.get(rec_key)
+    if rec is not None and not revalidate and _blob_is_fresh(skill_name):
+        RECORDS_TOTAL.inc(source="cache")
+        track("record_cache_hits")
+        return rec
+
+    xml = await _fetch_rdf(session, skill_name, revalidate=revalidate)
+    rec = CACHE.get(rec_key)  # 304 korral jääb kirje alles, uus blob kustutab selle
+    if rec is None:
+        try:
+            rec = await _extract_off_loop(xml, skill_name, executor)
+        except Exception as e:
+            raise _remember_failure(skill_name, "parse", str(e)) from e
+        track("parsed")
+        CACHE.set(rec_key, rec, expire=CACHE_RETAIN)
+        RECORDS_TOTAL.inc(source="parsed")
+    else:
+        RECORDS_TOTAL.inc(source="revalidated")
+    return rec
+
 async def _process_one(session: aiohttp.ClientSession, skill_name: str, depth: int,
-                       data: dict, depths: dict, q: asyncio.Queue, visited: set):
+                       data: dict, depths: dict, q: asyncio.Queue, visited: set, executor=None,
+                       options: CrawlOptions = None):
     """
     Laeb ühe oskuse RDF-i, täidab väljad ja lisab järgmiseks sammuks naabrite nimed järjekorda.
     """
+    options = options or CrawlOptions.from_globals()
+    follow = not options.limit_recursion or depth + 1 <= options.max_depth
     try:
-        xml = await _fetch_rdf(session, skill_name)
-        g_rdf = _parse_graph_from_bytes(xml)
-        subject_uri, description = _extract_subject_and_description(g_rdf, skill_name)
+        rec = await _load_record(session, skill_name, executor)
 
         label = uri_to_label(skill_name)
         key = normalize_key(skill_name)
         depths[key] = min(depth, depths.get(key, depth))
 
-        relevant_occupations = []
-        for occ in g_rdf.objects(subject=subject_uri, predicate=RELEVANT_OCCUPATION):
-            occ_uri = str(occ)
-            occ_label = str(g_rdf.value(occ, RDFS.label, default=uri_to_label(occ_uri)))
-            relevant_occupations.append({
-                "uri": occ_uri,
-                "label": occ_label
-            })
-
         node = data.get(key)
         if not node:
             node = data[key] = {
                 "label": label,
-                "uri": subject_uri,
-                "description": description,
+                "uri": rec["subject"],
+                "description": rec["description"],
                 "link": DISPLAY_URL + skill_name,
                 "subskills": [],
                 "prerequisites": [],
                 "competencies": [],
                 "tegevusnaitajad": [],
                 "knobitid": [],
-                "esco_link": str(g_rdf.value(subject_uri, ESCO_LINK, default="")),
-                "esco_vaste": str(g_rdf.value(subject_uri, ESCO_VASTE, default="")),
-                "osk_reg_kood": str(g_rdf.value(subject_uri, OSK_REG_KOOD, default="")),
-                "skill_verb": str(g_rdf.value(subject_uri, VERB, default="")),
-                "relevant_occupations": relevant_occupations,
+                "esco_link": rec["esco_link"],
+                "esco_vaste": rec["esco_vaste"],
+                "osk_reg_kood": rec["osk_reg_kood"],
+                "skill_verb": rec["skill_verb"],
+                "relevant_occupations": rec["relevant_occupations"],
             }
-
-        # 1) subskills
-        for o in g_rdf.objects(subject=subject_uri, predicate=OSAOSKUS):
-            sub_uri = str(o)
-            sub_name = uri_to_skill_name(sub_uri)
-            sub_key = _skill_key(sub_name)
-            if sub_key not in node["subskills"]:
-                node["subskills"].append(sub_key)
-            if not LIMIT_RECURSION or depth + 1 <= MAX_DEPTH:
-                if sub_key not in visited:
-                    visited.add(sub_key)
-                    await q.put((sub_name, depth + 1))
-
-        # 2) üles: koosneja
-        for s in g_rdf.subjects(predicate=OSAOSKUS, object=subject_uri):
-            parent_name = uri_to_skill_name(str(s))
-            key = _skill_key(parent_name)
-            if not LIMIT_RECURSION or depth + 1 <= MAX_DEPTH:
-                if key not in visited:
-                    visited.add(key)
+            NODES_TOTAL.inc()
+            track("nodes")
+
+        # (väli, võti) paarid: duplikaatide kontroll O(1), mitte lineaarne listist otsimine
+        linked = {(rel.field, k) for rel in RELATION_TYPES for k in node.get(rel.field, ())}
+        links_before = len(linked)
+
+        # seosed registrist: sama käsitleja iga seosetüübi ja suuna jaoks
+        for rel in RELATION_TYPES:
+            for o in rec["objects"].get(rel.predicate, ()):
+                target_name = uri_to_skill_name(str(o))
+                target_key = _skill_key(target_name)
+                if (rel.field, target_key) not in linked:
+                    linked.add((rel.field, target_key))
+                    node.setdefault(rel.field, []).append(target_key)
+                if follow and rel.follow and target_key not in visited:
+                    visited.add(target_key)
+                    await q.put((target_name, depth + 1))
+
+            # üles: node'id, mis seda node'i listivad
+            if rel.direction != "both":
+                continue
+            for s in rec["subjects"].get(rel.predicate, ()):
+                parent_name = uri_to_skill_name(str(s))
+                parent_key = _skill_key(parent_name)
+                if follow and rel.follow and parent_key not in visited:
+                    visited.add(parent_key)
                     await q.put((parent_name, depth + 1))
 
-        # 3) alla: eeldusOskus
-        for o in g_rdf.objects(subject=subject_uri, predicate=SEOTUD_OSKUS):
-            pre_uri = str(o)
-            pre_name = uri_to_skill_name(pre_uri)
-            pre_key = _skill_key(pre_name)
-            if pre_key not in node["prerequisites"]:
-                node["prerequisites"].append(pre_key)
-            if not LIMIT_RECURSION or depth + 1 <= MAX_DEPTH:
-                if pre_key not in visited:
-                    visited.add(pre_key)
-                    await q.put((pre_name, depth + 1))
-
-        # 4) üles: eeldusOskus
-        for s in g_rdf.subjects(predicate=SEOTUD_OSKUS, object=subject_uri):
-            parent_name = uri_to_skill_name(str(s))
-            key = _skill_key(parent_name)
-            if not LIMIT_RECURSION or depth + 1 <= MAX_DEPTH:
-                if key not in visited:
-                    visited.add(key)
-                    await q.put((parent_name, depth + 1))
-
-        # 5) alla: kompetents sisaldab tegevusnäitajaid
-        for o in g_rdf.objects(subject=subject_uri, predicate=KOMP_SISALDAB_TN):
-            tn_uri = str(o)
-            tn_name = uri_to_skill_name(tn_uri)
-            tn_key = _skill_key(tn_name)
-            if tn_key not in node["tegevusnaitajad"]:
-                node["tegevusnaitajad"].append(tn_key)
-            if not LIMIT_RECURSION or depth + 1 <= MAX_DEPTH:
-                if tn_key not in visited:
-                    visited.add(tn_key)
-                    await q.put((tn_name, depth + 1))
-
-        # 6) alla: Tegevusnäitaja sisaldab knobiteid
-        for o in g_rdf.objects(subject=subject_uri, predicate=TN_SISALDAB_KNOBITIT):
-            kn_uri = str(o)
-            kn_name = uri_to_skill_name(kn_uri)
-            kn_key = _skill_key(kn_name)
-            if kn_key not in node["knobitid"]:
-                node["knobitid"].append(kn_key)
-            if not LIMIT_RECURSION or depth + 1 <= MAX_DEPTH:
-                if kn_key not in visited:
-                    visited.add(kn_key)
-                    await q.put((kn_name, depth + 1))
-
-        for o in g_rdf.objects(subject=subject_uri, predicate=TN_EELDAB):
-            tn_req_uri = str(o)
-            tn_req_name = uri_to_skill_name(tn_req_uri)
-            tn_req_key = _skill_key(tn_req_name)
-            if tn_req_key not in node.setdefault("tn_eeldab", []):
-                node["tn_eeldab"].append(tn_req_key)
-            if not LIMIT_RECURSION or depth + 1 <= MAX_DEPTH:
-                if tn_req_key not in visited:
-                    visited.add(tn_req_key)
-                    await q.put((tn_req_name, depth + 1))
+        if len(linked) > links_before:
+            EDGES_TOTAL.inc(len(linked) - links_before)
+            track("edges", len(linked) - links_before)
 
+    except FetchError as e:
+        if not e.cached:
+            print(f"[warn] {e}")
     except Exception as e:
         print(f"[warn] {skill_name}: {e}")
 
-async def parse_all_data_async(data_list):
+async def _seed_from_category(session, name: str, category_url: str, members: dict,
+                              depths: dict, q: asyncio.Queue, visited: set):
     """
-    Asünkroonne 'kogu graafi' kraapimine paralleelselt, külastatud-set kaitsega.
-    NB! Kui sisend on väga suur, on see siiski raske; aga kordades kiirem kui sünkroonne.
+    Lisab kategooria võtmed järjekorda jooksvalt, samal ajal kui töötajad juba RDF-e laevad.
+    Kui loendit ei saa lõpuni lugeda, eemaldatakse kategooria members'ist.
     """
+    found = members.setdefault(name, set())
+    try:
+        async for key in iter_category_keys(session, category_url):
+            found.add(key)
+            # kategooria liige on alati seeme (sügavus 0), isegi kui ta leiti enne naabrina
+            depths[key] = 0
+            if key not in visited:
+                visited.add(key)
+                await q.put((key, 0))
+    except FetchError as e:
+        # poolik loend ei ole kategooria liikmesus: nimi jääb members'ist välja
+        members.pop(name, None)
+        print(f"[warn] category {name} incomplete: {e}")
+
+async def _crawl(data_list, category_urls=None, options: CrawlOptions = None, on_node=None):
+    global _last_summary
+    options = options or CrawlOptions.from_globals()
     data, depths = {}, {}
+    members = {}
     visited = set()
     q: asyncio.Queue = asyncio.Queue()
 
@@ -357,42 +840,112 @@ async def parse_all_data_async(data_list):
             visited.add(key)
             q.put_nowait((s, 0))
 
-    async with aiohttp.ClientSession() as session:
-        async def worker():
-            while True:
-                try:
-                    skill_name, depth = await q.get()
-                except asyncio.CancelledError:
-                    return
-                await _process_one(session, skill_name, depth, data, depths, q, visited)
-                q.task_done()
-
-        workers = [asyncio.create_task(worker()) for _ in range(MAX_CONCURRENCY)]
-        await q.join()
-        for w in workers:
-            w.cancel()
-        await asyncio.gather(*workers, return_exceptions=True)
-
-    sample = list(data.keys())
-    print(f"✅ Andmestikus olevad oskused: {sample}")
-    if "Probleemilahendus" not in data:
-        print("❌ Probleemilahendus puudub data-s!")
-
+    executor = get_parse_executor()
+
+    # kokkuvõte elab contextvar'is, töötajate task'id pärivad selle
+    with crawl_summary() as summary:
+        import aiohttp
+        async with aiohttp.ClientSession() as session:
+            async def worker():
+                while True:
+                    try:
+                        skill_name, depth = await q.get()
+                    except asyncio.CancelledError:
+                        return
+                    QUEUE_DEPTH.set(q.qsize())
+                    track_peak("queue_depth", q.qsize())
+                    await _process_one(session, skill_name, depth, data, depths, q, visited,
+                                       executor=executor, options=options)
+                    if on_node is not None:
+                        key = _skill_key(skill_name)
+                        if key in data:
+                            on_node(key, data[key], depths.get(key, depth))
+                    q.task_done()
+
+            workers = [asyncio.create_task(worker()) for _ in range(MAX_CONCURRENCY)]
+            # kategooriad loetakse samaaegselt; q.join() alles siis, kui kõik seemned on sees
+            await asyncio.gather(*(
+                _seed_from_category(session, name, url, members, depths, q, visited)
+                for name, url in (category_urls or {}).items()
+            ))
+            if category_urls:
+                summary.mark("categories")
+            await q.join()
+            summary.mark("crawl")
+            QUEUE_DEPTH.set(0)
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    # struktureeritud kokkuvõte kõigi võtmete väljaprintimise asemel
+    _last_summary = summary.as_dict()
+    _last_summary.update(nodes=len(data), seeds=len(data_list),
+                         categories={name: len(keys) for name, keys in members.items()})
+    for stage, sec in _last_summary["stages_sec"].items():
+        STAGE_SECONDS.observe(sec, stage=stage)
+    if CRAWL_SUMMARY:
+        print(f"[crawl] {json.dumps(_last_summary, ensure_ascii=False)}")
+
+    return data, depths, members
+
+async def parse_all_data_async(data_list, options: CrawlOptions = None, on_node=None):
+    """
+    Asünkroonne 'kogu graafi' kraapimine paralleelselt, külastatud-set kaitsega.
+    NB! Kui sisend on väga suur, on see siiski raske; aga kordades kiirem kui sünkroonne.
+    Kui on antud on_node(key, info, depth), kutsutakse seda iga valmis node'i kohta kohe.
+    """
+    data, depths, _ = await _crawl(data_list, options=options, on_node=on_node)
     return data, depths
 
+async def crawl_registry_async(category_urls=None, options: CrawlOptions = None, on_node=None):
+    """
+    Kraabib kogu registri: kategooriad (vaikimisi CATEGORY_URLS) loetakse samaaegselt
+    koos lehekülgede järgimisega ja nende võtmed lähevad otse kraapimise järjekorda.
+    Tagastab (data, depths, members), kus members on {kategooria nimi: võtmete set};
+    kategooriat, mille loend jäi poolikuks, members'is ei ole.
+    on_node nagu parse_all_data_async'il.
+    """
+    return await _crawl([], category_urls or CATEGORY_URLS, options=options, on_node=on_node)
+
 # =========================
-#        MAIN
+#   COALESCED SYNC ENTRY
 # =========================
-if __name__ == "__main__":
-    skills = get_all_data(SKILLS_URL)
-    competencies = get_all_data(COMPETENCIES_URL)
-    tegevusnaitajad = get_all_data(TEGEVUSNAITAJAD_URL)
-    knobitid = get_all_data(KNOBITID_URL)
+_CRAWLS = SingleFlight()
+
+def crawl(data_list, options: CrawlOptions = None):
+    """
+    Sünkroonne parse_all_data_async. Samaaegsed identsed kraapimised (sama seeme ja
+    seaded) jagavad ühte jooksvat tulemust. Tulemust ei tohi muuta.
+    """
+    options = options or CrawlOptions.from_globals()
+    key = ("seed", tuple(sorted({_skill_key(s) for s in data_list})), options.key())
+    return _CRAWLS.do(key, lambda: asyncio.run(parse_all_data_async(data_list, options)))
 
-    seed = skills + competencies + tegevusnaitajad + knobitid
+def crawl_registry(category_urls=None, options: CrawlOptions = None):
+    """
+    Sünkroonne crawl_registry_async, samuti kokku liidetud (nt snapshot'i ehitus ja
+    /graph fallback jagavad sama kraapimist).
+    """
+    options = options or CrawlOptions.from_globals()
+    category_urls = category_urls or CATEGORY_URLS
+    key = ("registry", tuple(sorted(category_urls.items())), options.key())
+    return _CRAWLS.do(key, lambda: asyncio.run(crawl_registry_async(category_urls, options)))
 
-    # UUS: asünkroonne täisgraafi laadimine (paralleel + cache)
-    parsed_data, depths = asyncio.run(parse_all_data_async(seed))
+# =========================
+#        MAIN
+# =========================
+if __name__ == "__main__":
+    from logic.graph_binary import save_binary
+    from logic.graph_export import GraphMLWriter
+    from logic.graph_store import GraphStore
+
+    # asünkroonne täisgraafi laadimine (kategooriad + RDF paralleelselt, cache);
+    # GraphML kirjutatakse node haaval kohe kraapimise ajal, ilma networkx'i graafita
+    with GraphMLWriter("skills_graph.graphml") as graphml:
+        parsed_data, depths, members = asyncio.run(crawl_registry_async(on_node=graphml.add_node))
+    # binaarne snapshot: kiire uuesti laadimine analüüsiks (logic.graph_binary.load_binary)
+    save_binary("skills_graph.bin", GraphStore.from_data(parsed_data, depths), members)
+    print(f"[export] {graphml.node_count} nodes, {graphml.edge_count} edges -> skills_graph.graphml, skills_graph.bin")
 
 
 parse_all_skills_recursive = parse_all_data_async
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Conditional and precompressed responses for /graph.
+
+A snapshot-backed /graph answer depends only on the snapshot version and the
+query parameters. `graph_etag` turns the two into a weak ETag, so a client
+holding the current answer gets a 304 without the server building anything.
+
+`PayloadCache` is a byte-bounded LRU of serialized bodies keyed by
+(ETag, encoding). It stores the identity body and each compressed variant
+(gzip, and brotli if the `brotli` package is installed) the first time a
+client asks for it. Popular queries, above all the full graph, are then
+served as stored bytes, without rebuilding or recompressing. Entries of an
+older snapshot are never hit again and age out of the LRU.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # valikuline sõltuvus
+    brotli = None
+
+PAYLOAD_CACHE_BYTES = 64 * 1024 ** 2   # 64 MiB kokku kõigi variantide peale
+MIN_COMPRESS_BYTES = 1024              # väiksemaid vastuseid ei pakita
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5                     # 11 on täisgraafi jaoks liiga aeglane
+
+
+def graph_etag(version, *params):
+    """
+    Weak ETag for snapshot `version` and the normalized query `params`.
+    """
+    digest = hashlib.sha1(repr(params).encode("utf-8")).hexdigest()[:16]
+    return f"v{version}-{digest}"
+
+
+def encodings():
+    """
+    Content codings the server can produce, in order of preference.
+    """
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("br encoding requires the 'brotli' package")
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        # mtime=0: sama sisu annab samad baidid
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unknown content encoding: {encoding}")
+
+
+class PayloadCache:
+    """
+    Thread-safe LRU of response bodies keyed by (etag, encoding), bounded by
+    the total size of the stored bytes. `encoding` None is the identity body.
+    """
+
+    def __init__(self, max_bytes=PAYLOAD_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def _get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def _put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def _encode(self, etag, body, encoding):
+        if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+            return body, None
+        encoded = compress(body, encoding)
+        self._put((etag, encoding), encoded)
+        return encoded, encoding
+
+    def fetch(self, etag, encoding=None):
+        """
+        Stored (body, encoding) for `etag`, or None on a miss. A missing
+        compressed variant is made from the stored identity body.
+        """
+        if encoding is not None:
+            encoded = self._get((etag, encoding))
+            if encoded is not None:
+                return encoded, encoding
+        body = self._get((etag, None))
+        if body is None:
+            return None
+        return self._encode(etag, body, encoding)
+
+    def store(self, etag, body, encoding=None):
+        """
+        Store the identity `body` for `etag` and return (body, encoding) in the
+        requested encoding. Bodies under MIN_COMPRESS_BYTES stay uncompressed.
+        """
+        self._put((etag, None), body)
+        return self._encode(etag, body, encoding)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -0,0 +1,294 @@
+"""
+SQLite-backed store for job entries (ametikohad).
+
+Replaces rewriting the whole `ametikohad.json` on every change: each job is a
+row with a stable integer id, writes touch only their own row inside a
+transaction, and the database runs in WAL mode so readers are not blocked by a
+writer. Skills are also kept in an indexed `job_skills` table, under the name
+as typed and under its normalised key (logic.skill_index), so "which jobs need
+this skill" does not scan every job.
+
+On first open an empty database imports the legacy JSON file once, in file
+order, so existing list indexes keep pointing at the same jobs.
+
+`revision` is a counter in the database itself. Triggers bump it in the same
+transaction as every change to `jobs`, so indexes built from the jobs notice
+writes made by other worker processes or by external tools too.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from logic.skill_index import skill_index_key
+
+BUSY_TIMEOUT_SEC = 10          # kaua kirjutaja lukku ootab, enne kui loobub
+JOB_FIELDS = ("name", "description", "note", "skills")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    name        TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    note        TEXT NOT NULL DEFAULT '',
+    skills      TEXT NOT NULL DEFAULT '[]',
+    extra       TEXT NOT NULL DEFAULT '{}',
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_name ON jobs(name);
+CREATE TABLE IF NOT EXISTS job_skills (
+    job_id    INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    skill     TEXT NOT NULL,
+    skill_key TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (job_id, skill)
+);
+CREATE INDEX IF NOT EXISTS job_skills_skill ON job_skills(skill);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('revision', '0');
+CREATE TRIGGER IF NOT EXISTS jobs_revision_insert AFTER INSERT ON jobs BEGIN
+    UPDATE store_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'revision';
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_revision_update AFTER UPDATE ON jobs BEGIN
+    UPDATE store_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'revision';
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_revision_delete AFTER DELETE ON jobs BEGIN
+    UPDATE store_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'revision';
+END;
+"""
+
+
+def _clean_skills(skills):
+    # tühjad ja korduvad oskused välja, järjekord jääb
+    seen, out = set(), []
+    for skill in skills or ():
+        skill = str(skill).strip()
+        if skill and skill not in seen:
+            seen.add(skill)
+            out.append(skill)
+    return out
+
+
+class JobStore:
+    """
+    Jobs in one SQLite file. Safe to share between threads: every thread gets
+    its own connection. Jobs are returned as dicts with an "id" key plus the
+    fields they were saved with, listed in creation order.
+    """
+
+    def __init__(self, path, legacy_json=None):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        self._upgrade(conn)
+        if legacy_json is not None:
+            self._migrate_json(Path(legacy_json))
+
+    # --- ühendused ---
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SEC, isolation_level=None,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _write(self):
+        return _WriteTransaction(self._conn())
+
+    @property
+    def revision(self):
+        """
+        Database-side change counter (see the module docstring); it grows with every
+        committed change to a job, whichever process made it.
+        """
+        row = self._conn().execute("SELECT value FROM store_meta WHERE key = 'revision'").fetchone()
+        return int(row["value"])
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    # --- migratsioon ---
+    def _upgrade(self, conn):
+        # skill_key lisandus hiljem: vanemates failides lisa veerg ja täida see
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(job_skills)")}
+        if "skill_key" not in columns:
+            with self._write() as tx:
+                tx.execute("ALTER TABLE job_skills ADD COLUMN skill_key TEXT NOT NULL DEFAULT ''")
+                rows = tx.execute("SELECT rowid, skill FROM job_skills").fetchall()
+                tx.executemany("UPDATE job_skills SET skill_key = ? WHERE rowid = ?",
+                               [(skill_index_key(r["skill"]), r["rowid"]) for r in rows])
+        conn.execute("CREATE INDEX IF NOT EXISTS job_skills_key ON job_skills(skill_key)")
+
+    def _migrate_json(self, json_path):
+        with self._write() as conn:
+            done = conn.execute("SELECT 1 FROM store_meta WHERE key = 'json_migrated'").fetchone()
+            if done is not None:
+                return 0
+            jobs = []
+            if json_path.exists():
+                with json_path.open("r", encoding="utf-8") as f:
+                    jobs = json.load(f)
+            for job in jobs:
+                self._insert(conn, job)
+            conn.execute("INSERT INTO store_meta (key, value) VALUES ('json_migrated', ?)",
+                         (json.dumps({"source": str(json_path), "jobs": len(jobs), "at": time.time()}),))
+            return len(jobs)
+
+    # --- read ---
+    @staticmethod
+    def _row_to_job(row):
+        job = {"id": row["id"], **json.loads(row["extra"])}
+        job.update(name=row["name"], description=row["description"], note=row["note"],
+                   skills=json.loads(row["skills"]))
+        return job
+
+    def all(self):
+        rows = self._conn().execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    def get(self, job_id):
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def id_at(self, index):
+        """
+        Id of the job at list position `index` (creation order), or None.
+        """
+        if not isinstance(index, int) or isinstance(index, bool) or index < 0:
+            return None
+        row = self._conn().execute("SELECT id FROM jobs ORDER BY id LIMIT 1 OFFSET ?", (index,)).fetchone()
+        return row[0] if row is not None else None
+
+    def jobs_with_skill(self, *names):
+        """
+        Ids of jobs that list any of `names` (a skill key, label or typed name),
+        matched on the normalised key via the job_skills index.
+        """
+        return [job["id"] for job in self.lookup_skill(*names)]
+
+    def lookup_skill(self, *names):
+        """
+        {"id", "name"} of every job that lists any of `names`, in id order.
+        """
+        keys = sorted({skill_index_key(n) for n in names})
+        if not keys:
+            return []
+        marks = ",".join("?" * len(keys))
+        rows = self._conn().execute(
+            f"SELECT DISTINCT jobs.id, jobs.name FROM job_skills JOIN jobs ON jobs.id = job_skills.job_id "
+            f"WHERE job_skills.skill_key IN ({marks}) ORDER BY jobs.id", keys).fetchall()
+        return [{"id": r["id"], "name": r["name"]} for r in rows]
+
+    # --- write ---
+    @staticmethod
+    def _columns(job):
+        job = dict(job or {})
+        job.pop("id", None)
+        skills = _clean_skills(job.pop("skills", []))
+        values = {f: str(job.pop(f, "") or "") for f in ("name", "description", "note")}
+        return values, skills, job
+
+    def _insert(self, conn, job):
+        values, skills, extra = self._columns(job)
+        cur = conn.execute(
+            "INSERT INTO jobs (name, description, note, skills, extra, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (values["name"], values["description"], values["note"],
+             json.dumps(skills, ensure_ascii=False), json.dumps(extra, ensure_ascii=False), time.time()))
+        self._set_skills(conn, cur.lastrowid, skills)
+        return cur.lastrowid
+
+    @staticmethod
+    def _set_skills(conn, job_id, skills):
+        conn.execute("DELETE FROM job_skills WHERE job_id = ?", (job_id,))
+        conn.executemany("INSERT INTO job_skills (job_id, skill, skill_key) VALUES (?, ?, ?)",
+                         [(job_id, s, skill_index_key(s)) for s in skills])
+
+    def create(self, job):
+        """
+        Insert a job and return its new id.
+        """
+        with self._write() as conn:
+            return self._insert(conn, job)
+
+    def update(self, job_id, job):
+        """
+        Replace the fields of job `job_id`. Returns False if it does not exist.
+        """
+        values, skills, extra = self._columns(job)
+        with self._write() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET name = ?, description = ?, note = ?, skills = ?, extra = ?, updated_at = ? "
+                "WHERE id = ?",
+                (values["name"], values["description"], values["note"],
+                 json.dumps(skills, ensure_ascii=False), json.dumps(extra, ensure_ascii=False),
+                 time.time(), job_id))
+            if cur.rowcount == 0:
+                return False
+            self._set_skills(conn, job_id, skills)
+            return True
+
+    def delete(self, job_id):
+        with self._write() as conn:
+            return conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount > 0
+
+    def replace_all(self, jobs):
+        """
+        Replace every job in one transaction (old save_jobs semantics). Ids of
+        jobs that keep their "id" are preserved.
+        """
+        with self._write() as conn:
+            conn.execute("DELETE FROM jobs")
+            for job in jobs:
+                job_id = job.get("id") if isinstance(job, dict) else None
+                if isinstance(job_id, int):
+                    values, skills, extra = self._columns(job)
+                    conn.execute(
+                        "INSERT INTO jobs (id, name, description, note, skills, extra, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (job_id, values["name"], values["description"], values["note"],
+                         json.dumps(skills, ensure_ascii=False), json.dumps(extra, ensure_ascii=False),
+                         time.time()))
+                    self._set_skills(conn, job_id, skills)
+                else:
+                    self._insert(conn, job)
+
+
+class _WriteTransaction:
+    """
+    BEGIN IMMEDIATE ... COMMIT/ROLLBACK: the write lock is taken up front, so
+    two concurrent writers queue up instead of one failing mid-transaction.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._conn.execute("ROLLBACK")
+            return False
+        self._conn.execute("COMMIT")
+        return False
@@ -1,21 +1,35 @@
-import json
+import threading
 from pathlib import Path
 
+from logic.job_store import JobStore
+
 BASE_DIR = Path(__file__).resolve().parent.parent
-AMETID_FILE = BASE_DIR / "ametikohad.json"
+AMETID_FILE = BASE_DIR / "ametikohad.json"   # vana formaat, imporditakse andmebaasi üks kord
+AMETID_DB = BASE_DIR / "ametikohad.db"
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_job_store():
+    """
+    Shared JobStore, opened (and migrated from ametikohad.json) on first use.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = JobStore(AMETID_DB, legacy_json=AMETID_FILE)
+    return _store
 
 def load_jobs():
     """
-     Load job entries from the ametikohad.json file.
+     Load all job entries (each with its stable "id") in creation order.
      """
-    if AMETID_FILE.exists():
-        with AMETID_FILE.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return get_job_store().all()
 
 def save_jobs(jobs):
     """
-       Save a list of job entries to the ametikohad.json file.
+       Replace all job entries in one transaction. Prefer the per-job
+       JobStore methods; this rewrites every row.
        """
-    with AMETID_FILE.open("w", encoding="utf-8") as f:
-        json.dump(jobs, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+    get_job_store().replace_all(jobs)
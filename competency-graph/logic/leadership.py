@@ -0,0 +1,47 @@
+"""
+One process per host runs the background jobs.
+
+Under gunicorn every worker calls `create_app()`. The full-registry crawl and
+the cache refresher should run in only one of them, otherwise N workers make
+N crawls against the same upstream. `acquire(path)` takes a non-blocking
+exclusive lock on `path`; the process that gets it keeps it until it exits
+and becomes the leader. The other workers get False and only follow the
+snapshot file the leader writes.
+"""
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: lukku pole, iga protsess on juht
+    fcntl = None
+
+LEADER_LOCK_FILE = Path(__file__).resolve().parent.parent / "background.lock"
+
+_held = {}   # tee -> avatud fd; lukk kehtib seni, kuni fd on lahti
+
+
+def acquire(path=LEADER_LOCK_FILE):
+    """
+    True if this process holds (or now takes) the leader lock at `path`.
+    """
+    path = os.fspath(path)
+    if path in _held or fcntl is None:
+        return True
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    # pid ainult silumiseks: kes parajasti kraabib
+    os.ftruncate(fd, 0)
+    os.write(fd, f"{os.getpid()}\n".encode("ascii"))
+    _held[path] = fd
+    return True
+
+
+def release(path=LEADER_LOCK_FILE):
+    fd = _held.pop(os.fspath(path), None)
+    if fd is not None:
+        os.close(fd)
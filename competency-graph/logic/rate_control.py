@@ -0,0 +1,177 @@
+"""
+Adaptive (AIMD) rate and concurrency control for requests to the registry.
+
+`AdaptiveLimiter` replaces a fixed semaphore + token bucket. Every healthy
+response adds a little to the request rate and to the concurrency limit
+(additive increase); a 429/503 or a timeout cuts both by BACKOFF_FACTOR
+(multiplicative decrease) and pauses new requests for `Retry-After` seconds or
+a short backoff. Responses that are much slower than the fastest of the last
+LATENCY_WINDOW full 200 responses stop the increase, so throughput settles just
+below what the server handles. The baseline is windowed and ignores 304/404
+answers, so one unusually fast response cannot stop the growth for good.
+
+State is guarded by a threading lock and waiting is done with asyncio.sleep,
+so one limiter can be shared by crawls running in different event loops
+(Flask request threads, the snapshot and cache refreshers).
+"""
+import asyncio
+import email.utils
+import threading
+import time
+from collections import deque
+
+THROTTLE_STATUSES = frozenset({429, 503})
+BACKOFF_FACTOR = 0.5          # kordaja ülekoormuse korral
+INCREASE_PER_SEC = 1.0        # kui palju req/s sekundis juurde, kui server on terve
+LATENCY_TOLERANCE = 3.0       # vastus on "aeglane", kui see on üle N korra kiireimast
+LATENCY_WINDOW = 50           # kiireim vastus leitakse viimase N täis-200 vastuse seast
+PAUSE_SEC = 1.0               # paus pärast ülekoormust, kui Retry-After puudub
+MAX_PAUSE_SEC = 60.0
+_POLL_SEC = 0.02
+
+
+def parse_retry_after(value, now=None):
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+class _Slot:
+    """
+    One acquired request slot. Call `observe(resp)` once the response status is
+    known; leaving the `async with` block reports the outcome to the limiter.
+    """
+    __slots__ = ("outcome", "status", "retry_after", "started", "waited")
+
+    def __init__(self, waited=0.0):
+        self.outcome = None
+        self.status = None
+        self.retry_after = None
+        self.started = time.monotonic()
+        self.waited = waited  # kaua slot'i ootama pidi
+
+    def observe(self, resp):
+        self.status = resp.status
+        if resp.status in THROTTLE_STATUSES:
+            self.outcome = "throttled"
+            self.retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+        elif resp.status >= 500:
+            self.outcome = "error"
+        else:
+            self.outcome = "ok"  # ka 304/404: server vastas kiiresti ja normaalselt
+        return self
+
+    @property
+    def throttled(self):
+        return self.outcome == "throttled"
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limiter on requests per second and requests in flight.
+    """
+
+    def __init__(self, rate=8.0, concurrency=32, min_rate=0.5, max_rate=64.0,
+                 min_concurrency=1, max_concurrency=128):
+        self.min_rate, self.max_rate = min_rate, max_rate
+        self.min_concurrency, self.max_concurrency = min_concurrency, max_concurrency
+        self._rate = float(rate)
+        self._concurrency = float(concurrency)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._next_at = 0.0          # millal järgmine päring tohib alata (monotonic)
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)   # viimased täis-200 latentsused
+        self._stats = {"ok": 0, "throttled": 0, "error": 0}
+
+    # --- slots ---
+    async def acquire(self):
+        requested = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max(self._paused_until - now, self._next_at - now)
+                if wait <= 0 and self._in_flight < int(self._concurrency):
+                    self._in_flight += 1
+                    self._next_at = max(self._next_at, now) + 1.0 / self._rate
+                    return _Slot(waited=now - requested)
+            await asyncio.sleep(wait if wait > 0 else _POLL_SEC)
+
+    def release(self, slot):
+        now = time.monotonic()
+        latency = now - slot.started
+        outcome = slot.outcome or "error"
+        with self._lock:
+            self._in_flight -= 1
+            self._stats[outcome] += 1
+            if outcome == "ok":
+                self._on_success(latency, full_body=slot.status == 200)
+            elif outcome == "throttled":
+                self._on_throttle(now, slot.retry_after)
+
+    def slot(self):
+        return _SlotContext(self)
+
+    # --- AIMD ---
+    def _on_success(self, latency, full_body=True):
+        # 304/404 on kehata ja kiiremad: need ei tohi baasjoont alla suruda
+        if full_body:
+            self._latencies.append(latency)
+        if self._latencies and latency > min(self._latencies) * LATENCY_TOLERANCE:
+            return  # server aeglustub: hoia praegust taset
+        # +INCREASE_PER_SEC req/s sekundis: iga vastus lisab INCREASE_PER_SEC / rate
+        self._rate = min(self.max_rate, self._rate + INCREASE_PER_SEC / self._rate)
+        self._concurrency = min(self.max_concurrency, self._concurrency + 1.0 / self._concurrency)
+
+    def _on_throttle(self, now, retry_after):
+        # ühe ülekoormuse-laine peale vähenda ainult korra
+        if now - self._last_decrease > max(1.0, 1.0 / self._rate):
+            self._rate = max(self.min_rate, self._rate * BACKOFF_FACTOR)
+            self._concurrency = max(self.min_concurrency, self._concurrency * BACKOFF_FACTOR)
+            self._last_decrease = now
+        pause = PAUSE_SEC if retry_after is None else min(retry_after, MAX_PAUSE_SEC)
+        self._paused_until = max(self._paused_until, now + pause)
+
+    # --- inspection ---
+    def stats(self):
+        with self._lock:
+            return {
+                "rate": self._rate,
+                "concurrency": int(self._concurrency),
+                "in_flight": self._in_flight,
+                "paused_for": max(0.0, self._paused_until - time.monotonic()),
+                **self._stats,
+            }
+
+
+class _SlotContext:
+    def __init__(self, limiter):
+        self._limiter = limiter
+        self._slot = None
+
+    async def __aenter__(self):
+        self._slot = await self._limiter.acquire()
+        return self._slot
+
+    async def __aexit__(self, exc_type, exc, tb):
+        slot = self._slot
+        if exc_type is not None and slot.outcome in (None, "ok"):
+            is_timeout = issubclass(exc_type, (asyncio.TimeoutError, TimeoutError))
+            if is_timeout:
+                slot.outcome = "throttled"
+            elif slot.outcome is None:
+                slot.outcome = "error"
+        self._limiter.release(slot)
+        return False
@@ -0,0 +1,199 @@
+"""
+Size-bounded, compressed disk cache for RDF blobs and parsed records.
+
+`RdfCache` wraps a diskcache `Cache` with the same get/set/touch/delete API:
+- bytes values are compressed (zstd if the `zstandard` package is installed,
+  otherwise zlib) behind a short magic prefix; other values are stored as-is
+  and uncompressed blobs written by older versions are still read back.
+- the cache has a byte budget; once it is exceeded the least recently (or
+  least frequently) used entries are evicted.
+- hits, misses, bytes saved by compression and evictions are counted and can
+  be read with `stats()`.
+"""
+import threading
+import time
+import zlib
+
+from diskcache import Cache
+
+try:
+    import zstandard
+except ImportError:  # valikuline sõltuvus
+    zstandard = None
+
+CACHE_SIZE_LIMIT = 2 * 1024 ** 3          # 2 GiB
+CACHE_EVICTION = "least-recently-used"    # | "least-frequently-used" | "least-recently-stored"
+CACHE_COMPRESSION = "auto"                # "auto" | "zstd" | "zlib" | "none"
+COMPRESSION_LEVEL = 6
+
+_MAGIC = b"\x00rdfc"                      # RDF/XML ei alga kunagi NUL-baidiga
+_CODEC_ZLIB = b"z"
+_CODEC_ZSTD = b"s"
+_MISSING = object()
+
+
+class _Codec:
+    def __init__(self, name, level):
+        if name == "auto":
+            name = "zstd" if zstandard is not None else "zlib"
+        if name == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        if name not in ("zstd", "zlib", "none"):
+            raise ValueError(f"Unknown cache compression: {name}")
+        self.name = name
+        self.level = level
+        self._zstd_c = zstandard.ZstdCompressor(level=level) if name == "zstd" else None
+        self._zstd_d = zstandard.ZstdDecompressor() if zstandard is not None else None
+
+    def encode(self, blob):
+        if self.name == "zstd":
+            return _MAGIC + _CODEC_ZSTD + self._zstd_c.compress(blob)
+        if self.name == "zlib":
+            return _MAGIC + _CODEC_ZLIB + zlib.compress(blob, self.level)
+        return blob
+
+    def decode(self, stored):
+        if not stored.startswith(_MAGIC):
+            return stored  # pakkimata (vana) kirje
+        codec, payload = stored[len(_MAGIC):len(_MAGIC) + 1], stored[len(_MAGIC) + 1:]
+        if codec == _CODEC_ZLIB:
+            return zlib.decompress(payload)
+        if codec == _CODEC_ZSTD:
+            if self._zstd_d is None:
+                raise ValueError("zstd-compressed cache entry but 'zstandard' is not installed")
+            return self._zstd_d.decompress(payload)
+        raise ValueError(f"Unknown cache codec: {codec!r}")
+
+
+class RdfCache:
+    """
+    diskcache wrapper with compression, a byte budget and hit/miss counters.
+    Counters are per process and also broken down by key tier (the part of the
+    key before ':', e.g. "rdf_v2" or "rec_v1").
+    """
+
+    def __init__(self, directory, size_limit=CACHE_SIZE_LIMIT, eviction_policy=CACHE_EVICTION,
+                 compression=CACHE_COMPRESSION, level=COMPRESSION_LEVEL):
+        # cull_limit=0: diskcache ei kustuta set'i ajal ise, teeme seda _evict'is ja loeme kokku
+        self._cache = Cache(directory, size_limit=size_limit, eviction_policy=eviction_policy, cull_limit=0)
+        self.size_limit = size_limit
+        self._codec = _Codec(compression, level)
+        self._lock = threading.Lock()
+        self._tiers = {}
+        self._bytes_in = 0
+        self._bytes_stored = 0
+        self._evictions = 0
+
+    @property
+    def directory(self):
+        return self._cache.directory
+
+    def _count(self, key, field, amount=1):
+        tier = key.split(":", 1)[0] if isinstance(key, str) else "other"
+        with self._lock:
+            counters = self._tiers.setdefault(tier, {"hits": 0, "misses": 0})
+            counters[field] += amount
+
+    # --- diskcache API ---
+    def get(self, key, default=None):
+        stored = self._cache.get(key, default=_MISSING)
+        if stored is _MISSING:
+            self._count(key, "misses")
+            return default
+        self._count(key, "hits")
+        if isinstance(stored, bytes):
+            return self._codec.decode(stored)
+        return stored
+
+    def peek(self, key, default=None):
+        """
+        get() for housekeeping reads (e.g. the background refresher): not
+        counted as a hit or miss, so the per-tier hit ratio reflects crawls only.
+        """
+        stored = self._cache.get(key, default=_MISSING)
+        if stored is _MISSING:
+            return default
+        if isinstance(stored, bytes):
+            return self._codec.decode(stored)
+        return stored
+
+    def set(self, key, value, expire=None):
+        if isinstance(value, bytes):
+            stored = self._codec.encode(value)
+            with self._lock:
+                self._bytes_in += len(value)
+                self._bytes_stored += len(stored)
+            value = stored
+        result = self._cache.set(key, value, expire=expire)
+        self._evict()
+        return result
+
+    def touch(self, key, expire=None):
+        return self._cache.touch(key, expire=expire)
+
+    def delete(self, key):
+        return self._cache.delete(key)
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def iterkeys(self, prefix=None):
+        """
+        All keys, or with `prefix` only the live str keys that start with it.
+        """
+        if prefix is None:
+            return self._cache.iterkeys()
+        return iter(self._prefix_keys(prefix))
+
+    def _prefix_keys(self, prefix):
+        # diskcache'il pole prefiksipäringut; unikaalne indeks (key, raw) teeb sellest vahemiku-
+        # skaneeringu, nii et nt negatiivsete kirjete loend ei loe läbi kõiki blob'e
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = self._cache._sql(
+            "SELECT key FROM Cache WHERE key >= ? AND key < ? AND raw = 1"
+            " AND (expire_time IS NULL OR expire_time > ?) ORDER BY key",
+            (prefix, upper, time.time()),
+        ).fetchall()
+        return [key for key, in rows]
+
+    def __len__(self):
+        return len(self._cache)
+
+    def volume(self):
+        return self._cache.volume()
+
+    def close(self):
+        self._cache.close()
+
+    def _evict(self):
+        if self._cache.volume() <= self.size_limit:
+            return 0
+        # cull eemaldab esmalt aegunud kirjed, siis eviction_policy järgi kuni eelarve piires
+        removed = self._cache.cull(retry=True)
+        with self._lock:
+            self._evictions += removed
+        return removed
+
+    # --- statistika ---
+    def stats(self):
+        """
+        Counters since this process opened the cache, plus current disk usage.
+        """
+        with self._lock:
+            tiers = {t: dict(c) for t, c in self._tiers.items()}
+            bytes_in, bytes_stored, evictions = self._bytes_in, self._bytes_stored, self._evictions
+        hits = sum(c["hits"] for c in tiers.values())
+        misses = sum(c["misses"] for c in tiers.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "bytes_written": bytes_in,
+            "bytes_stored": bytes_stored,
+            "bytes_saved": bytes_in - bytes_stored,
+            "evictions": evictions,
+            "volume": self._cache.volume(),
+            "size_limit": self.size_limit,
+            "compression": self._codec.name,
+            "tiers": tiers,
+        }
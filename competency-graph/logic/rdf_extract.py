@@ -0,0 +1,217 @@
+"""
+Streaming RDF/XML triple extraction.
+
+Instead of loading a whole page into an rdflib Graph, the document is walked
+with `xml.etree.ElementTree.iterparse` and only the triples whose predicate is
+in a given set are kept. The result is a `TripleIndex`, which offers the small
+subset of the rdflib Graph API (`subjects`, `objects`, `value`) that the crawler
+uses, so the same lookup code works on both.
+
+Supported RDF/XML: node elements (rdf:about / rdf:ID / rdf:nodeID / blank),
+typed node elements, property elements with rdf:resource / rdf:nodeID, literal
+and nested node objects, rdf:parseType="Resource", property attributes and
+xml:base. parseType="Literal" and "Collection" contents are skipped.
+"""
+import io
+import itertools
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
+
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+_RDF_RDF = f"{{{RDF_NS}}}RDF"
+_RDF_DESCRIPTION = f"{{{RDF_NS}}}Description"
+_RDF_ABOUT = f"{{{RDF_NS}}}about"
+_RDF_ID = f"{{{RDF_NS}}}ID"
+_RDF_NODE_ID = f"{{{RDF_NS}}}nodeID"
+_RDF_RESOURCE = f"{{{RDF_NS}}}resource"
+_RDF_PARSE_TYPE = f"{{{RDF_NS}}}parseType"
+_RDF_TYPE = RDF_NS + "type"
+_XML_BASE = f"{{{XML_NS}}}base"
+_SYNTAX_ATTRS = {_RDF_ABOUT, _RDF_ID, _RDF_NODE_ID, _RDF_RESOURCE, _RDF_PARSE_TYPE,
+                 f"{{{RDF_NS}}}datatype", f"{{{RDF_NS}}}bagID", f"{{{RDF_NS}}}aboutEach"}
+
+# stack frame kinds
+_ROOT, _NODE, _PROP, _SKIP = range(4)
+
+
+def _tag_uri(tag: str) -> str:
+    # "{ns}local" -> "nslocal"
+    if tag.startswith("{"):
+        ns, local = tag[1:].split("}", 1)
+        return ns + local
+    return tag
+
+
+class TripleIndex:
+    """
+    Read-only triple lookup with the rdflib-like calls used by the crawler.
+    Terms are plain strings; rdflib URIRef/Literal arguments are accepted too.
+    `RdflibIndex` offers the same calls over an rdflib Graph.
+    """
+
+    def __init__(self, triples=()):
+        self._by_pred = {}
+        for s, p, o in triples:
+            self.add(s, p, o)
+
+    def add(self, s, p, o):
+        self._by_pred.setdefault(str(p), []).append((str(s), str(o)))
+
+    def __len__(self):
+        return sum(len(v) for v in self._by_pred.values())
+
+    def triples(self):
+        for p, pairs in self._by_pred.items():
+            for s, o in pairs:
+                yield s, p, o
+
+    def subjects(self, predicate=None, object=None):
+        object = None if object is None else str(object)
+        for s, o in self._by_pred.get(str(predicate), ()):
+            if object is None or o == object:
+                yield s
+
+    def objects(self, subject=None, predicate=None):
+        subject = None if subject is None else str(subject)
+        for s, o in self._by_pred.get(str(predicate), ()):
+            if subject is None or s == subject:
+                yield o
+
+    def value(self, subject=None, predicate=None, default=None):
+        for o in self.objects(subject, predicate):
+            return o
+        return default
+
+    def uri(self, value):
+        # URI termin selle indeksi kujul (siin lihtsalt string)
+        return str(value)
+
+
+class RdflibIndex:
+    """
+    The same calls over an rdflib Graph (the fallback parser). Plain string
+    terms are passed to rdflib as URIRefs, so callers never need rdflib types.
+    """
+
+    def __init__(self, graph):
+        from rdflib import URIRef
+        self.graph = graph
+        self._uri = URIRef
+
+    def _term(self, term):
+        # rdflib'i terminitel (URIRef, Literal, BNode) on n3(), tavalistel stringidel mitte
+        if term is None or hasattr(term, "n3"):
+            return term
+        return self._uri(term)
+
+    def subjects(self, predicate=None, object=None):
+        return self.graph.subjects(self._term(predicate), self._term(object))
+
+    def objects(self, subject=None, predicate=None):
+        return self.graph.objects(self._term(subject), self._term(predicate))
+
+    def value(self, subject=None, predicate=None, default=None):
+        return self.graph.value(self._term(subject), self._term(predicate), default=default)
+
+    def triples(self):
+        for s, p, o in self.graph:
+            yield str(s), str(p), str(o)
+
+    def uri(self, value):
+        return self._uri(value)
+
+
+def as_index(graph):
+    """
+    `graph` itself if it is a TripleIndex or RdflibIndex, otherwise an
+    RdflibIndex over it (an rdflib Graph).
+    """
+    if isinstance(graph, (TripleIndex, RdflibIndex)):
+        return graph
+    return RdflibIndex(graph)
+
+
+def parse_triples(xml_bytes: bytes, predicates=None, base: str = "") -> TripleIndex:
+    """
+    Stream-parse RDF/XML and return a TripleIndex with the triples whose predicate
+    is in `predicates` (all triples if None). Raises xml.etree.ElementTree.ParseError
+    on malformed XML.
+    """
+    wanted = None if predicates is None else {str(p) for p in predicates}
+    index = TripleIndex()
+    blank_ids = itertools.count()
+
+    def keep(s, p, o):
+        if wanted is None or p in wanted:
+            index.add(s, p, o)
+
+    def new_blank():
+        return f"_:b{next(blank_ids)}"
+
+    # frame: (kind, base, subject_or_None, predicate_or_None, has_object)
+    stack = []
+    for event, elem in ET.iterparse(io.BytesIO(xml_bytes), events=("start", "end")):
+        if event == "start":
+            parent_base = stack[-1][1] if stack else base
+            cur_base = urljoin(parent_base, elem.get(_XML_BASE)) if elem.get(_XML_BASE) else parent_base
+            top = stack[-1][0] if stack else None
+
+            if top is None and elem.tag == _RDF_RDF:
+                stack.append((_ROOT, cur_base, None, None, False))
+
+            elif top in (None, _ROOT, _PROP):
+                # node element
+                if elem.get(_RDF_ABOUT) is not None:
+                    subject = urljoin(cur_base, elem.get(_RDF_ABOUT))
+                elif elem.get(_RDF_ID) is not None:
+                    subject = urljoin(cur_base, "#" + elem.get(_RDF_ID))
+                elif elem.get(_RDF_NODE_ID) is not None:
+                    subject = "_:" + elem.get(_RDF_NODE_ID)
+                else:
+                    subject = new_blank()
+                if top == _PROP:
+                    _, _, parent_subject, predicate, _ = stack.pop()
+                    keep(parent_subject, predicate, subject)
+                    stack.append((_PROP, cur_base, parent_subject, predicate, True))
+                if elem.tag != _RDF_DESCRIPTION:
+                    keep(subject, _RDF_TYPE, _tag_uri(elem.tag))
+                for attr, val in elem.attrib.items():
+                    if attr not in _SYNTAX_ATTRS and not attr.startswith(f"{{{XML_NS}}}"):
+                        keep(subject, _tag_uri(attr), val)
+                stack.append((_NODE, cur_base, subject, None, False))
+
+            elif top == _NODE:
+                # property element
+                subject = stack[-1][2]
+                predicate = _tag_uri(elem.tag)
+                parse_type = elem.get(_RDF_PARSE_TYPE)
+                if elem.get(_RDF_RESOURCE) is not None:
+                    keep(subject, predicate, urljoin(cur_base, elem.get(_RDF_RESOURCE)))
+                    stack.append((_PROP, cur_base, subject, predicate, True))
+                elif elem.get(_RDF_NODE_ID) is not None:
+                    keep(subject, predicate, "_:" + elem.get(_RDF_NODE_ID))
+                    stack.append((_PROP, cur_base, subject, predicate, True))
+                elif parse_type == "Resource":
+                    blank = new_blank()
+                    keep(subject, predicate, blank)
+                    stack.append((_NODE, cur_base, blank, None, False))
+                elif parse_type is not None:
+                    # Literal / Collection: sisu meid ei huvita
+                    stack.append((_SKIP, cur_base, None, None, True))
+                else:
+                    stack.append((_PROP, cur_base, subject, predicate, False))
+
+            else:
+                stack.append((_SKIP, cur_base, None, None, True))
+
+        else:
+            kind, _, subject, predicate, has_object = stack.pop()
+            if kind == _PROP and not has_object:
+                keep(subject, predicate, elem.text or "")
+            if kind == _NODE and len(stack) <= 1:
+                # tipptaseme node läbi: vabasta mälu
+                elem.clear()
+
+    return index
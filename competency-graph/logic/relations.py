@@ -0,0 +1,70 @@
+"""
+Registry of the relation types between nodes.
+
+Each `Relation` declares:
+- the RDF predicate and the node-dict field it fills (`data[key][field]`);
+- the direction the crawler follows it in, and whether it follows it at all;
+- how its edges look in /graph.
+
+The crawler (`graph_utils`), the graph store, subgraph queries and the /graph
+payload builders all read this table. Adding a relation type is one new
+entry here.
+
+`split_triples` is the crawler's one-pass dispatcher. It routes each triple
+of a page to the relation it belongs to, in either direction.
+"""
+from dataclasses import dataclass, field
+
+_PROPERTY = "http://oppekava.edu.ee/a/Special:URIResolver/Property-3A"
+
+
+@dataclass(frozen=True)
+class Relation:
+    field: str                # node-dict väli, kuhu naabrite võtmed lähevad
+    predicate: str            # RDF predikaat (subjekt -> objekt)
+    direction: str            # "out" | "both": "both" järgib ka node'e, mis seda node'i listivad
+    label: str                # serva silt /graph vastuses
+    color: str
+    follow: bool = True       # kas kraapija lisab naabrid järjekorda
+    style: dict = field(default_factory=dict)   # lisavalikud vis-network'i servale
+
+    def edge(self, key, target):
+        """
+        vis-network edge for `key` listing `target`; it points from the target to `key`.
+        """
+        return {"from": target, "to": key, "color": self.color, "label": self.label, **self.style}
+
+
+RELATION_TYPES = (
+    Relation("subskills", _PROPERTY + "Haridus-3AosaOskus", "both", "koosneb", "#e76f51",
+             style={"dashes": True, "arrows": {"to": {"enabled": True, "type": "vee"}}}),
+    Relation("prerequisites", _PROPERTY + "Haridus-3AeeldusOskus", "both", "eeldab", "#00b4d8"),
+    Relation("tegevusnaitajad", _PROPERTY + "Haridus-3AKompSisaldabTn", "out", "sisaldab Tn", "#2a9d8f"),
+    Relation("knobitid", _PROPERTY + "Haridus-3ATnSisaldabKnobitit", "out", "sisaldab knobitit", "#6a4c93"),
+    Relation("tn_eeldab", _PROPERTY + "Haridus-3ATnEeldab", "out", "Tn eeldab", "#0077b6"),
+)
+
+RELATIONS = tuple(r.field for r in RELATION_TYPES)
+BY_FIELD = {r.field: r for r in RELATION_TYPES}
+BY_PREDICATE = {r.predicate: r for r in RELATION_TYPES}
+# vaikesuunad päringutele: samad, mida kraapija järgib
+DEFAULT_DIRECTIONS = {r.field: r.direction for r in RELATION_TYPES}
+OUT_PREDICATES = tuple(r.predicate for r in RELATION_TYPES)
+IN_PREDICATES = tuple(r.predicate for r in RELATION_TYPES if r.direction == "both")
+
+
+def split_triples(triples, subject):
+    """
+    One pass over (s, p, o) string triples. Returns (objects, subjects):
+    - objects[predicate] lists the nodes `subject` links to, for every relation;
+    - subjects[predicate] lists the nodes that link to `subject`, for the
+      relations followed both ways.
+    """
+    objects = {p: [] for p in OUT_PREDICATES}
+    subjects = {p: [] for p in IN_PREDICATES}
+    for s, p, o in triples:
+        if s == subject and p in objects:
+            objects[p].append(o)
+        if o == subject and p in subjects:
+            subjects[p].append(s)
+    return objects, subjects
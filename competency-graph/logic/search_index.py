@@ -0,0 +1,185 @@
+"""
+Server-side skill search for typeahead.
+
+Built once per graph snapshot over every crawled node's label, description,
+ESCO vaste and osk_reg_kood. Text is case-folded and stripped of diacritics
+(õ/ä/ö/ü -> o/a/o/u, š/ž -> s/z), so "oppimine" finds "Õppimine".
+
+- Prefix matches use the sorted token vocabulary as a flattened trie: every
+  token starting with a prefix lies in one contiguous range found by bisect,
+  and postings are stored in vocabulary order, so the documents of a whole
+  prefix range are one array slice.
+- Typos are matched through a trigram index over the vocabulary (Dice
+  similarity of the padded trigram sets).
+
+Scoring a query is a handful of vectorised max/add operations over a score
+array, independent of how many tokens a short prefix expands to.
+"""
+import bisect
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+from logic.graph_store import ATTR_FIELDS
+
+# väli -> kaal (mitu punkti täpne vaste sellel väljal annab)
+FIELD_WEIGHTS = {
+    "label": 1.0,
+    "osk_reg_kood": 0.9,
+    "esco_vaste": 0.6,
+    "description": 0.25,
+}
+PREFIX_SCORE = 0.8            # eesliite vaste täpse vaste suhtes
+FUZZY_SCORE = 0.6             # kirjavea vaste (korrutatakse sarnasusega)
+FUZZY_MIN_SIMILARITY = 0.45
+FUZZY_MAX_TOKENS = 50         # mitu sarnast sõna ühe päringusõna kohta
+LABEL_PREFIX_BONUS = 1.0      # kogu päring on sildi algus
+SEARCH_LIMIT = 20
+
+_TOKEN_RE = re.compile(r"\w+")
+_FIELD_INDEX = {f: ATTR_FIELDS.index(f) for f in FIELD_WEIGHTS}
+
+
+def fold(text):
+    """
+    Lower-case `text` and drop diacritics: "Õpioskus ŠŽ" -> "opioskus sz".
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text).casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokens(text):
+    return _TOKEN_RE.findall(fold(text))
+
+
+def _trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Ranked search over the crawled nodes of a GraphStore. `kind(key)` gives the
+    node type returned with each hit.
+    """
+
+    def __init__(self, store, kind=None):
+        self.store = store
+        self.kind = kind or (lambda key: "muu")
+        self.ids = np.flatnonzero(store.present)
+        self.labels = []
+        self._folded_labels = []
+
+        postings = {f: defaultdict(list) for f in FIELD_WEIGHTS}
+        for doc, node_id in enumerate(self.ids):
+            attrs = store.attrs[node_id]
+            key = store.keys[node_id]
+            label = attrs[_FIELD_INDEX["label"]] or key.replace("_", " ")
+            self.labels.append(str(label))
+            self._folded_labels.append(fold(label))
+            for field, index in _FIELD_INDEX.items():
+                value = attrs[index] if field != "label" else label
+                if not value:
+                    continue
+                for token in set(tokens(value)):
+                    postings[field][token].append(doc)
+
+        self.vocabulary = sorted({t for field in postings.values() for t in field})
+        # CSR sõnavara järjekorras: välja dokumendid sõnade lo..hi jaoks on docs[ptr[lo]:ptr[hi]]
+        self._postings = {}
+        for field, by_token in postings.items():
+            lists = [by_token.get(t, ()) for t in self.vocabulary]
+            ptr = np.zeros(len(lists) + 1, dtype=np.int64)
+            np.cumsum([len(docs) for docs in lists], out=ptr[1:])
+            docs = np.fromiter((d for docs in lists for d in docs), dtype=np.int32, count=int(ptr[-1]))
+            self._postings[field] = (ptr, docs)
+
+        trigram_lists = defaultdict(list)
+        self._trigram_counts = np.empty(len(self.vocabulary), dtype=np.int32)
+        for i, token in enumerate(self.vocabulary):
+            grams = _trigrams(token)
+            self._trigram_counts[i] = len(grams)
+            for gram in grams:
+                trigram_lists[gram].append(i)
+        self._trigrams = {g: np.asarray(ids, dtype=np.int32) for g, ids in trigram_lists.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- sõnade laiendamine ---
+    def _prefix_range(self, prefix):
+        lo = bisect.bisect_left(self.vocabulary, prefix)
+        hi = bisect.bisect_left(self.vocabulary, prefix + "\uffff", lo)
+        return lo, hi
+
+    def _fuzzy_tokens(self, token):
+        grams = [self._trigrams[g] for g in _trigrams(token) if g in self._trigrams]
+        if not grams or len(token) < 3:
+            return []
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.vocabulary))
+        candidates = np.flatnonzero(shared)
+        similarity = 2.0 * shared[candidates] / (len(_trigrams(token)) + self._trigram_counts[candidates])
+        keep = similarity >= FUZZY_MIN_SIMILARITY
+        candidates, similarity = candidates[keep], similarity[keep]
+        best = np.argsort(-similarity, kind="stable")[:FUZZY_MAX_TOKENS]
+        return [(int(candidates[i]), float(similarity[i])) for i in best]
+
+    def _mark(self, scores, lo, hi, quality):
+        # sõnade lo..hi dokumendid saavad vähemalt weight * quality punkti
+        for field, weight in FIELD_WEIGHTS.items():
+            ptr, docs = self._postings[field]
+            hit = docs[ptr[lo]:ptr[hi]]
+            if hit.size:
+                scores[hit] = np.maximum(scores[hit], weight * quality)
+
+    def _token_scores(self, token):
+        # parim skoor iga dokumendi kohta selle päringusõna jaoks
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        lo, hi = self._prefix_range(token)
+        if hi > lo:
+            self._mark(scores, lo, hi, PREFIX_SCORE)
+            if self.vocabulary[lo] == token:
+                self._mark(scores, lo, lo + 1, 1.0)
+            return scores
+        for i, similarity in self._fuzzy_tokens(token):
+            self._mark(scores, i, i + 1, FUZZY_SCORE * similarity)
+        return scores
+
+    # --- päring ---
+    def search(self, query, limit=SEARCH_LIMIT):
+        """
+        Best matches for `query` as dicts with key, label, type, score. Every
+        query word has to match (exactly, as a prefix or fuzzily) somewhere.
+        """
+        words = tokens(query)
+        if not words or len(self.ids) == 0:
+            return []
+
+        total = np.zeros(len(self.ids), dtype=np.float32)
+        matched = np.ones(len(self.ids), dtype=bool)
+        for word in dict.fromkeys(words):
+            scores = self._token_scores(word)
+            matched &= scores > 0
+            total += scores
+        candidates = np.flatnonzero(matched)
+        if candidates.size == 0:
+            return []
+
+        folded_query = " ".join(words)
+        scores = total[candidates]
+        if candidates.size > limit * 4:
+            top = np.argpartition(-scores, limit * 4)[:limit * 4]
+            candidates, scores = candidates[top], scores[top]
+
+        hits = []
+        for doc, score in zip(candidates.tolist(), scores.tolist()):
+            label = self._folded_labels[doc]
+            if label.startswith(folded_query):
+                score += LABEL_PREFIX_BONUS
+            key = self.store.keys[self.ids[doc]]
+            hits.append((-score, len(label), key, doc))
+        hits.sort()
+        return [{"key": key, "label": self.labels[doc], "type": self.kind(key), "score": round(-neg, 3)}
+                for neg, _, key, doc in hits[:limit]]
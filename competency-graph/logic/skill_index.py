@@ -0,0 +1,84 @@
+"""
+Reverse lookups from a skill to the jobs and occupations that need it.
+
+Skills are matched on a normalised key (`skill_index_key`): the crawler's
+canonical key, case-folded, so a node key ("Analüütiline_mõtlemine"), its label
+("Analüütiline mõtlemine") and a job's hand-typed skill name all meet.
+
+- skill -> jobs lives in the job store's indexed `job_skills.skill_key`
+  column, written together with the job (see logic.job_store).
+- skill -> occupations is `OccupationIndex`, built once per graph snapshot from
+  the nodes' `relevant_occupations`.
+"""
+import numpy as np
+
+from logic.graph_store import ATTR_FIELDS
+from logic.graph_utils import normalize_key
+
+_LABEL = ATTR_FIELDS.index("label")
+_OCCUPATIONS = ATTR_FIELDS.index("relevant_occupations")
+
+
+def skill_index_key(name):
+    return normalize_key(str(name)).casefold()
+
+
+class OccupationIndex:
+    """
+    Normalised skill key -> relevant occupation URIs, and the reverse.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.labels = {}          # ameti URI -> silt
+        self._by_skill = {}       # skill_index_key -> [URI, ...]
+        self._by_occupation = {}  # URI -> [node key, ...]
+        self._aliases = {}        # skill_index_key -> node key
+        for i in np.flatnonzero(store.present):
+            key = store.keys[i]
+            attrs = store.attrs[i]
+            aliases = {skill_index_key(key)}
+            if attrs[_LABEL]:
+                aliases.add(skill_index_key(attrs[_LABEL]))
+            for alias in aliases:
+                self._aliases.setdefault(alias, key)
+
+            uris = []
+            for occ in attrs[_OCCUPATIONS] or ():
+                uri = occ["uri"]
+                self.labels.setdefault(uri, occ.get("label", ""))
+                if uri not in uris:
+                    uris.append(uri)
+                    self._by_occupation.setdefault(uri, []).append(key)
+            for alias in aliases if uris else ():
+                known = self._by_skill.setdefault(alias, [])
+                known.extend(u for u in uris if u not in known)
+
+    def __len__(self):
+        return len(self._by_occupation)
+
+    def resolve(self, name):
+        """
+        Node key for a skill key or label, or None if the snapshot does not have it.
+        """
+        return self._aliases.get(skill_index_key(name))
+
+    def aliases(self, name):
+        """
+        Every normalised form the skill is known by (its key and its label).
+        """
+        out = {skill_index_key(name)}
+        key = self.resolve(name)
+        if key is not None:
+            out.add(skill_index_key(key))
+            label = self.store.attrs[self.store.id_of(key)][_LABEL]
+            if label:
+                out.add(skill_index_key(label))
+        return out
+
+    def occupations(self, name):
+        uris = self._by_skill.get(skill_index_key(name), ())
+        return [{"uri": uri, "label": self.labels.get(uri, "")} for uri in uris]
+
+    def skills_for(self, uri):
+        return list(self._by_occupation.get(uri, ()))
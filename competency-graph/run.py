@@ -2,7 +2,8 @@ from app import create_app
 import os, sys
 sys.path.insert(0, os.path.dirname(__file__))
 
-app = create_app()
+# arendusserveri reloader'i vanemprotsess ainult jälgib faile: taustatööd teeb laps (WERKZEUG_RUN_MAIN)
+app = create_app({"BACKGROUND_JOBS": __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true"})
 
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=8000)
\ No newline at end of file
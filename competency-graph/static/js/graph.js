@@ -45,11 +45,21 @@ function drawGraph(skill) {
         const loading = document.getElementById("loading");
         loading.style.display = "block";
         try {
-            const response = yield fetch(`/graph?skill=${encodeURIComponent(skill)}`);
+            const response = yield fetch(`/graph?skill=${encodeURIComponent(skill)}&stream=1`);
             if (!response.ok)
                 throw new Error("Oskust ei leitud");
-            const responseData = yield response.json();
-            renderGraph(responseData.nodes, responseData.edges);
+            if (!response.body) {
+                // vana brauser: oota kogu vastus ära
+                const responseData = parseGraphChunks(yield response.text());
+                renderGraph(responseData.nodes, responseData.edges);
+            }
+            else {
+                renderGraph([], []);
+                const added = yield loadGraphStream(response.body);
+                if (added === 0)
+                    throw new Error("Oskust ei leitud");
+            }
+            updateSearchDropdown();
         }
         catch (error) {
             showError("Oskust ei leitud");
@@ -59,6 +69,122 @@ function drawGraph(skill) {
         }
     });
 }
+function parseGraphChunks(text) {
+    const result = { nodes: [], edges: [] };
+    text.split("\n").forEach((line) => {
+        if (!line.trim())
+            return;
+        const chunk = JSON.parse(line);
+        if (chunk.error)
+            throw new Error(chunk.error);
+        result.nodes = result.nodes.concat(chunk.nodes || []);
+        result.edges = result.edges.concat(chunk.edges || []);
+    });
+    return result;
+}
+// Loeb /graph NDJSON voogu ja lisab node'id/servad DataSet'i partiidena (üks kord kaadri kohta)
+function loadGraphStream(body) {
+    return __awaiter(this, void 0, void 0, function* () {
+        const reader = body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        let pendingNodes = [];
+        let pendingEdges = [];
+        let scheduled = false;
+        let positioned = false;
+        let total = 0;
+        const flush = () => {
+            scheduled = false;
+            if (!positioned && hasPositions(pendingNodes)) {
+                // server saatis valmis paigutuse, füüsikat pole vaja
+                network.setOptions({ physics: false });
+                positioned = true;
+            }
+            if (pendingNodes.length)
+                nodes.update(pendingNodes.map(applyNodeDefaults));
+            if (pendingEdges.length)
+                edges.add(pendingEdges.map(applyEdgeDefaults));
+            pendingNodes = [];
+            pendingEdges = [];
+        };
+        while (true) {
+            const { done, value } = yield reader.read();
+            if (value)
+                buffer += decoder.decode(value, { stream: true });
+            let newline = buffer.indexOf("\n");
+            while (newline >= 0) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                newline = buffer.indexOf("\n");
+                if (!line)
+                    continue;
+                const chunk = JSON.parse(line);
+                if (chunk.error)
+                    throw new Error(chunk.error);
+                pendingNodes = pendingNodes.concat(chunk.nodes || []);
+                pendingEdges = pendingEdges.concat(chunk.edges || []);
+                total += (chunk.nodes || []).length;
+                if (!scheduled) {
+                    scheduled = true;
+                    requestAnimationFrame(flush);
+                }
+            }
+            if (done)
+                break;
+        }
+        flush();
+        return total;
+    });
+}
+function hasPositions(nodesData) {
+    return nodesData.some((n) => typeof n.x === "number" && typeof n.y === "number");
+}
+function applyNodeDefaults(node) {
+    if (!node.color) {
+        node.color = {
+            background: "#ffffff",
+            border: "#007bff",
+            highlight: {
+                background: "#e0f0ff",
+                border: "#0056b3"
+            }
+        };
+        node.borderWidth = 1;
+    }
+    return node;
+}
+function applyEdgeDefaults(edge) {
+    if (!edge.color) {
+        edge.color = "#cccccc"; // fallback värv
+    }
+    return edge;
+}
+function updateSearchDropdown() {
+    const dropdown = document.getElementById("searchDropdown");
+    dropdown.innerHTML = nodes.get().slice(0, 200).map((n) => `<li><a class="dropdown-item" href="#" data-id="${n.id}">${n.label}</a></li>`).join("");
+}
+let searchSeq = 0;
+function searchSkills(term) {
+    // serveri otsinguindeks (diakriitikuta, kirjavigu taluv); null, kui snapshot pole veel valmis
+    return fetch(`/search?q=${encodeURIComponent(term)}&limit=30`)
+        .then((res) => (res.ok ? res.json() : null))
+        .catch(() => null);
+}
+function focusNode(id) {
+    const node = nodes ? nodes.get(id) : null;
+    if (!node) {
+        // node'i pole praeguses graafis: lae selle alamgraaf
+        drawGraph(id);
+        return;
+    }
+    lastClickedNode = node;
+    network.focus(node.id, {
+        scale: 1.2,
+        animation: { duration: 800, easingFunction: "easeInOutQuad" }
+    });
+    updateNodeInfo(node);
+    applyLevelFilter();
+}
 function filterGraphBySearch(term) {
     const lower = term.toLowerCase();
     let matchedNode = null;
@@ -84,31 +210,16 @@ function filterGraphBySearch(term) {
 }
 function renderGraph(nodesData, edgesData) {
     const container = document.getElementById("network");
-    nodesData.forEach((node) => {
-        if (!node.color) {
-            node.color = {
-                background: "#ffffff",
-                border: "#007bff",
-                highlight: {
-                    background: "#e0f0ff",
-                    border: "#0056b3"
-                }
-            };
-            node.borderWidth = 1;
-        }
-    });
-    edgesData.forEach((edge) => {
-        if (!edge.color) {
-            edge.color = "#cccccc"; // fallback värv
-        }
-    });
-    nodes = new vis.DataSet(nodesData);
-    edges = new vis.DataSet(edgesData);
+    nodes = new vis.DataSet(nodesData.map(applyNodeDefaults));
+    edges = new vis.DataSet(edgesData.map(applyEdgeDefaults));
     const data = { nodes, edges };
     const options = getGraphOptions();
+    if (hasPositions(nodesData)) {
+        options.physics = false;
+        options.layout = { improvedLayout: false };
+    }
     network = new vis.Network(container, data, options);
-    const dropdown = document.getElementById("searchDropdown");
-    dropdown.innerHTML = nodes.get().slice(0, 200).map((n) => `<li><a class="dropdown-item" href="#" data-id="${n.id}">${n.label}</a></li>`).join("");
+    updateSearchDropdown();
     network.on("click", (params) => {
         if (isJobCreationMode) {
             if (params.nodes.length > 0) {
@@ -414,31 +525,39 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     };
     input.addEventListener("input", () => {
-        if (!nodes)
-            return;
-        const term = input.value.toLowerCase();
+        const term = input.value.trim();
         if (!term) {
             dropdown.innerHTML = "";
             dropdown.classList.remove("show");
             return;
         }
-        const matches = nodes.get()
-            .filter((n) => n.label.toLowerCase().includes(term))
-            .slice(0, 30);
-        dropdown.innerHTML = matches.map((n) => `<li><a class="dropdown-item" href="javascript:void(0)" data-id="${n.id}">${n.label}</a></li>`).join("");
-        if (matches.length > 0)
-            dropdown.classList.add("show");
-        else
-            dropdown.classList.remove("show");
+        const seq = ++searchSeq;
+        searchSkills(term).then((hits) => {
+            if (seq !== searchSeq)
+                return; // vahepeal on juba uuem päring tehtud
+            const lower = term.toLowerCase();
+            const matches = hits !== null
+                ? hits.map((h) => ({ id: h.value, label: h.text }))
+                : (nodes ? nodes.get().filter((n) => n.label.toLowerCase().includes(lower)).slice(0, 30) : []);
+            dropdown.innerHTML = matches.map((n) => `<li><a class="dropdown-item" href="javascript:void(0)" data-id="${n.id}">${n.label}</a></li>`).join("");
+            if (matches.length > 0)
+                dropdown.classList.add("show");
+            else
+                dropdown.classList.remove("show");
+        });
     });
     dropdown.addEventListener("click", (e) => {
         const target = e.target;
         if (target.tagName === "A") {
             e.preventDefault();
             const label = target.textContent || "";
+            const id = target.dataset.id || "";
             input.value = label;
             dropdown.classList.remove("show");
-            filterGraphBySearch(label);
+            if (id)
+                focusNode(id);
+            else
+                filterGraphBySearch(label);
         }
     });
     drawGraph(""); // lae alguses
@@ -0,0 +1,131 @@
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmarks import imports, run
+from benchmarks.stub_server import StubRegistryServer
+from benchmarks.synthetic import SyntheticRegistry
+from logic import graph_snapshot, graph_utils
+from logic.rate_control import AdaptiveLimiter
+from logic.rdf_cache import RdfCache
+
+
+class SyntheticRegistryTestCase(unittest.TestCase):
+
+    def test_pages_parse_with_real_predicates(self):
+        #Arrange
+        registry = SyntheticRegistry(50, fanout=2)
+        key = registry.members["kompetents"][0]
+
+        #Act
+        record = graph_utils.extract_record(registry.render(key), key)
+
+        #Assert
+        subskills = {graph_utils.uri_to_skill_name(str(o)) for o in record["objects"][str(graph_utils.OSAOSKUS)]}
+        self.assertEqual(subskills, set(registry.out[key][graph_utils.OSAOSKUS]))
+        self.assertIsNone(registry.render("Puuduv_leht"))
+
+
+class StubCrawlTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(graph_utils.shutdown_parse_executor)
+        self.registry = SyntheticRegistry(60, fanout=2, dangling=0.1)
+        self.server = StubRegistryServer(self.registry, page_size=10)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = RdfCache(tmp.name)
+        self.addCleanup(cache.close)
+        patcher = patch.multiple(graph_utils, BASE_RDF=self.server.rdf_base(), CACHE=cache,
+                                 LIMITER=AdaptiveLimiter(rate=1000, concurrency=16, max_rate=1000),
+                                 CRAWL_SUMMARY=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_crawl_reads_paginated_categories_and_all_pages(self):
+        #Arrange
+        category_urls = self.server.category_urls()
+
+        #Act
+        data, depths, members = asyncio.run(graph_utils.crawl_registry_async(category_urls))
+
+        #Assert
+        self.assertEqual(set(data), self.registry.pages)
+        self.assertEqual({k for keys in members.values() for k in keys}, self.registry.pages)
+        self.assertGreater(self.server.requests["category"], len(category_urls))
+        self.assertEqual(self.server.requests["rdf"], len(self.registry.pages))
+
+    def test_throttled_category_page_is_retried_from_same_offset(self):
+        #Arrange
+        category_urls = self.server.category_urls()
+        self.server.category_faults[10] = [429, 503]
+
+        #Act
+        data, depths, members = asyncio.run(graph_utils.crawl_registry_async(category_urls))
+
+        #Assert
+        self.assertEqual(self.server.requests["category_fault"], 2)
+        self.assertEqual(set(members), set(category_urls))
+        self.assertEqual({k for keys in members.values() for k in keys}, self.registry.pages)
+
+    def test_category_that_keeps_failing_is_left_out_of_members(self):
+        #Arrange
+        category_urls = self.server.category_urls()
+        self.server.category_faults[10] = [503] * 10
+
+        #Act
+        with patch.object(graph_utils, "RETRIES", 2):
+            data, depths, members = asyncio.run(graph_utils.crawl_registry_async(category_urls))
+
+        #Assert
+        missing = set(category_urls) - set(members)
+        self.assertTrue(missing)
+        self.assertEqual(self.server.requests["category_fault"], 2 * len(missing))
+        for name in members:
+            self.assertEqual(members[name], set(self.registry.members[name]))
+
+
+class RunSizeTestCase(unittest.TestCase):
+
+    def test_run_size_reports_throughput_and_latency(self):
+        #Arrange
+        self.addCleanup(graph_utils.shutdown_parse_executor)
+        previous = graph_snapshot.get_snapshot()
+
+        #Act
+        with patch.object(graph_utils, "CRAWL_SUMMARY", False):
+            result = run.run_size(40, fanout=2, repeat=1)
+
+        #Assert
+        self.assertEqual(result["cold"]["nodes"], 40)
+        self.assertEqual(result["cold"]["parsed"], 40)
+        self.assertEqual(result["warm"]["record_cache_hits"], 40)
+        self.assertEqual(result["graph"]["full"]["status"], 200)
+        self.assertEqual(set(result["peak_rss_mb"]), {"main", "workers"})
+        self.assertIs(graph_snapshot.get_snapshot(), previous)
+
+
+class ImportBudgetTestCase(unittest.TestCase):
+
+    def test_app_import_stays_light(self):
+        #Act
+        result = imports.measure_import("app", repeat=3)
+
+        #Assert
+        self.assertEqual(result["heavy_loaded"], [])
+        self.assertLess(result["median_ms"], imports.IMPORT_BUDGET_MS)
+
+    def test_lazy_attributes_still_resolve(self):
+        #Assert
+        self.assertEqual(str(graph_utils.SCHEMA.name), graph_utils.SCHEMA_NAME)
+        self.assertEqual(str(graph_utils.RDFS.label), graph_utils.RDFS_LABEL)
+        self.assertTrue(hasattr(graph_utils.aiohttp, "ClientSession"))
+        with self.assertRaises(AttributeError):
+            graph_utils.puuduv_atribuut
+
+
+if __name__ == "__main__":
+    unittest.main()
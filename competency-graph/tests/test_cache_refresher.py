@@ -0,0 +1,163 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from logic import cache_refresher, graph_utils
+from logic.rate_control import AdaptiveLimiter
+from logic.rdf_cache import RdfCache
+
+
+class _FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    def __init__(self, status):
+        self.status = status
+        self.requests = 0
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests += 1
+        return _FakeResponse(self.status)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class CacheRefresherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RdfCache(self.tmp.name)
+        patcher = patch.object(graph_utils, "CACHE", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(self.cache.close)
+        self.now = time.time()
+
+    def _meta(self, skill, fresh_in):
+        self.cache.set(f"rdf_meta_v1:{skill}", {"etag": None, "last_modified": None,
+                                                "checked_at": self.now - 10, "fresh_until": self.now + fresh_in})
+
+    def test_due_entries_are_soonest_first(self):
+        #Arrange
+        self._meta("Hiljem", 3600)
+        self._meta("Aegunud", -60)
+        self._meta("Varsti", 60)
+        self._meta("Kaugel", 10 * 24 * 3600)
+        self.cache.set("rdf_v2:Aegunud", b"<rdf/>")
+
+        #Act
+        due = cache_refresher.due_entries(now=self.now, ahead=7200)
+
+        #Assert
+        self.assertEqual(due, ["Aegunud", "Varsti", "Hiljem"])
+        self.assertEqual(cache_refresher.due_entries(now=self.now, ahead=7200, limit=1), ["Aegunud"])
+
+    def test_scan_does_not_count_as_cache_hits(self):
+        #Arrange
+        for i in range(5):
+            self._meta(f"Oskus_{i}", 60)
+
+        #Act
+        due = cache_refresher.due_entries(now=self.now, ahead=7200)
+
+        #Assert
+        self.assertEqual(len(due), 5)
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+    @patch("logic.graph_utils._load_record")
+    def test_refresh_due_revalidates_each_entry(self, mock_load):
+        #Arrange
+        self._meta("Varsti", 60)
+        self._meta("Kaugel", 10 * 24 * 3600)
+
+        async def fake_load(session, skill, executor=None, revalidate=False):
+            return {}
+
+        mock_load.side_effect = fake_load
+
+        #Act
+        refreshed = asyncio.run(cache_refresher.refresh_due(now=self.now, per_sec=100))
+
+        #Assert
+        self.assertEqual(refreshed, 1)
+        _, skill = mock_load.call_args[0]
+        self.assertEqual(skill, "Varsti")
+        self.assertTrue(mock_load.call_args[1]["revalidate"])
+
+    def test_dead_page_is_requested_once(self):
+        #Arrange
+        self._meta("Kadunud", 60)
+        self.cache.set("rdf_v2:Kadunud", b"<rdf/>")
+        session = _FakeSession(404)
+
+        #Act
+        with patch("aiohttp.ClientSession", return_value=session), \
+                patch.object(graph_utils, "LIMITER", AdaptiveLimiter(rate=1000)):
+            for _ in range(3):
+                asyncio.run(cache_refresher.refresh_due(now=self.now, per_sec=100))
+
+        #Assert
+        self.assertEqual(session.requests, 1)
+        self.assertIsNone(self.cache.get("rdf_v2:Kadunud"))
+        self.assertIsNone(self.cache.get("rdf_meta_v1:Kadunud"))
+
+    def test_negative_cached_pages_are_not_due(self):
+        #Arrange
+        self._meta("Katkine", 60)
+        self._meta("Terve", 60)
+        self.cache.set(graph_utils._negative_key("Katkine"), {"kind": "timeout", "detail": "", "at": self.now})
+
+        #Act
+        due = cache_refresher.due_entries(now=self.now, ahead=7200)
+
+        #Assert
+        self.assertEqual(due, ["Terve"])
+
+    @patch("logic.graph_utils._load_record")
+    def test_failed_refresh_is_postponed(self, mock_load):
+        #Arrange
+        self._meta("Aeglane", 60)
+        mock_load.side_effect = RuntimeError("upstream down")
+
+        #Act
+        asyncio.run(cache_refresher.refresh_due(now=self.now, per_sec=100))
+        due = cache_refresher.due_entries()
+
+        #Assert
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertEqual(due, [])
+        self.assertGreater(self.cache.get("rdf_meta_v1:Aeglane")["fresh_until"],
+                           time.time() + cache_refresher.REFRESH_AHEAD_SEC)
+
+    def test_validators_get_jittered_expiry(self):
+        #Arrange
+        class Resp:
+            headers = {}
+
+        #Act
+        expiries = {graph_utils._cache_validators(Resp(), 0)["fresh_until"] for _ in range(20)}
+
+        #Assert
+        ttl, jitter = graph_utils.CACHE_TTL, graph_utils.CACHE_TTL_JITTER
+        self.assertGreater(len(expiries), 1)
+        self.assertTrue(all(ttl * (1 - jitter) <= e <= ttl * (1 + jitter) for e in expiries))
+
+
+if __name__ == '__main__':
+    unittest.main()
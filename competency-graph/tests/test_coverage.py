@@ -0,0 +1,142 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app import create_app
+from logic import graph_snapshot, job_utils
+from logic.coverage import Closures, CoverageIndex
+from logic.graph_store import GraphStore
+from logic.job_store import JobStore
+
+
+def _node(label, subskills=(), prerequisites=(), tegevusnaitajad=(), knobitid=()):
+    return {"label": label, "subskills": list(subskills), "prerequisites": list(prerequisites),
+            "tegevusnaitajad": list(tegevusnaitajad), "knobitid": list(knobitid), "competencies": []}
+
+
+def _sample_data():
+    return {
+        "Kompetents": _node("Kompetents", subskills=["Oskus_A"], tegevusnaitajad=["Tn_1"]),
+        "Oskus_A": _node("Oskus A", prerequisites=["Oskus_B"]),
+        "Oskus_B": _node("Oskus B", prerequisites=["Oskus_C"]),
+        # tsükkel B -> C -> B
+        "Oskus_C": _node("Oskus C", prerequisites=["Oskus_B"], subskills=["Puuduv"]),
+        "Tn_1": _node("Tn 1", knobitid=["Knobit_1"]),
+        "Oskus_D": _node("Oskus D"),
+    }
+
+
+class ClosuresTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.store = GraphStore.from_data(_sample_data())
+
+    def test_closure_follows_requirement_relations_through_cycles(self):
+        #Act
+        closures = Closures(self.store)
+
+        #Assert
+        self.assertEqual(set(closures.requirements("Kompetents")),
+                         {"Kompetents", "Oskus_A", "Oskus_B", "Oskus_C", "Puuduv", "Tn_1"})
+        self.assertEqual(set(closures.requirements("Oskus_C")), {"Oskus_B", "Oskus_C", "Puuduv"})
+        self.assertEqual(closures.requirements("Oskus_D"), ["Oskus_D"])
+        self.assertEqual(closures.resolve("oskus a"), self.store.id_of("Oskus_A"))
+
+    def test_bfs_rows_match_folded_matrix_on_random_graph(self):
+        #Arrange
+        rng = random.Random(3)
+        keys = [f"S{i}" for i in range(200)]
+        data = {k: _node(k, subskills=rng.sample(keys, 2), prerequisites=rng.sample(keys, 1)) for k in keys}
+        store = GraphStore.from_data(data)
+
+        #Act
+        folded = Closures(store)
+        lazy = Closures(store, max_bytes=0)
+
+        #Assert
+        self.assertIsNone(lazy.matrix)
+        for i in range(0, 200, 7):
+            self.assertEqual(folded.row(i).tobytes(), lazy.row(i).tobytes())
+
+
+class CoverageIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.closures = Closures(GraphStore.from_data(_sample_data()))
+        self.index = CoverageIndex(self.closures, [
+            {"id": 1, "name": "Kompetentne", "skills": ["Kompetents"]},
+            {"id": 2, "name": "Algaja", "skills": ["Oskus B", "Tundmatu oskus"]},
+            {"id": 3, "name": "Muu", "skills": ["Oskus_D"]},
+        ])
+
+    def test_rank_orders_jobs_by_coverage_and_lists_gaps(self):
+        #Act
+        result = self.index.rank(["Oskus_A"])
+
+        #Assert
+        self.assertEqual([j["id"] for j in result["jobs"]], [2, 1, 3])
+        self.assertEqual(result["jobs"][0]["coverage"], 1.0)
+        kompetentne = result["jobs"][1]
+        self.assertEqual((kompetentne["required"], kompetentne["matched"]), (6, 4))
+        self.assertEqual(set(kompetentne["gap"]), {"Kompetents", "Tn_1"})
+        self.assertEqual(self.index.unresolved, {2: ["Tundmatu oskus"]})
+
+    def test_rank_without_expand_counts_only_listed_skills(self):
+        #Act
+        result = self.index.rank(["Oskus_A"], expand=False, limit=1)
+
+        #Assert
+        self.assertEqual(len(result["jobs"]), 1)
+        self.assertEqual(result["jobs"][0]["id"], 1)
+        self.assertEqual(result["jobs"][0]["matched"], 1)
+
+
+class CoverageRoutesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.jobs = JobStore(Path(tmp.name) / "jobs.db")
+        self.addCleanup(self.jobs.close)
+        patcher = patch.object(job_utils, "_store", self.jobs)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        previous = graph_snapshot.get_snapshot()
+        self.addCleanup(graph_snapshot.publish_snapshot, previous)
+        graph_snapshot.publish_snapshot(graph_snapshot.GraphSnapshot(_sample_data(), {}, [], [], [], []))
+        self.client = create_app({"GRAPH_SNAPSHOT": False, "CACHE_REFRESH": False}).test_client()
+
+    def test_match_sees_job_store_writes(self):
+        #Arrange
+        job_id = self.jobs.create({"name": "Kompetentne", "skills": ["Kompetents"]})
+        self.client.get("/jobs/match?skill=Oskus_A")
+
+        #Act
+        other = self.jobs.create({"name": "Algaja", "skills": ["Oskus_B"]})
+        matched = self.client.post("/jobs/match", json={"skills": ["Oskus_A"]}).get_json()
+        requirements = self.client.get(f"/jobs/{job_id}/requirements").get_json()
+
+        #Assert
+        self.assertEqual([j["id"] for j in matched["jobs"]], [other, job_id])
+        self.assertEqual(len(requirements["required"]), 6)
+        self.assertEqual(self.client.get("/jobs/999/requirements").status_code, 404)
+
+    def test_match_sees_writes_from_another_process(self):
+        #Arrange
+        self.jobs.create({"name": "Kompetentne", "skills": ["Kompetents"]})
+        self.client.get("/jobs/match?skill=Oskus_A")
+        other = JobStore(self.jobs.path)   # teise töötaja ühendus samale failile
+        self.addCleanup(other.close)
+
+        #Act
+        added = other.create({"name": "Algaja", "skills": ["Oskus_B"]})
+        matched = self.client.get("/jobs/match?skill=Oskus_A").get_json()
+
+        #Assert
+        self.assertIn(added, [j["id"] for j in matched["jobs"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from logic import graph_snapshot
+from logic.graph_binary import SnapshotFormatError, load_binary, save_binary
+from logic.graph_store import GraphStore
+
+OCCUPATION = {"uri": "http://data.europa.eu/esco/occupation/kokk", "label": "kokk"}
+
+
+def _sample_data():
+    return {
+        "Kompetents": {"label": "Kompetents", "description": "Õppimine ja „jutumärgid”",
+                       "subskills": ["Oskus_A", "Oskus_B"], "tegevusnaitajad": ["Tn_1"]},
+        "Oskus_A": {"label": "Oskus A", "prerequisites": ["Oskus_B"], "relevant_occupations": [OCCUPATION]},
+        "Oskus_B": {"label": "Oskus B", "prerequisites": ["Puuduv"]},
+    }
+
+
+class GraphBinaryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "graph.bin"
+        self.store = GraphStore.from_data(_sample_data(), {"Kompetents": 0, "Oskus_A": 1, "Oskus_B": 1})
+
+    def test_round_trip_keeps_nodes_edges_and_members(self):
+        #Arrange
+        save_binary(self.path, self.store, {"oskus": ["Oskus_A", "Oskus_B", "Tundmatu"], "kompetents": ["Kompetents"]})
+
+        #Act
+        for use_mmap in (True, False):
+            loaded = load_binary(self.path, use_mmap=use_mmap)
+
+            #Assert
+            self.assertEqual(dict(loaded.store.as_data()), dict(self.store.as_data()))
+            self.assertEqual(dict(loaded.store.as_depths()), dict(self.store.as_depths()))
+            self.assertEqual(loaded.store.neighbours("prerequisites", "Puuduv", "in"), ["Oskus_B"])
+            self.assertNotIn("Puuduv", loaded.store)
+            self.assertEqual(loaded.members, {"oskus": ["Oskus_A", "Oskus_B"], "kompetents": ["Kompetents"]})
+            self.assertIsNone(loaded.layout)
+
+    def test_layout_and_bad_files(self):
+        #Arrange
+        layout = np.arange(len(self.store.keys) * 2, dtype=np.float32).reshape(-1, 2)
+        save_binary(self.path, self.store, layout=layout, built_at=123.0)
+        broken = self.path.with_name("broken.bin")
+        broken.write_bytes(b"not a snapshot")
+
+        #Act
+        loaded = load_binary(self.path)
+
+        #Assert
+        np.testing.assert_array_equal(loaded.layout, layout)
+        self.assertEqual(loaded.built_at, 123.0)
+        with self.assertRaises(SnapshotFormatError):
+            load_binary(broken, use_mmap=False)
+
+    def test_graph_snapshot_reload(self):
+        #Arrange
+        snapshot = graph_snapshot.GraphSnapshot(_sample_data(), {}, ["Oskus_A"], ["Kompetents"], [], [])
+        graph_snapshot.save_snapshot(snapshot, self.path)
+
+        #Act
+        loaded = graph_snapshot.load_snapshot(self.path)
+
+        #Assert
+        self.assertEqual(loaded.built_at, snapshot.built_at)
+        self.assertEqual(loaded.kind("Kompetents"), "kompetents")
+        self.assertEqual(loaded.position("Oskus_A"), snapshot.position("Oskus_A"))
+        self.assertEqual(loaded.occupations.occupations("Oskus A"), [OCCUPATION])
+        self.assertEqual(loaded.search_index().search("oskus a")[0]["key"], "Oskus_A")
+        self.assertIsNone(graph_snapshot.load_snapshot(self.path.with_name("missing.bin")))
+
+    def test_follower_publishes_replaced_file(self):
+        #Arrange
+        previous = graph_snapshot.get_snapshot()
+        self.addCleanup(graph_snapshot.publish_snapshot, previous)
+        snapshot = graph_snapshot.GraphSnapshot(_sample_data(), {}, ["Oskus_A"], [], [], [])
+        graph_snapshot.save_snapshot(snapshot, self.path)
+
+        #Act
+        seen = graph_snapshot.reload_if_changed(self.path)
+        first = graph_snapshot.get_snapshot()
+        unchanged = graph_snapshot.reload_if_changed(self.path, seen)
+
+        #Assert
+        self.assertIsNotNone(seen)
+        self.assertEqual(first.built_at, snapshot.built_at)
+        self.assertEqual(unchanged, seen)
+        self.assertIs(graph_snapshot.get_snapshot(), first)
+        self.assertIsNone(graph_snapshot.reload_if_changed(self.path.with_name("missing.bin")))
+
+
+if __name__ == "__main__":
+    unittest.main()
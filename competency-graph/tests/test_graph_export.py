@@ -0,0 +1,62 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+import networkx as nx
+
+from logic.graph_export import GraphMLWriter, write_graphml
+from logic.graph_store import GraphStore
+
+
+def _sample_data():
+    return {
+        "Kompetents": {"label": "Kompetents", "description": "Sisaldab <märke> & \x01juhtmärke",
+                       "subskills": ["Oskus_A", "Oskus_A"], "tegevusnaitajad": ["Tn_1"]},
+        "Oskus_A": {"label": "Oskus A", "prerequisites": ["Kompetents"],
+                    "relevant_occupations": [{"uri": "http://x/kokk", "label": "kokk"}]},
+    }
+
+
+class GraphMLExportTestCase(unittest.TestCase):
+
+    def test_export_reads_back_with_networkx(self):
+        #Arrange
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / "graph.graphml"
+
+        #Act
+        counts = write_graphml(path, GraphStore.from_data(_sample_data()).as_data(), {"Kompetents": 0})
+        graph = nx.read_graphml(path)
+
+        #Assert
+        self.assertEqual(counts, (2, 3))
+        self.assertEqual(set(graph.nodes), {"Kompetents", "Oskus_A", "Tn_1"})
+        self.assertEqual(graph.nodes["Kompetents"]["description"], "Sisaldab <märke> & juhtmärke")
+        self.assertEqual(graph.nodes["Kompetents"]["depth"], 0)
+        self.assertEqual(graph.edges["Kompetents", "Tn_1"]["relation"], "tegevusnaitajad")
+        self.assertEqual(graph.edges["Oskus_A", "Kompetents"]["relation"], "prerequisites")
+        self.assertIn("kokk", graph.nodes["Oskus_A"]["relevant_occupations"])
+
+    def test_nodes_are_written_as_they_arrive(self):
+        #Arrange
+        out = io.StringIO()
+        writer = GraphMLWriter(out)
+
+        #Act
+        writer.add_node("Oskus_A", {"label": "Oskus A", "subskills": ["Oskus_B"]})
+        written = out.getvalue()
+        writer.add_node("Oskus_B", {"label": "Oskus B"}, depth=1)
+        writer.add_node("Oskus_B", {"label": "Oskus B"})
+        writer.close()
+
+        #Assert
+        self.assertIn('<node id="Oskus_A">', written)
+        self.assertIn('target="Oskus_B"', written)
+        self.assertEqual(out.getvalue().count('<node id="Oskus_B"'), 1)
+        self.assertTrue(out.getvalue().endswith("</graphml>\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+from logic import graph_layout
+from logic.graph_layout import compute_layout, force_layout, hierarchical_layout
+from logic.graph_store import GraphStore
+
+
+def _sample_store():
+    data = {
+        "Kompetents": {"label": "Kompetents", "subskills": ["Oskus_A", "Oskus_B"], "prerequisites": []},
+        "Oskus_A": {"label": "Oskus A", "subskills": [], "prerequisites": ["Oskus_B", "Puuduv"]},
+        "Oskus_B": {"label": "Oskus B", "subskills": [], "prerequisites": []},
+        "Eraldi": {"label": "Eraldi"},
+    }
+    return GraphStore.from_data(data, {"Kompetents": 0, "Oskus_A": 1, "Oskus_B": 1})
+
+
+class GraphLayoutTestCase(unittest.TestCase):
+
+    def test_force_layout_is_deterministic_and_finite(self):
+        #Arrange
+        store = _sample_store()
+
+        #Act
+        first = compute_layout(store, "force")
+        second = compute_layout(store, "force")
+
+        #Assert
+        present = store.present
+        self.assertEqual(first.shape, (len(store.keys), 2))
+        self.assertTrue(np.isfinite(first[present]).all())
+        self.assertTrue(np.isnan(first[~present]).all())  # "Puuduv" pole kraabitud
+        np.testing.assert_array_equal(first, second)
+
+    def test_force_layout_pulls_linked_nodes_closer(self):
+        #Arrange: kaks klastrit, üks sild
+        src = np.array([0, 1, 2, 4, 5, 6, 3])
+        dst = np.array([1, 2, 3, 5, 6, 7, 4])
+
+        #Act
+        pos = force_layout(8, src, dst)
+
+        #Assert
+        dist = np.linalg.norm(pos[:, None] - pos[None, :], axis=-1)
+        self.assertLess(dist[0, 1], dist[0, 7])
+
+    def test_grid_repulsion_spreads_nodes(self):
+        #Arrange
+        old = graph_layout.EXACT_REPULSION_MAX
+        graph_layout.EXACT_REPULSION_MAX = 10
+
+        #Act
+        try:
+            pos = force_layout(300, np.arange(299), np.arange(1, 300), iterations=50)
+        finally:
+            graph_layout.EXACT_REPULSION_MAX = old
+
+        #Assert
+        self.assertTrue(np.isfinite(pos).all())
+        self.assertGreater(pos.std(axis=0).min(), graph_layout.NODE_SPACING)
+
+    def test_hierarchical_layout_rows_follow_levels(self):
+        #Act
+        pos = hierarchical_layout([0, 1, 1, -1], np.array([1, 2]), np.array([0, 0]))
+
+        #Assert
+        self.assertEqual(list(pos[:, 1]), [0, graph_layout.LEVEL_GAP, graph_layout.LEVEL_GAP,
+                                           2 * graph_layout.LEVEL_GAP])
+        self.assertNotEqual(pos[1, 0], pos[2, 0])
+
+    def test_unknown_mode_is_rejected(self):
+        #Assert
+        with self.assertRaises(ValueError):
+            compute_layout(_sample_store(), "ring")
+
+
+if __name__ == '__main__':
+    unittest.main()
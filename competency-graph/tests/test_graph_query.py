@@ -0,0 +1,58 @@
+import unittest
+
+from logic.graph_query import subgraph
+from logic.graph_store import GraphStore
+
+
+def _chain_store():
+    # Komp -> (osa) A -> (eeldab) B -> (eeldab) C ; Komp -> (Tn) T ; Vanem -> (osa) Komp
+    data = {
+        "Komp": {"subskills": ["A"], "tegevusnaitajad": ["T"]},
+        "A": {"prerequisites": ["B"]},
+        "B": {"prerequisites": ["C"]},
+        "C": {},
+        "T": {"knobitid": ["Puuduv"]},
+        "Vanem": {"subskills": ["Komp"]},
+    }
+    return GraphStore.from_data(data)
+
+
+class GraphQueryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.store = _chain_store()
+
+    def test_levels_follow_default_directions(self):
+        #Act
+        result = subgraph(self.store, ["Komp"])
+
+        #Assert
+        self.assertEqual(result.levels, {"Komp": 0, "A": 1, "T": 1, "Vanem": 1, "B": 2, "C": 3})
+
+    def test_depth_limit(self):
+        #Act
+        result = subgraph(self.store, ["Komp"], depth=1)
+
+        #Assert
+        self.assertEqual(set(result.levels), {"Komp", "A", "T", "Vanem"})
+        self.assertIn(("subskills", "Komp", "A"), result.edges)
+        self.assertNotIn(("prerequisites", "A", "B"), result.edges)
+
+    def test_relation_and_direction_filter(self):
+        #Act
+        down = subgraph(self.store, ["A"], relations=["prerequisites"], direction="out")
+        up = subgraph(self.store, ["C"], relations=["prerequisites"], direction="in")
+
+        #Assert
+        self.assertEqual(down.levels, {"A": 0, "B": 1, "C": 2})
+        self.assertEqual(up.levels, {"C": 0, "B": 1, "A": 2})
+        self.assertEqual(sorted(up.edges), [("prerequisites", "A", "B"), ("prerequisites", "B", "C")])
+
+    def test_unknown_seed_and_relation(self):
+        self.assertEqual(len(subgraph(self.store, ["Tundmatu"])), 0)
+        with self.assertRaises(ValueError):
+            subgraph(self.store, ["A"], relations=["sõbrad"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from app import create_app
+from logic import graph_snapshot
+
+
+def _sample_snapshot():
+    data = {
+        "Oskus_A": {"label": "Oskus A", "subskills": ["Oskus_B"], "prerequisites": []},
+        "Oskus_B": {"label": "Oskus B", "subskills": [], "prerequisites": []},
+    }
+    depths = {"Oskus_A": 0, "Oskus_B": 1}
+    return graph_snapshot.GraphSnapshot(data, depths, ["Oskus_A", "Oskus_B"], [], [], [])
+
+
+class GraphSnapshotTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = graph_snapshot.get_snapshot()
+        self.client = create_app({"GRAPH_SNAPSHOT": False, "CACHE_REFRESH": False}).test_client()
+
+    def tearDown(self):
+        graph_snapshot.publish_snapshot(self.previous)
+
+    def test_versions_increase(self):
+        #Arrange & Act
+        first = _sample_snapshot()
+        second = _sample_snapshot()
+
+        #Assert
+        self.assertGreater(second.version, first.version)
+
+    @patch("logic.graph_snapshot.build_snapshot")
+    def test_refresh_keeps_previous_on_empty_build(self, mock_build):
+        #Arrange
+        good = graph_snapshot.publish_snapshot(_sample_snapshot())
+        mock_build.return_value = graph_snapshot.GraphSnapshot({}, {}, [], [], [], [])
+
+        #Act
+        result = graph_snapshot.refresh_snapshot()
+
+        #Assert
+        self.assertIs(result, good)
+        self.assertIs(graph_snapshot.get_snapshot(), good)
+
+    @patch("logic.graph_snapshot.crawl_registry")
+    def test_refresh_keeps_previous_on_incomplete_categories(self, mock_crawl):
+        #Arrange
+        good = graph_snapshot.publish_snapshot(_sample_snapshot())
+        data = {"Oskus_C": {"label": "Oskus C", "subskills": [], "prerequisites": []}}
+        mock_crawl.return_value = (data, {"Oskus_C": 0}, {"oskus": {"Oskus_C"}})
+
+        #Act & Assert
+        with self.assertRaises(RuntimeError):
+            graph_snapshot.refresh_snapshot()
+        self.assertIs(graph_snapshot.get_snapshot(), good)
+
+    @patch("app.routes.graph_routes.crawl")
+    def test_full_graph_is_served_from_snapshot(self, mock_parse):
+        #Arrange
+        graph_snapshot.publish_snapshot(_sample_snapshot())
+
+        #Act
+        resp = self.client.get("/graph")
+
+        #Assert
+        mock_parse.assert_not_called()
+        self.assertEqual(resp.status_code, 200)
+        payload = resp.get_json()
+        self.assertEqual({n["id"] for n in payload["nodes"]}, {"Oskus_A", "Oskus_B"})
+        self.assertEqual(payload["edges"][0]["from"], "Oskus_B")
+
+    @patch("logic.graph_snapshot.compute_layout")
+    def test_layout_is_computed_once_per_snapshot(self, mock_layout):
+        #Arrange
+        snapshot = graph_snapshot.publish_snapshot(_sample_snapshot())
+        mock_layout.return_value = np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32)
+
+        #Act
+        first = self.client.get("/graph").get_json()
+        second = self.client.get("/graph?skill=Oskus A").get_json()
+
+        #Assert
+        mock_layout.assert_called_once_with(snapshot.store)
+        self.assertEqual({n["id"]: (n["x"], n["y"]) for n in first["nodes"]},
+                         {"Oskus_A": (1.0, 2.0), "Oskus_B": (3.0, 4.0)})
+        self.assertEqual(second["nodes"][0]["x"], 1.0)
+
+    @patch("app.routes.graph_routes.crawl")
+    def test_skill_query_uses_snapshot(self, mock_parse):
+        #Arrange
+        graph_snapshot.publish_snapshot(_sample_snapshot())
+
+        #Act
+        resp = self.client.get("/graph?skill=Oskus A&limit_recursion=true&max_depth=1")
+
+        #Assert
+        mock_parse.assert_not_called()
+        payload = resp.get_json()
+        self.assertEqual({n["id"]: n["level"] for n in payload["nodes"]}, {"Oskus_A": 0, "Oskus_B": 1})
+        self.assertEqual(payload["nodes"][0]["type"], "oskus")
+
+    def test_stream_from_snapshot_is_ndjson(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(_sample_snapshot())
+
+        #Act
+        resp = self.client.get("/graph", headers={"Accept": "application/x-ndjson"})
+
+        #Assert
+        self.assertEqual(resp.mimetype, "application/x-ndjson")
+        chunks = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        self.assertEqual([n["id"] for c in chunks for n in c["nodes"]], ["Oskus_A", "Oskus_B"])
+        self.assertEqual([(e["from"], e["to"]) for c in chunks for e in c["edges"]], [("Oskus_B", "Oskus_A")])
+
+    @patch("app.routes.graph_routes.parse_all_data_async")
+    def test_stream_live_crawl_emits_nodes_as_parsed(self, mock_parse):
+        #Arrange
+        async def fake_parse(data_list, options, on_node=None):
+            on_node("Uus", {"label": "Uus", "subskills": ["Osa"]}, 0)
+            on_node("Osa", {"label": "Osa"}, 1)
+            return {}, {}
+
+        mock_parse.side_effect = fake_parse
+
+        #Act
+        resp = self.client.get("/graph?skill=Uus&stream=1")
+
+        #Assert
+        chunks = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        self.assertEqual([n["id"] for c in chunks for n in c["nodes"]], ["Uus", "Osa"])
+        self.assertEqual([(e["from"], e["to"]) for c in chunks for e in c["edges"]], [("Osa", "Uus")])
+
+
+if __name__ == '__main__':
+    unittest.main()
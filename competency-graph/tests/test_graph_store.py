@@ -0,0 +1,60 @@
+import unittest
+
+from logic.graph_store import GraphStore
+
+
+def _sample_data():
+    return {
+        "Kompetents": {"label": "Kompetents", "description": "K", "subskills": ["Oskus_A", "Oskus_B", "Oskus_A"],
+                       "prerequisites": [], "tegevusnaitajad": ["Tn_1"], "knobitid": [], "competencies": []},
+        "Oskus_A": {"label": "Oskus A", "subskills": [], "prerequisites": ["Oskus_B"],
+                    "tegevusnaitajad": [], "knobitid": [], "competencies": []},
+        "Oskus_B": {"label": "Oskus B", "subskills": [], "prerequisites": ["Puuduv"],
+                    "tegevusnaitajad": [], "knobitid": [], "competencies": []},
+    }
+
+
+class GraphStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.store = GraphStore.from_data(_sample_data(), {"Kompetents": 0, "Oskus_A": 1, "Oskus_B": 1})
+
+    def test_forward_and_reverse_neighbours(self):
+        #Assert
+        self.assertEqual(self.store.neighbours("subskills", "Kompetents"), ["Oskus_A", "Oskus_B"])
+        self.assertEqual(self.store.neighbours("prerequisites", "Oskus_B", "in"), ["Oskus_A"])
+        self.assertEqual(self.store.neighbours("subskills", "Oskus_A", "in"), ["Kompetents"])
+        self.assertEqual(self.store.neighbours("subskills", "Tundmatu"), [])
+
+    def test_dangling_targets_are_not_nodes(self):
+        #Assert
+        self.assertEqual(len(self.store), 3)
+        self.assertNotIn("Puuduv", self.store)
+        self.assertNotIn("Tn_1", self.store.as_data())
+        self.assertEqual(self.store.neighbours("prerequisites", "Puuduv", "in"), ["Oskus_B"])
+
+    def test_data_view_matches_original_shape(self):
+        #Arrange
+        expected = _sample_data()
+        expected["Kompetents"]["subskills"] = ["Oskus_A", "Oskus_B"]  # duplikaat eemaldatud
+
+        #Act
+        view = self.store.as_data()
+
+        #Assert
+        self.assertEqual(list(view), ["Kompetents", "Oskus_A", "Oskus_B"])
+        for key, info in expected.items():
+            info.setdefault("tn_eeldab", [])
+            self.assertEqual(view[key], info)
+
+    def test_depth_view(self):
+        #Act
+        depths = self.store.as_depths()
+
+        #Assert
+        self.assertEqual(dict(depths), {"Kompetents": 0, "Oskus_A": 1, "Oskus_B": 1})
+        self.assertEqual(depths.get("Puuduv", -1), -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
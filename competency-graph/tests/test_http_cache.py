@@ -0,0 +1,184 @@
+import gzip
+import json
+import unittest
+from unittest.mock import patch
+
+from app import create_app
+from app.routes import graph_routes
+from logic import graph_snapshot
+from logic.http_cache import PayloadCache, graph_etag
+
+
+def _chain_snapshot(size=40):
+    keys = [f"Oskus_{i}" for i in range(size)]
+    data = {k: {"label": k.replace("_", " "), "subskills": keys[i + 1:i + 2], "prerequisites": []}
+            for i, k in enumerate(keys)}
+    depths = {k: i for i, k in enumerate(keys)}
+    return graph_snapshot.GraphSnapshot(data, depths, keys, [], [], [])
+
+
+class PayloadCacheTestCase(unittest.TestCase):
+
+    def test_lru_is_bounded_by_bytes(self):
+        #Arrange
+        cache = PayloadCache(max_bytes=2500)
+
+        #Act
+        cache.store("a", b"x" * 1000)
+        cache.store("b", b"y" * 1000)
+        cache.fetch("a")                  # "a" on nüüd viimati kasutatud
+        cache.store("c", b"z" * 1000)
+
+        #Assert
+        self.assertEqual(cache.fetch("a"), (b"x" * 1000, None))
+        self.assertIsNone(cache.fetch("b"))
+        self.assertLessEqual(cache.nbytes, 2500)
+
+    def test_compressed_variant_is_made_once(self):
+        #Arrange
+        cache = PayloadCache()
+        body = json.dumps({"nodes": list(range(1000))}).encode("utf-8")
+        cache.store("v1", body)
+
+        #Act
+        with patch("logic.http_cache.compress", side_effect=lambda b, enc: gzip.compress(b)) as mock_compress:
+            first, encoding = cache.fetch("v1", "gzip")
+            second, _ = cache.fetch("v1", "gzip")
+
+        #Assert
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(first, second)
+        self.assertEqual(gzip.decompress(first), body)
+        self.assertEqual(mock_compress.call_count, 1)
+
+    def test_etag_depends_on_version_and_params(self):
+        #Assert
+        self.assertEqual(graph_etag(3, "", False), graph_etag(3, "", False))
+        self.assertNotEqual(graph_etag(3, "", False), graph_etag(4, "", False))
+        self.assertNotEqual(graph_etag(3, "", False), graph_etag(3, "Oskus_A", False))
+
+
+class GraphConditionalRequestTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = graph_snapshot.get_snapshot()
+        self.client = create_app({"GRAPH_SNAPSHOT": False, "CACHE_REFRESH": False}).test_client()
+        graph_routes.GRAPH_PAYLOADS.clear()
+
+    def tearDown(self):
+        graph_snapshot.publish_snapshot(self.previous)
+        graph_routes.GRAPH_PAYLOADS.clear()
+
+    def test_matching_etag_gets_304(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(_chain_snapshot())
+        first = self.client.get("/graph")
+
+        #Act
+        with patch("app.routes.graph_routes.build_graph_payload") as mock_build:
+            second = self.client.get("/graph", headers={"If-None-Match": first.headers["ETag"]})
+
+        #Assert
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.headers["ETag"].startswith('W/"'))
+        self.assertEqual(first.headers["Cache-Control"], "no-cache")
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b"")
+        self.assertEqual(second.headers["ETag"], first.headers["ETag"])
+        mock_build.assert_not_called()
+
+    def test_repeated_query_is_served_from_payload_cache(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(_chain_snapshot())
+        first = self.client.get("/graph?skill=Oskus_3&limit_recursion=true&max_depth=2")
+
+        #Act
+        with patch("app.routes.graph_routes.build_graph_payload") as mock_build:
+            second = self.client.get("/graph?skill=Oskus_3&limit_recursion=true&max_depth=2")
+
+        #Assert
+        mock_build.assert_not_called()
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual({n["id"] for n in second.get_json()["nodes"]}, {f"Oskus_{i}" for i in range(1, 6)})
+
+    def test_gzip_is_negotiated(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(_chain_snapshot())
+        plain = self.client.get("/graph")
+
+        #Act
+        resp = self.client.get("/graph", headers={"Accept-Encoding": "gzip"})
+
+        #Assert
+        self.assertEqual(resp.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", resp.headers["Vary"])
+        self.assertEqual(resp.headers["ETag"], plain.headers["ETag"])
+        self.assertEqual(json.loads(gzip.decompress(resp.data)), plain.get_json())
+
+    def test_new_snapshot_changes_etag(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(_chain_snapshot())
+        old = self.client.get("/graph")
+        graph_snapshot.publish_snapshot(_chain_snapshot(size=5))
+
+        #Act
+        resp = self.client.get("/graph", headers={"If-None-Match": old.headers["ETag"]})
+
+        #Assert
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp.headers["ETag"], old.headers["ETag"])
+        self.assertEqual(len(resp.get_json()["nodes"]), 5)
+
+    def test_client_stream_request_gets_etag_and_304(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(_chain_snapshot())
+        url = "/graph?skill=&stream=1"   # nii küsib static/ts/graph.ts lehe laadimisel
+        first = self.client.get(url, headers={"Accept-Encoding": "gzip"})
+
+        #Act
+        with patch("app.routes.graph_routes.iter_graph_chunks") as mock_chunks:
+            second = self.client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+            third = self.client.get(url)
+
+        #Assert
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.mimetype, "application/x-ndjson")
+        self.assertEqual(first.headers["Content-Encoding"], "gzip")
+        lines = [json.loads(line) for line in gzip.decompress(first.data).decode("utf-8").splitlines()]
+        self.assertEqual(sum(len(chunk["nodes"]) for chunk in lines), 40)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.mimetype, "application/x-ndjson")
+        self.assertEqual(third.data, gzip.decompress(first.data))
+        mock_chunks.assert_not_called()
+
+    def test_stream_and_json_answers_have_different_etags(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(_chain_snapshot())
+
+        #Act
+        stream = self.client.get("/graph?stream=1")
+        plain = self.client.get("/graph")
+
+        #Assert
+        self.assertNotEqual(stream.headers["ETag"], plain.headers["ETag"])
+        self.assertEqual(plain.mimetype, "application/json")
+
+    @patch("app.routes.graph_routes.crawl")
+    def test_live_crawl_has_no_etag(self, mock_crawl):
+        #Arrange
+        graph_snapshot.publish_snapshot(None)
+        mock_crawl.return_value = ({"Oskus_X": {"label": "X", "subskills": ["Oskus_Y"]},
+                                    "Oskus_Y": {"label": "Y", "subskills": []}}, {"Oskus_X": 0, "Oskus_Y": 1})
+
+        #Act
+        resp = self.client.get("/graph?skill=Oskus_X")
+
+        #Assert
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn("ETag", resp.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import json
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app import create_app
+from logic import job_utils
+from logic.job_store import JobStore
+
+
+class JobStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+
+    def _store(self, legacy=None):
+        store = JobStore(self.dir / "jobs.db", legacy_json=legacy)
+        self.addCleanup(store.close)
+        return store
+
+    def test_migrates_json_once_in_file_order(self):
+        #Arrange
+        legacy = self.dir / "ametikohad.json"
+        legacy.write_text(json.dumps([
+            {"name": "kokk", "description": "d", "note": "n", "skills": ["Analüütiline mõtlemine"]},
+            {"name": "it", "skills": ["Projektijuhtimine", ""], "palk": 2000},
+        ]), encoding="utf-8")
+
+        #Act
+        first = self._store(legacy).all()
+        first_ids = [j["id"] for j in first]
+        again = JobStore(self.dir / "jobs.db", legacy_json=legacy)
+        self.addCleanup(again.close)
+
+        #Assert
+        self.assertEqual([j["name"] for j in first], ["kokk", "it"])
+        self.assertEqual(first[1]["skills"], ["Projektijuhtimine"])
+        self.assertEqual(first[1]["palk"], 2000)
+        self.assertEqual([j["id"] for j in again.all()], first_ids)
+
+    def test_ids_are_stable_across_deletes(self):
+        #Arrange
+        store = self._store()
+        a = store.create({"name": "a", "skills": ["x"]})
+        b = store.create({"name": "b", "skills": ["x", "y"]})
+        c = store.create({"name": "c", "skills": []})
+
+        #Act
+        store.delete(a)
+        updated = store.update(c, {"name": "c2", "skills": ["y"]})
+
+        #Assert
+        self.assertTrue(updated)
+        self.assertFalse(store.update(a, {"name": "gone"}))
+        self.assertEqual(store.id_at(0), b)
+        self.assertEqual(store.get(c)["name"], "c2")
+        self.assertEqual(store.jobs_with_skill("y"), [b, c])
+        self.assertEqual(store.jobs_with_skill("x"), [b])
+
+    def test_concurrent_creates_are_not_lost(self):
+        #Arrange
+        store = self._store()
+
+        def add(i):
+            for j in range(20):
+                store.create({"name": f"{i}-{j}", "skills": [str(j)]})
+
+        #Act
+        threads = [threading.Thread(target=add, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        #Assert
+        self.assertEqual(len(store), 80)
+
+    def test_revision_sees_writes_from_other_connections(self):
+        #Arrange
+        store = self._store()
+        other = self._store()   # teine protsess samal failil
+        start = store.revision
+
+        #Act
+        other.create({"name": "kokk", "skills": ["a"]})
+        after_create = store.revision
+        with sqlite3.connect(self.dir / "jobs.db") as conn:   # väline tööriist
+            conn.execute("UPDATE jobs SET name = 'Kokk'")
+        after_external = store.revision
+
+        #Assert
+        self.assertGreater(after_create, start)
+        self.assertGreater(after_external, after_create)
+
+
+class JobRoutesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = JobStore(Path(tmp.name) / "jobs.db")
+        self.addCleanup(self.store.close)
+        patcher = patch.object(job_utils, "_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = create_app({"GRAPH_SNAPSHOT": False, "CACHE_REFRESH": False}).test_client()
+
+    def test_create_edit_delete_by_id_and_index(self):
+        #Act
+        first = self.client.post("/create_job", json={"name": "kokk", "skills": ["a"]}).get_json()
+        second = self.client.post("/create_job", json={"name": "it", "skills": ["b"]}).get_json()
+        edited = self.client.post("/edit_job", json={"id": second["id"], "job": {"name": "IT", "skills": []}})
+        deleted = self.client.post("/delete_job", json={"index": 0})
+        missing = self.client.post("/delete_job", json={"id": first["id"]})
+        bad_index = self.client.post("/edit_job", json={"index": 5, "job": {}})
+        page = self.client.get("/ametikohad")
+
+        #Assert
+        self.assertTrue(edited.get_json()["success"])
+        self.assertTrue(deleted.get_json()["success"])
+        self.assertEqual(missing.get_json(), {"success": False, "error": "Invalid id"})
+        self.assertEqual(bad_index.get_json(), {"success": False, "error": "Invalid index"})
+        self.assertEqual([(j["id"], j["name"]) for j in self.store.all()], [(second["id"], "IT")])
+        self.assertIn(f'data-id="{second["id"]}"', page.get_data(as_text=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
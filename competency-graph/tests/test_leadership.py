@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+from app import create_app
+from logic import leadership
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PROBE = "import sys; from logic import leadership; print(leadership.acquire(sys.argv[1]))"
+
+
+def _acquire_in_other_process(path):
+    proc = subprocess.run([sys.executable, "-c", _PROBE, path], cwd=ROOT, capture_output=True, text=True, check=True)
+    return proc.stdout.strip() == "True"
+
+
+def _threads_after_create_app(lock_path, snapshot_path):
+    # käivitub spawn'itud töötajas, nagu parse-pooli protsess
+    create_app({"BACKGROUND_LOCK_FILE": lock_path, "GRAPH_SNAPSHOT_FILE": snapshot_path})
+    return sorted(t.name for t in threading.enumerate())
+
+
+@unittest.skipIf(leadership.fcntl is None, "flock is not available on this platform")
+class LeadershipTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "background.lock")
+        self.addCleanup(leadership.release, self.path)
+
+    def test_only_one_process_leads(self):
+        #Act
+        first = leadership.acquire(self.path)
+        again = leadership.acquire(self.path)
+        other = _acquire_in_other_process(self.path)
+
+        #Assert
+        self.assertTrue(first)
+        self.assertTrue(again)
+        self.assertFalse(other)
+
+    def test_lock_is_free_after_release(self):
+        #Arrange
+        leadership.acquire(self.path)
+
+        #Act
+        leadership.release(self.path)
+
+        #Assert
+        self.assertTrue(_acquire_in_other_process(self.path))
+
+    @patch("logic.cache_refresher.start_cache_refresher")
+    @patch("logic.graph_snapshot.start_follower")
+    @patch("logic.graph_snapshot.start_refresher")
+    def test_followers_do_not_crawl(self, mock_refresher, mock_follower, mock_cache_refresher):
+        #Arrange
+        config = {"BACKGROUND_LOCK_FILE": self.path, "GRAPH_SNAPSHOT_FILE": "graph.bin"}
+
+        #Act
+        with patch("logic.leadership.acquire", return_value=False):
+            create_app(config)
+
+        #Assert
+        mock_refresher.assert_not_called()
+        mock_follower.assert_called_once_with("graph.bin")
+        mock_cache_refresher.assert_not_called()
+
+    @patch("logic.graph_snapshot.start_refresher")
+    def test_background_jobs_can_be_disabled(self, mock_refresher):
+        #Act
+        with patch("logic.leadership.acquire") as mock_acquire:
+            create_app({"BACKGROUND_JOBS": False, "CACHE_REFRESH": False})
+
+        #Assert
+        mock_acquire.assert_not_called()
+        mock_refresher.assert_not_called()
+
+    def test_spawned_worker_starts_no_background_threads(self):
+        #Arrange
+        snapshot_path = os.path.join(self.tmp.name, "graph.bin")
+
+        #Act
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            threads = pool.submit(_threads_after_create_app, self.path, snapshot_path).result()
+
+        #Assert
+        self.assertFalse([t for t in threads if "refresher" in t or "follower" in t])
+        self.assertTrue(leadership.acquire(self.path))   # töötaja ei võtnud juhi lukku
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from app import create_app
+from logic import graph_utils, metrics
+from logic.metrics import Registry, crawl_summary, track
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def test_render_prometheus_text(self):
+        #Arrange
+        registry = Registry()
+        hits = registry.counter("demo_hits_total", "Hits", ("tier",))
+        latency = registry.histogram("demo_seconds", "Latency", buckets=(0.1, 1.0))
+        registry.collector(lambda: [("demo_ratio", "gauge", "Ratio", [({}, 0.5)])])
+
+        #Act
+        hits.inc(tier="rdf_v2")
+        hits.inc(2, tier="rdf_v2")
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+        text = registry.render()
+
+        #Assert
+        self.assertIn("# TYPE demo_hits_total counter", text)
+        self.assertIn('demo_hits_total{tier="rdf_v2"} 3', text)
+        self.assertIn('demo_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('demo_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('demo_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("demo_seconds_count 3", text)
+        self.assertIn("demo_ratio 0.5", text)
+
+    def test_wrong_labels_are_rejected(self):
+        #Arrange
+        counter = Registry().counter("demo_total", "Demo", ("tier",))
+
+        #Assert
+        with self.assertRaises(ValueError):
+            counter.inc(stage="x")
+
+    def test_summaries_are_isolated_per_crawl(self):
+        #Arrange
+        async def one_crawl(n):
+            with crawl_summary() as summary:
+                async def task():
+                    track("fetches", n)
+                await asyncio.gather(task(), task())
+                return summary.as_dict()["counts"]["fetches"]
+
+        async def both():
+            return await asyncio.gather(one_crawl(1), one_crawl(10))
+
+        #Act
+        result = asyncio.run(both())
+
+        #Assert
+        self.assertEqual(result, [2, 20])
+        track("fetches")  # väljaspool kraapimist ei tee midagi
+        self.assertIsNone(metrics.current_summary())
+
+    @patch("logic.graph_utils._load_record")
+    def test_crawl_produces_summary(self, mock_load):
+        #Arrange
+        async def fake_load(session, skill_name, executor=None, revalidate=False):
+            track("record_cache_hits")
+            return {"subject": "s", "description": "", "esco_link": "", "esco_vaste": "", "osk_reg_kood": "",
+                    "skill_verb": "", "relevant_occupations": [],
+                    "objects": {str(p): [] for p in graph_utils.OUT_RELATIONS},
+                    "subjects": {str(p): [] for p in graph_utils.IN_RELATIONS}}
+
+        mock_load.side_effect = fake_load
+
+        #Act
+        with patch.object(graph_utils, "PARSE_EXECUTOR", "inline"), patch.object(graph_utils, "CRAWL_SUMMARY", False):
+            asyncio.run(graph_utils.parse_all_data_async(["Oskus_A", "Oskus_B"]))
+
+        #Assert
+        summary = graph_utils.last_crawl_summary()
+        self.assertEqual(summary["nodes"], 2)
+        self.assertEqual(summary["counts"]["record_cache_hits"], 2)
+        self.assertEqual(summary["counts"]["nodes"], 2)
+        self.assertIn("crawl", summary["stages_sec"])
+
+    def test_metrics_endpoint(self):
+        #Arrange
+        client = create_app({"GRAPH_SNAPSHOT": False, "CACHE_REFRESH": False}).test_client()
+
+        #Act
+        resp = client.get("/metrics")
+
+        #Assert
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.mimetype, "text/plain")
+        text = resp.get_data(as_text=True)
+        self.assertIn("# TYPE crawl_fetch_seconds histogram", text)
+        self.assertIn("crawl_limiter_rate", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from logic import rate_control
+from logic.rate_control import AdaptiveLimiter, parse_retry_after
+
+
+class FakeResp:
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+
+
+class AdaptiveLimiterTestCase(unittest.TestCase):
+
+    def _run(self, limiter, status, latency=0.0):
+        async def one():
+            async with limiter.slot() as slot:
+                slot.started -= latency
+                slot.observe(FakeResp(status))
+        asyncio.run(one())
+
+    def test_healthy_responses_increase_rate(self):
+        #Arrange
+        limiter = AdaptiveLimiter(rate=1000, concurrency=4, max_rate=2000)
+
+        #Act
+        for _ in range(20):
+            self._run(limiter, 200)
+
+        #Assert
+        stats = limiter.stats()
+        self.assertGreater(stats["rate"], 1000)
+        self.assertGreater(stats["concurrency"], 4)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_slow_responses_hold_rate(self):
+        #Arrange
+        limiter = AdaptiveLimiter(rate=1000, concurrency=4)
+        self._run(limiter, 200, latency=0.01)
+        rate = limiter.stats()["rate"]
+
+        #Act
+        self._run(limiter, 200, latency=1.0)
+
+        #Assert
+        self.assertEqual(limiter.stats()["rate"], rate)
+
+    def test_one_fast_outlier_does_not_freeze_growth(self):
+        #Arrange
+        limiter = AdaptiveLimiter(rate=1000, concurrency=4, max_rate=5000)
+        self._run(limiter, 304, latency=0.001)   # kehata vastus ei loe baasjoonde
+        self._run(limiter, 200, latency=0.001)   # üksik erakordselt kiire 200
+        for _ in range(rate_control.LATENCY_WINDOW):
+            self._run(limiter, 200, latency=0.1)
+        rate = limiter.stats()["rate"]
+
+        #Act
+        self._run(limiter, 200, latency=0.1)
+
+        #Assert
+        self.assertGreater(limiter.stats()["rate"], rate)
+
+    def test_throttle_halves_rate_and_pauses(self):
+        #Arrange
+        limiter = AdaptiveLimiter(rate=1000, concurrency=8)
+
+        #Act
+        async def throttled():
+            async with limiter.slot() as slot:
+                slot.observe(FakeResp(429, {"Retry-After": "2"}))
+        asyncio.run(throttled())
+
+        #Assert
+        stats = limiter.stats()
+        self.assertEqual(stats["rate"], 1000 * rate_control.BACKOFF_FACTOR)
+        self.assertEqual(stats["concurrency"], 4)
+        self.assertGreater(stats["paused_for"], 1.5)
+        self.assertEqual(stats["throttled"], 1)
+
+    def test_timeout_counts_as_throttle(self):
+        #Arrange
+        limiter = AdaptiveLimiter(rate=1000, concurrency=8)
+
+        async def timed_out():
+            async with limiter.slot():
+                raise asyncio.TimeoutError()
+
+        #Act
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(timed_out())
+
+        #Assert
+        self.assertEqual(limiter.stats()["throttled"], 1)
+        self.assertEqual(limiter.stats()["in_flight"], 0)
+
+    def test_concurrency_limit_is_shared_across_event_loops(self):
+        #Arrange
+        limiter = AdaptiveLimiter(rate=1000, concurrency=2)
+        peak, lock = [0], threading.Lock()
+
+        async def worker():
+            async with limiter.slot() as slot:
+                with lock:
+                    peak[0] = max(peak[0], limiter.stats()["in_flight"])
+                await asyncio.sleep(0.05)
+                slot.outcome = "error"  # ära muuda limiite
+
+        #Act
+        threads = [threading.Thread(target=lambda: asyncio.run(worker())) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        #Assert
+        self.assertEqual(peak[0], 2)
+
+    def test_parse_retry_after(self):
+        #Assert
+        self.assertEqual(parse_retry_after("120"), 120.0)
+        self.assertAlmostEqual(parse_retry_after("Thu, 01 Jan 1970 00:01:00 GMT", now=30), 30.0)
+        self.assertIsNone(parse_retry_after("varsti"))
+        self.assertIsNone(parse_retry_after(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import tempfile
+import unittest
+import zlib
+
+from diskcache import Cache
+
+from logic import rdf_cache
+from logic.rdf_cache import RdfCache
+
+RDF = b'<?xml version="1.0"?><rdf:RDF>' + b"<swivt:Subject>Oskus</swivt:Subject>" * 200 + b"</rdf:RDF>"
+
+
+class RdfCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _cache(self, **kwargs):
+        cache = RdfCache(self.tmp.name, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_blobs_round_trip_compressed(self):
+        #Arrange
+        cache = self._cache(compression="zlib")
+
+        #Act
+        cache.set("rdf_v2:Oskus", RDF, expire=60)
+        cache.set("rec_v1:Oskus", {"subject": "s"})
+
+        #Assert
+        self.assertEqual(cache.get("rdf_v2:Oskus"), RDF)
+        self.assertEqual(cache.get("rec_v1:Oskus"), {"subject": "s"})
+        raw = Cache(self.tmp.name).get("rdf_v2:Oskus")
+        self.assertEqual(zlib.decompress(raw[len(rdf_cache._MAGIC) + 1:]), RDF)
+        self.assertGreater(cache.stats()["bytes_saved"], len(RDF) // 2)
+
+    def test_reads_uncompressed_legacy_entries(self):
+        #Arrange
+        with Cache(self.tmp.name) as legacy:
+            legacy.set("rdf_v2:Vana", RDF)
+        cache = self._cache()
+
+        #Act & Assert
+        self.assertEqual(cache.get("rdf_v2:Vana"), RDF)
+
+    def test_hit_and_miss_counters_per_tier(self):
+        #Arrange
+        cache = self._cache()
+        cache.set("rdf_v2:A", RDF)
+
+        #Act
+        cache.get("rdf_v2:A")
+        cache.get("rdf_v2:B")
+        cache.get("rec_v1:A", default=None)
+
+        #Assert
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertEqual(stats["tiers"]["rdf_v2"], {"hits": 1, "misses": 1})
+        self.assertEqual(stats["tiers"]["rec_v1"], {"hits": 0, "misses": 1})
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        #Arrange: pakkimata 40 KB blob'id, eelarve ~15 jaoks (diskcache kustutab 10 kaupa)
+        cache = self._cache(compression="none", size_limit=600_000)
+        blob = b"x" * 40_000
+
+        #Act
+        for i in range(30):
+            cache.set(f"rdf_v2:{i}", blob)
+            cache.get("rdf_v2:0")  # 0 on alati viimati kasutatud
+
+        #Assert
+        stats = cache.stats()
+        self.assertGreater(stats["evictions"], 0)
+        self.assertLessEqual(stats["volume"], 600_000)
+        self.assertIn("rdf_v2:0", cache)
+        self.assertNotIn("rdf_v2:1", cache)
+
+    def test_iterkeys_with_prefix_lists_only_live_matching_keys(self):
+        #Arrange
+        cache = self._cache()
+        cache.set("neg_v1:A", {"kind": "404"})
+        cache.set("neg_v1:B", {"kind": "parse"}, expire=-1)
+        cache.set("rdf_v2:A", RDF)
+        cache.set("neg_v10:C", {"kind": "404"})
+
+        #Act
+        keys = list(cache.iterkeys(prefix="neg_v1:"))
+
+        #Assert
+        self.assertEqual(keys, ["neg_v1:A"])
+        self.assertEqual(len(list(cache.iterkeys())), 4)
+
+    def test_unknown_compression_is_rejected(self):
+        #Assert
+        with self.assertRaises(ValueError):
+            self._cache(compression="lz4")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+from logic import graph_utils
+from logic.metrics import crawl_summary
+from logic.rdf_cache import RdfCache
+from logic.rdf_extract import parse_triples
+
+# SMW Special:ExportRDF kujul leht päris predikaatidega
+SMW_XML = b"""<?xml version="1.0" encoding="UTF-8" ?>
+<!DOCTYPE rdf:RDF[
+  <!ENTITY rdf 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'>
+  <!ENTITY rdfs 'http://www.w3.org/2000/01/rdf-schema#'>
+  <!ENTITY swivt 'http://semantic-mediawiki.org/swivt/1.0#'>
+  <!ENTITY wiki 'http://oppekava.edu.ee/a/Special:URIResolver/'>
+  <!ENTITY property 'http://oppekava.edu.ee/a/Special:URIResolver/Property-3A'>
+]>
+<rdf:RDF xmlns:rdf="&rdf;" xmlns:rdfs="&rdfs;" xmlns:swivt="&swivt;"
+         xmlns:property="&property;" xmlns:schema="https://schema.org/">
+  <swivt:Subject rdf:about="&wiki;Probleemilahendus">
+    <schema:name>Probleemilahendus</schema:name>
+    <schema:description>Oskus lahendada probleeme</schema:description>
+    <rdfs:label>Probleemilahendus</rdfs:label>
+    <property:Haridus-3AosaOskus rdf:resource="&wiki;Analuusioskus"/>
+    <property:Haridus-3AeeldusOskus rdf:resource="&wiki;Loogiline_motlemine"/>
+    <property:Haridus-3Aesco_link rdf:datatype="http://www.w3.org/2001/XMLSchema#string">http://esco/1</property:Haridus-3Aesco_link>
+    <property:Schema-3ArelevantOccupation>
+      <rdf:Description rdf:about="&wiki;Insener">
+        <rdfs:label>Insener</rdfs:label>
+      </rdf:Description>
+    </property:Schema-3ArelevantOccupation>
+  </swivt:Subject>
+  <swivt:Subject rdf:about="&wiki;Kriitiline_motlemine">
+    <property:Haridus-3AosaOskus rdf:resource="&wiki;Probleemilahendus"/>
+  </swivt:Subject>
+</rdf:RDF>
+"""
+
+
+class RdfExtractTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # _process_one kirjutab parsitud kirjed cache'i, ära risusta päris ./rdf_cache'it
+        self.tmp = tempfile.TemporaryDirectory()
+        cache = RdfCache(self.tmp.name)
+        patcher = patch.object(graph_utils, "CACHE", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(cache.close)
+
+    def test_parse_triples_keeps_only_requested_predicates(self):
+        #Act
+        index = parse_triples(SMW_XML, {graph_utils.OSAOSKUS})
+
+        #Assert
+        self.assertEqual(len(index), 2)
+        subjects = set(index.subjects(predicate=graph_utils.OSAOSKUS))
+        self.assertIn("http://oppekava.edu.ee/a/Special:URIResolver/Kriitiline_motlemine", subjects)
+
+    def test_parse_triples_nested_node_and_literal(self):
+        #Act
+        index = parse_triples(SMW_XML)
+
+        #Assert
+        subj = "http://oppekava.edu.ee/a/Special:URIResolver/Probleemilahendus"
+        occ = index.value(subj, graph_utils.RELEVANT_OCCUPATION)
+        self.assertEqual(occ, "http://oppekava.edu.ee/a/Special:URIResolver/Insener")
+        self.assertEqual(index.value(occ, graph_utils.RDFS.label), "Insener")
+        self.assertEqual(index.value(subj, graph_utils.ESCO_LINK), "http://esco/1")
+
+    def test_parse_triples_parse_type_resource_and_base(self):
+        #Arrange
+        xml = b"""<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+                        xmlns:ex="http://example.com/" xml:base="http://example.com/">
+            <rdf:Description rdf:ID="a" ex:name="A">
+              <ex:part rdf:parseType="Resource"><ex:name>inner</ex:name></ex:part>
+              <ex:link rdf:resource="b"/>
+            </rdf:Description>
+          </rdf:RDF>"""
+
+        #Act
+        index = parse_triples(xml)
+
+        #Assert
+        self.assertEqual(index.value("http://example.com/#a", "http://example.com/name"), "A")
+        self.assertEqual(index.value("http://example.com/#a", "http://example.com/link"), "http://example.com/b")
+        blank = index.value("http://example.com/#a", "http://example.com/part")
+        self.assertEqual(index.value(blank, "http://example.com/name"), "inner")
+
+    def test_parse_triples_malformed_raises(self):
+        with self.assertRaises(ET.ParseError):
+            parse_triples(b"<rdf:RDF><broken")
+
+    def test_stream_and_rdflib_records_match(self):
+        #Act
+        streamed = graph_utils.extract_record(SMW_XML, "Probleemilahendus", mode="stream")
+        full = graph_utils.extract_record(SMW_XML, "Probleemilahendus", mode="rdflib")
+
+        #Assert
+        self.assertEqual(streamed, full)
+        self.assertEqual(streamed["description"], "Oskus lahendada probleeme")
+        self.assertEqual(streamed["relevant_occupations"][0]["label"], "Insener")
+
+    def test_stream_falls_back_to_rdflib(self):
+        #Arrange
+        with patch("logic.graph_utils.parse_triples", side_effect=ValueError("unsupported")):
+            #Act
+            rec = graph_utils.extract_record(SMW_XML, "Probleemilahendus", mode="stream")
+
+        #Assert
+        self.assertEqual(rec["esco_link"], "http://esco/1")
+
+    @patch("logic.graph_utils._fetch_rdf")
+    def test_process_one_uses_record(self, mock_fetch):
+        #Arrange
+        mock_fetch.return_value = SMW_XML
+        data, depths, visited = {}, {}, set()
+
+        async def run():
+            q = asyncio.Queue()
+            await graph_utils._process_one(None, "Probleemilahendus", 0, data, depths, q, visited)
+            return [q.get_nowait() for _ in range(q.qsize())]
+
+        #Act
+        queued = asyncio.run(run())
+
+        #Assert
+        node = data["Probleemilahendus"]
+        self.assertEqual(node["subskills"], ["Analuusioskus"])
+        self.assertEqual(node["prerequisites"], ["Loogiline_motlemine"])
+        self.assertEqual(node["relevant_occupations"][0]["uri"],
+                         "http://oppekava.edu.ee/a/Special:URIResolver/Insener")
+        self.assertEqual({name for name, _ in queued},
+                         {"Analuusioskus", "Loogiline_motlemine", "Kriitiline_motlemine"})
+
+    @patch("logic.graph_utils._fetch_rdf")
+    def test_process_one_respects_options_depth(self, mock_fetch):
+        #Arrange
+        mock_fetch.return_value = SMW_XML
+        options = graph_utils.CrawlOptions(limit_recursion=True, max_depth=0)
+
+        async def run():
+            q = asyncio.Queue()
+            await graph_utils._process_one(None, "Probleemilahendus", 0, {}, {}, q, set(), options=options)
+            return q.qsize()
+
+        #Act & Assert
+        self.assertEqual(asyncio.run(run()), 0)
+
+    def test_extract_in_process_pool_matches_inline(self):
+        #Arrange
+        inline = graph_utils.extract_record(SMW_XML, "Probleemilahendus")
+
+        #Act
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pooled = asyncio.run(graph_utils._extract_off_loop(SMW_XML, "Probleemilahendus", pool))
+
+        #Assert
+        self.assertEqual(pooled, inline)
+
+    def test_parse_time_excludes_executor_wait(self):
+        #Arrange
+        pool = ThreadPoolExecutor(1)
+        self.addCleanup(pool.shutdown)
+        pool.submit(time.sleep, 0.3)   # ainus töötaja on hõivatud
+
+        #Act
+        with crawl_summary() as summary:
+            asyncio.run(graph_utils._extract_off_loop(SMW_XML, "Probleemilahendus", pool))
+
+        #Assert
+        self.assertLess(summary.seconds["parse_sec"], 0.2)
+        self.assertGreater(summary.seconds["parse_wait_sec"], 0.2)
+
+    def test_broken_pool_is_replaced(self):
+        #Arrange
+        self.addCleanup(graph_utils.shutdown_parse_executor)
+        with patch.object(graph_utils, "PARSE_EXECUTOR", "process"), patch.object(graph_utils, "PARSE_WORKERS", 1):
+            broken = graph_utils.get_parse_executor()
+            with self.assertRaises(BrokenProcessPool):
+                broken.submit(os._exit, 1).result()   # töötaja sureb
+
+            #Act
+            rec = asyncio.run(graph_utils._extract_off_loop(SMW_XML, "Probleemilahendus", broken))
+            fresh = graph_utils.get_parse_executor()
+
+        #Assert
+        self.assertEqual(rec, graph_utils.extract_record(SMW_XML, "Probleemilahendus"))
+        self.assertIsNot(fresh, broken)
+        self.assertEqual(fresh.submit(abs, -1).result(), 1)
+
+    def test_parse_executor_kinds(self):
+        self.addCleanup(graph_utils.shutdown_parse_executor)
+        with patch.object(graph_utils, "PARSE_EXECUTOR", "inline"):
+            self.assertIsNone(graph_utils.get_parse_executor())
+        with patch.object(graph_utils, "PARSE_EXECUTOR", "thread"):
+            pool = graph_utils.get_parse_executor()
+            self.assertIsInstance(pool, ThreadPoolExecutor)
+            self.assertIs(graph_utils.get_parse_executor(), pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
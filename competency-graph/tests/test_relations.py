@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from app.routes.graph_routes import _edge_payloads
+from logic import graph_query, graph_utils
+from logic.graph_store import RELATIONS
+from logic.relations import BY_FIELD, RELATION_TYPES, Relation, split_triples
+
+WIKI = "http://oppekava.edu.ee/a/Special:URIResolver/"
+
+
+class RelationRegistryTestCase(unittest.TestCase):
+
+    def test_registry_drives_crawler_and_queries(self):
+        #Assert
+        self.assertEqual(RELATIONS, ("subskills", "prerequisites", "tegevusnaitajad", "knobitid", "tn_eeldab"))
+        self.assertEqual(graph_query.DEFAULT_DIRECTIONS["subskills"], "both")
+        self.assertEqual(graph_query.DEFAULT_DIRECTIONS["knobitid"], "out")
+        self.assertEqual(graph_utils.OSAOSKUS, WIKI + "Property-3AHaridus-3AosaOskus")
+        self.assertEqual(graph_utils.IN_RELATIONS, (graph_utils.OSAOSKUS, graph_utils.SEOTUD_OSKUS))
+        self.assertTrue(set(graph_utils.OUT_RELATIONS) <= graph_utils.EXTRACT_PREDICATES)
+
+    def test_split_triples_routes_both_directions_in_one_pass(self):
+        #Arrange
+        me = WIKI + "Oskus_A"
+        triples = [
+            (me, graph_utils.OSAOSKUS, WIKI + "Oskus_B"),
+            (me, graph_utils.TN_EELDAB, WIKI + "Tn_1"),
+            (WIKI + "Kompetents", graph_utils.OSAOSKUS, me),
+            (WIKI + "Kompetents", graph_utils.KOMP_SISALDAB_TN, me),   # ainult alla-suunaline seos
+            (WIKI + "Muu", graph_utils.OSAOSKUS, WIKI + "Oskus_B"),
+            (me, graph_utils.RDFS_LABEL, "Oskus A"),
+        ]
+
+        #Act
+        objects, subjects = split_triples(triples, me)
+
+        #Assert
+        self.assertEqual(objects[graph_utils.OSAOSKUS], [WIKI + "Oskus_B"])
+        self.assertEqual(objects[graph_utils.TN_EELDAB], [WIKI + "Tn_1"])
+        self.assertEqual(objects[graph_utils.SEOTUD_OSKUS], [])
+        self.assertEqual(subjects, {graph_utils.OSAOSKUS: [WIKI + "Kompetents"], graph_utils.SEOTUD_OSKUS: []})
+
+    def test_edges_use_registry_style(self):
+        #Arrange
+        info = {"subskills": ["Oskus_B"], "prerequisites": ["Oskus_C"], "tn_eeldab": ["Tn_1"]}
+
+        #Act
+        edges = dict(_edge_payloads("Oskus_A", info))
+        filtered = [target for target, _ in _edge_payloads("Oskus_A", info, {"prerequisites"})]
+
+        #Assert
+        self.assertEqual(edges["Oskus_B"], {"from": "Oskus_B", "to": "Oskus_A", "color": "#e76f51",
+                                            "label": "koosneb", "dashes": True,
+                                            "arrows": {"to": {"enabled": True, "type": "vee"}}})
+        self.assertEqual(edges["Oskus_C"]["label"], BY_FIELD["prerequisites"].label)
+        self.assertEqual(edges["Tn_1"]["color"], "#0077b6")
+        self.assertEqual(filtered, ["Oskus_C"])
+
+    @patch("logic.graph_utils._load_record")
+    def test_new_relation_type_is_one_registry_entry(self, mock_load):
+        #Arrange
+        seotud = Relation("seotud", graph_utils.SEOTUD, "out", "seotud", "#999999", follow=False)
+
+        async def fake_load(session, skill_name, executor=None, revalidate=False):
+            return {"subject": WIKI + skill_name, "description": "", "esco_link": "", "esco_vaste": "",
+                    "osk_reg_kood": "", "skill_verb": "", "relevant_occupations": [],
+                    "objects": {graph_utils.OSAOSKUS: [WIKI + "Oskus_B"], graph_utils.SEOTUD: [WIKI + "Oskus_C"]},
+                    "subjects": {}}
+
+        mock_load.side_effect = fake_load
+        data, depths, visited = {}, {}, set()
+
+        async def run():
+            q = asyncio.Queue()
+            await graph_utils._process_one(None, "Oskus_A", 0, data, depths, q, visited)
+            return [q.get_nowait()[0] for _ in range(q.qsize())]
+
+        #Act
+        with patch.object(graph_utils, "RELATION_TYPES", RELATION_TYPES + (seotud,)):
+            queued = asyncio.run(run())
+
+        #Assert
+        self.assertEqual(data["Oskus_A"]["subskills"], ["Oskus_B"])
+        self.assertEqual(data["Oskus_A"]["seotud"], ["Oskus_C"])
+        self.assertEqual(queued, ["Oskus_B"])  # follow=False: Oskus_C jääb järjekorrast välja
+        self.assertEqual(seotud.edge("Oskus_A", "Oskus_C")["label"], "seotud")
+
+
+if __name__ == "__main__":
+    unittest.main()
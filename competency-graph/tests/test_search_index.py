@@ -0,0 +1,91 @@
+import unittest
+
+from app import create_app
+from logic import graph_snapshot
+from logic.graph_store import GraphStore
+from logic.search_index import SearchIndex, fold
+
+
+def _sample_data():
+    return {
+        "Õppimisoskus": {"label": "Õppimisoskus", "description": "Oskus õppida iseseisvalt",
+                         "osk_reg_kood": "OSK-101"},
+        "Õppimise_planeerimine": {"label": "Õppimise planeerimine"},
+        "Šahhi_mängimine": {"label": "Šahhi mängimine", "esco_vaste": "play chess"},
+        "Žanrite_tundmine": {"label": "Žanrite tundmine"},
+        "Müügitöö": {"label": "Müügitöö", "description": "Klientide nõustamine ja äriläbirääkimised"},
+        "Analüütiline_mõtlemine": {"label": "Analüütiline mõtlemine"},
+    }
+
+
+class SearchIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SearchIndex(GraphStore.from_data(_sample_data()))
+
+    def keys(self, query):
+        return [hit["key"] for hit in self.index.search(query)]
+
+    def test_fold_drops_estonian_diacritics(self):
+        #Assert
+        self.assertEqual(fold("Õõ Ää Öö Üü Šš Žž"), "oo aa oo uu ss zz")
+        self.assertEqual(self.keys("sahhi"), ["Šahhi_mängimine"])
+        self.assertEqual(self.keys("ZANRITE"), ["Žanrite_tundmine"])
+        self.assertEqual(self.keys("muugitoo"), ["Müügitöö"])
+
+    def test_prefix_ranks_label_start_first(self):
+        #Act
+        hits = self.index.search("õppim")
+
+        #Assert
+        self.assertEqual({h["key"] for h in hits}, {"Õppimisoskus", "Õppimise_planeerimine"})
+        self.assertEqual(hits[0]["label"], "Õppimisoskus")
+        self.assertEqual(self.keys("oppimise plan"), ["Õppimise_planeerimine"])
+
+    def test_other_fields_and_typos(self):
+        #Assert
+        self.assertEqual(self.keys("OSK-101"), ["Õppimisoskus"])
+        self.assertEqual(self.keys("chess"), ["Šahhi_mängimine"])
+        self.assertEqual(self.keys("äriläbirääkimised"), ["Müügitöö"])
+        self.assertEqual(self.keys("analüütline"), ["Analüütiline_mõtlemine"])
+        self.assertEqual(self.keys("xyzzy"), [])
+        self.assertEqual(self.index.search(""), [])
+
+
+class SearchRouteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        previous = graph_snapshot.get_snapshot()
+        self.addCleanup(graph_snapshot.publish_snapshot, previous)
+        self.client = create_app({"GRAPH_SNAPSHOT": False, "CACHE_REFRESH": False}).test_client()
+
+    def test_search_returns_typeahead_items(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(graph_snapshot.GraphSnapshot(
+            _sample_data(), {}, ["Müügitöö"], ["Õppimisoskus"], [], []))
+
+        #Act
+        result = self.client.get("/search?q=oppimisoskus").get_json()
+        limited = self.client.get("/search?q=o&limit=1").get_json()
+        empty = self.client.get("/search?q=").get_json()
+
+        #Assert
+        self.assertEqual(result[0]["value"], "Õppimisoskus")
+        self.assertEqual(result[0]["text"], "Õppimisoskus")
+        self.assertEqual(result[0]["type"], "kompetents")
+        self.assertEqual(len(limited), 1)
+        self.assertEqual(empty, [])
+
+    def test_search_without_snapshot(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(None)
+
+        #Act
+        response = self.client.get("/search?q=oppimine")
+
+        #Assert
+        self.assertEqual(response.status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
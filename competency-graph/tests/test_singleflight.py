@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from logic import graph_utils
+from logic.singleflight import SingleFlight
+
+
+class SingleFlightTestCase(unittest.TestCase):
+
+    def test_concurrent_identical_calls_share_one_run(self):
+        #Arrange
+        flight = SingleFlight()
+        calls = []
+        results = []
+
+        def slow_crawl():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"Oskus": {}}
+
+        def caller():
+            results.append(flight.do("full", slow_crawl))
+
+        #Act
+        threads = [threading.Thread(target=caller) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        #Assert
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_exception_is_shared_and_not_cached(self):
+        #Arrange
+        flight = SingleFlight()
+
+        def broken():
+            raise RuntimeError("upstream down")
+
+        #Act & Assert
+        with self.assertRaises(RuntimeError):
+            flight.do("full", broken)
+        self.assertEqual(flight.do("full", lambda: 42), 42)
+
+    def test_route_and_snapshot_registry_crawls_coalesce(self):
+        #Arrange
+        calls = []
+
+        async def slow_registry(category_urls=None, options=None, on_node=None):
+            calls.append(options)
+            await asyncio.sleep(0.2)
+            return {}, {}, {}
+
+        # /graph fallback annab oma max_depth'i, snapshot'i ehitus kasutab globaale
+        route_options = graph_utils.CrawlOptions(limit_recursion=False, max_depth=5)
+        results = []
+
+        def caller(options):
+            results.append(graph_utils.crawl_registry(options=options))
+
+        #Act
+        with patch.object(graph_utils, "crawl_registry_async", slow_registry):
+            threads = [threading.Thread(target=caller, args=(o,)) for o in (route_options, None)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        #Assert
+        self.assertEqual(len(calls), 1)
+        self.assertIs(results[0], results[1])
+        self.assertNotEqual(graph_utils.CrawlOptions(True, 1).key(), graph_utils.CrawlOptions(True, 2).key())
+
+
+if __name__ == '__main__':
+    unittest.main()
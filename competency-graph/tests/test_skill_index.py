@@ -0,0 +1,135 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app import create_app
+from logic import graph_snapshot, job_utils
+from logic.graph_store import GraphStore
+from logic.job_store import JobStore
+from logic.skill_index import OccupationIndex, skill_index_key
+
+KOKK = {"uri": "http://data.europa.eu/esco/occupation/kokk", "label": "kokk"}
+IT = {"uri": "http://data.europa.eu/esco/occupation/it", "label": "IT-spetsialist"}
+
+
+def _sample_data():
+    return {
+        "Analüütiline_mõtlemine": {"label": "Analüütiline mõtlemine", "relevant_occupations": [KOKK, IT],
+                                   "subskills": ["Mõtlemisoskus"]},
+        "Mõtlemisoskus": {"label": "Mõtlemisoskus", "relevant_occupations": [IT]},
+        "Projektijuhtimine": {"label": "Projektijuhtimine"},
+    }
+
+
+class OccupationIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = OccupationIndex(GraphStore.from_data(_sample_data()))
+
+    def test_skill_to_occupations_by_key_or_label(self):
+        #Assert
+        by_key = self.index.occupations("Analüütiline_mõtlemine")
+        self.assertEqual(by_key, [KOKK, IT])
+        self.assertEqual(self.index.occupations("analüütiline Mõtlemine"), by_key)
+        self.assertEqual(self.index.occupations("Projektijuhtimine"), [])
+        self.assertEqual(self.index.occupations("Tundmatu"), [])
+
+    def test_occupation_to_skills(self):
+        #Assert
+        self.assertEqual(self.index.skills_for(IT["uri"]), ["Analüütiline_mõtlemine", "Mõtlemisoskus"])
+        self.assertEqual(self.index.resolve("mõtlemisoskus"), "Mõtlemisoskus")
+        self.assertEqual(len(self.index), 2)
+
+
+class JobSkillIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "jobs.db"
+
+    def test_typed_names_match_normalised_key(self):
+        #Arrange
+        store = JobStore(self.path)
+        self.addCleanup(store.close)
+        kokk = store.create({"name": "kokk", "skills": ["Analüütiline mõtlemine", "mõtlemisoskus"]})
+        it = store.create({"name": "it", "skills": ["Projektijuhtimine"]})
+
+        #Act
+        found = store.lookup_skill("Analüütiline_mõtlemine")
+        store.update(it, {"name": "it", "skills": ["Mõtlemisoskus"]})
+
+        #Assert
+        self.assertEqual(found, [{"id": kokk, "name": "kokk"}])
+        self.assertEqual(store.jobs_with_skill("MÕTLEMISOSKUS"), [kokk, it])
+        self.assertEqual(store.jobs_with_skill("Projektijuhtimine"), [])
+
+    def test_older_database_gets_skill_keys(self):
+        #Arrange
+        conn = sqlite3.connect(self.path)
+        conn.executescript("""
+            CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL DEFAULT '',
+                description TEXT NOT NULL DEFAULT '', note TEXT NOT NULL DEFAULT '',
+                skills TEXT NOT NULL DEFAULT '[]', extra TEXT NOT NULL DEFAULT '{}', updated_at REAL NOT NULL);
+            CREATE TABLE job_skills (job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+                skill TEXT NOT NULL, PRIMARY KEY (job_id, skill));
+            INSERT INTO jobs (name, skills, updated_at) VALUES ('kokk', '["Aktiivne kuulamine"]', 0);
+            INSERT INTO job_skills (job_id, skill) VALUES (1, 'Aktiivne kuulamine');
+        """)
+        conn.close()
+
+        #Act
+        store = JobStore(self.path)
+        self.addCleanup(store.close)
+
+        #Assert
+        self.assertEqual(store.jobs_with_skill("Aktiivne_kuulamine"), [1])
+        self.assertEqual(skill_index_key("Aktiivne kuulamine"), "aktiivne_kuulamine")
+
+
+class SkillLookupRouteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.jobs = JobStore(Path(tmp.name) / "jobs.db")
+        self.addCleanup(self.jobs.close)
+        patcher = patch.object(job_utils, "_store", self.jobs)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        previous = graph_snapshot.get_snapshot()
+        self.addCleanup(graph_snapshot.publish_snapshot, previous)
+        self.client = create_app({"GRAPH_SNAPSHOT": False, "CACHE_REFRESH": False}).test_client()
+
+    def test_lookup_returns_jobs_and_occupations(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(graph_snapshot.GraphSnapshot(_sample_data(), {}, [], [], [], []))
+        job_id = self.jobs.create({"name": "kokk", "skills": ["analüütiline mõtlemine"]})
+
+        #Act
+        result = self.client.get("/skills/lookup?skill=Analüütiline mõtlemine").get_json()
+
+        #Assert
+        self.assertEqual(result["skill"], "Analüütiline_mõtlemine")
+        self.assertEqual(result["jobs"], [{"id": job_id, "name": "kokk"}])
+        self.assertEqual([o["uri"] for o in result["occupations"]], [KOKK["uri"], IT["uri"]])
+
+    def test_lookup_without_snapshot_still_finds_jobs(self):
+        #Arrange
+        graph_snapshot.publish_snapshot(None)
+        job_id = self.jobs.create({"name": "it", "skills": ["Projektijuhtimine"]})
+
+        #Act
+        result = self.client.get("/skills/lookup?skill=projektijuhtimine").get_json()
+        missing = self.client.get("/skills/lookup")
+
+        #Assert
+        self.assertEqual(result["jobs"], [{"id": job_id, "name": "it"}])
+        self.assertEqual(result["occupations"], [])
+        self.assertEqual(missing.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,4 @@
-import unittest, asyncio
+import unittest, asyncio, tempfile, time
 from unittest.mock import patch, Mock, AsyncMock
 
 import aiohttp
@@ -6,11 +6,53 @@ import pytest
 import requests
 from IPython.core.ultratb import ListTB
 from logic import graph_utils
+from logic.rdf_cache import RdfCache
 from rdflib import URIRef, RDFS, Graph, Literal
 
 SCHEMA = graph_utils.SCHEMA
 BASE_RDF = graph_utils.BASE_RDF
 
+
+class FakeResponse:
+    def __init__(self, status=200, body=b"", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise Exception(f"HTTP {self.status}")
+
+    async def read(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """
+    Minimal aiohttp.ClientSession stand-in: returns the queued responses in order
+    and records the request headers.
+    """
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, dict(headers or {})))
+        return self.responses.pop(0)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
 class MyTestCase(unittest.TestCase):
 
     def test_urls_are_reachable(self):
@@ -395,7 +437,7 @@ class MyTestCase(unittest.TestCase):
 
     @patch("logic.graph_utils._process_one")
     async def test_simple_parse_all_data_async(self, mock_process_one):
-        async def fake_process_one(session, skill_name, depth, data, depths, q, visited):
+        async def fake_process_one(session, skill_name, depth, data, depths, q, visited, **kwargs):
             data[skill_name] = {"label": skill_name}
             if skill_name == "Skill1":
                 await q.put(("Skill2", depth + 1))
@@ -407,5 +449,343 @@ class MyTestCase(unittest.TestCase):
         self.assertIn("Skill1", data)
         self.assertIn("Skill2", data)
 
+
+class FetchRevalidationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RdfCache(self.tmp.name)
+        patcher = patch.object(graph_utils, "CACHE", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(self.cache.close)
+
+    def test_download_stores_validators(self):
+        #Arrange
+        session = FakeSession(FakeResponse(200, b"<rdf>1</rdf>", {"ETag": '"v1"', "Last-Modified": "Mon"}))
+
+        #Act
+        blob = asyncio.run(graph_utils._fetch_rdf(session, "Skill"))
+
+        #Assert
+        self.assertEqual(blob, b"<rdf>1</rdf>")
+        meta = self.cache.get("rdf_meta_v1:Skill")
+        self.assertEqual(meta["etag"], '"v1"')
+        self.assertEqual(meta["last_modified"], "Mon")
+
+    def test_fresh_entry_skips_network(self):
+        #Arrange
+        self.cache.set("rdf_v2:Skill", b"<rdf>1</rdf>")
+        self.cache.set("rdf_meta_v1:Skill", {"etag": '"v1"', "last_modified": None, "checked_at": time.time()})
+        session = FakeSession()
+
+        #Act
+        blob = asyncio.run(graph_utils._fetch_rdf(session, "Skill"))
+
+        #Assert
+        self.assertEqual(blob, b"<rdf>1</rdf>")
+        self.assertEqual(session.requests, [])
+
+    def test_stale_entry_revalidates_with_304(self):
+        #Arrange
+        self.cache.set("rdf_v2:Skill", b"<rdf>old</rdf>")
+        self.cache.set("rdf_meta_v1:Skill", {"etag": '"v1"', "last_modified": "Mon", "checked_at": 0})
+        session = FakeSession(FakeResponse(304))
+
+        #Act
+        blob = asyncio.run(graph_utils._fetch_rdf(session, "Skill"))
+
+        #Assert
+        self.assertEqual(blob, b"<rdf>old</rdf>")
+        _, headers = session.requests[0]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["If-Modified-Since"], "Mon")
+        meta = self.cache.get("rdf_meta_v1:Skill")
+        self.assertEqual(meta["etag"], '"v1"')
+        self.assertGreater(meta["checked_at"], 0)
+
+    def test_stale_entry_replaced_on_200(self):
+        #Arrange
+        self.cache.set("rdf_v2:Skill", b"<rdf>old</rdf>")
+        self.cache.set("rdf_meta_v1:Skill", {"etag": '"v1"', "last_modified": None, "checked_at": 0})
+        session = FakeSession(FakeResponse(200, b"<rdf>new</rdf>", {"ETag": '"v2"'}))
+
+        #Act
+        blob = asyncio.run(graph_utils._fetch_rdf(session, "Skill"))
+
+        #Assert
+        self.assertEqual(blob, b"<rdf>new</rdf>")
+        self.assertEqual(self.cache.get("rdf_v2:Skill"), b"<rdf>new</rdf>")
+        self.assertEqual(self.cache.get("rdf_meta_v1:Skill")["etag"], '"v2"')
+
+    def test_blob_without_meta_gets_default_meta(self):
+        #Arrange
+        self.cache.set("rdf_v2:Skill", b"<rdf>legacy</rdf>")
+        session = FakeSession()
+
+        #Act
+        fresh_before = graph_utils._blob_is_fresh("Skill")
+        blob = asyncio.run(graph_utils._fetch_rdf(session, "Skill"))
+        meta = self.cache.get("rdf_meta_v1:Skill")
+
+        #Assert
+        self.assertFalse(fresh_before)
+        self.assertEqual(blob, b"<rdf>legacy</rdf>")
+        self.assertEqual(session.requests, [])
+        self.assertIsNone(meta["etag"])
+        self.assertLessEqual(meta["fresh_until"], time.time() + graph_utils.CACHE_TTL)
+
+    def test_throttled_request_is_retried_after_pause(self):
+        #Arrange
+        limiter = graph_utils.AdaptiveLimiter(rate=1000, concurrency=4)
+        session = FakeSession(FakeResponse(429, headers={"Retry-After": "0"}),
+                              FakeResponse(200, b"<rdf>1</rdf>"))
+
+        #Act
+        with patch.object(graph_utils, "LIMITER", limiter):
+            blob = asyncio.run(graph_utils._fetch_rdf(session, "Skill"))
+
+        #Assert
+        self.assertEqual(blob, b"<rdf>1</rdf>")
+        self.assertEqual(len(session.requests), 2)
+        self.assertEqual(limiter.stats()["throttled"], 1)
+        self.assertLess(limiter.stats()["rate"], 1000)
+
+
+class RecordCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RdfCache(self.tmp.name)
+        patcher = patch.object(graph_utils, "CACHE", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(self.cache.close)
+        self.rec = {"subject": "s", "description": "d"}
+
+    def _seed(self, checked_at):
+        self.cache.set("rdf_v2:Skill", b"<rdf>old</rdf>")
+        self.cache.set("rdf_meta_v1:Skill", {"etag": '"v1"', "last_modified": None, "checked_at": checked_at})
+        self.cache.set(graph_utils._record_key("Skill"), self.rec)
+
+    @patch("logic.graph_utils._extract_off_loop")
+    def test_warm_record_skips_xml(self, mock_extract):
+        #Arrange
+        self._seed(time.time())
+        session = FakeSession()
+
+        #Act
+        with patch("logic.graph_utils.fix_decimal_commas") as mock_fix:
+            rec = asyncio.run(graph_utils._load_record(session, "Skill"))
+
+        #Assert
+        self.assertEqual(rec, self.rec)
+        self.assertEqual(session.requests, [])
+        mock_extract.assert_not_called()
+        mock_fix.assert_not_called()
+
+    @patch("logic.graph_utils._extract_off_loop")
+    def test_record_survives_304(self, mock_extract):
+        #Arrange
+        self._seed(0)
+        session = FakeSession(FakeResponse(304))
+
+        #Act
+        rec = asyncio.run(graph_utils._load_record(session, "Skill"))
+
+        #Assert
+        self.assertEqual(rec, self.rec)
+        self.assertEqual(len(session.requests), 1)
+        mock_extract.assert_not_called()
+
+    @patch("logic.graph_utils._extract_off_loop")
+    def test_new_blob_replaces_record(self, mock_extract):
+        #Arrange
+        self._seed(0)
+        mock_extract.return_value = {"subject": "s", "description": "uus"}
+        session = FakeSession(FakeResponse(200, b"<rdf>new</rdf>"))
+
+        #Act
+        rec = asyncio.run(graph_utils._load_record(session, "Skill"))
+
+        #Assert
+        self.assertEqual(rec["description"], "uus")
+        self.assertEqual(mock_extract.call_args[0][0], b"<rdf>new</rdf>")
+        self.assertEqual(self.cache.get(graph_utils._record_key("Skill")), rec)
+
+    @patch("logic.graph_utils._extract_off_loop")
+    def test_version_bump_reparses_cached_blob(self, mock_extract):
+        #Arrange
+        self._seed(time.time())
+        mock_extract.return_value = {"subject": "s", "description": "v2"}
+        session = FakeSession()
+
+        #Act
+        with patch.object(graph_utils, "EXTRACTOR_VERSION", graph_utils.EXTRACTOR_VERSION + 1):
+            rec = asyncio.run(graph_utils._load_record(session, "Skill"))
+
+        #Assert
+        self.assertEqual(rec["description"], "v2")
+        self.assertEqual(session.requests, [])
+        self.assertEqual(mock_extract.call_args[0][0], b"<rdf>old</rdf>")
+        self.assertEqual(self.cache.get(graph_utils._record_key("Skill")), self.rec)
+
+    def test_revalidate_asks_server_even_when_fresh(self):
+        #Arrange
+        self._seed(time.time())
+        session = FakeSession(FakeResponse(304))
+
+        #Act
+        rec = asyncio.run(graph_utils._load_record(session, "Skill", revalidate=True))
+
+        #Assert
+        self.assertEqual(rec, self.rec)
+        self.assertEqual(session.requests[0][1]["If-None-Match"], '"v1"')
+
+
+class TimeoutResponse(FakeResponse):
+    async def __aenter__(self):
+        raise asyncio.TimeoutError()
+
+
+class NegativeCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RdfCache(self.tmp.name)
+        for patcher in (patch.object(graph_utils, "CACHE", self.cache),
+                        patch.object(graph_utils, "LIMITER", graph_utils.AdaptiveLimiter(rate=1000))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(self.cache.close)
+
+    def test_404_is_not_retried_and_is_remembered(self):
+        #Arrange
+        session = FakeSession(FakeResponse(404))
+
+        #Act
+        with self.assertRaises(graph_utils.FetchError) as first:
+            asyncio.run(graph_utils._load_record(session, "Puuduv"))
+        with self.assertRaises(graph_utils.FetchError) as second:
+            asyncio.run(graph_utils._load_record(session, "Puuduv"))
+
+        #Assert
+        self.assertEqual(len(session.requests), 1)
+        self.assertEqual((first.exception.kind, first.exception.cached), ("404", False))
+        self.assertEqual((second.exception.kind, second.exception.cached), ("404", True))
+
+    def test_revalidate_does_not_bypass_negative_cache(self):
+        #Arrange
+        graph_utils._remember_failure("Puuduv", "404", "HTTP 404")
+        session = FakeSession(FakeResponse(200, b"<rdf/>"))
+
+        #Act
+        with self.assertRaises(graph_utils.FetchError) as ctx:
+            asyncio.run(graph_utils._load_record(session, "Puuduv", revalidate=True))
+
+        #Assert
+        self.assertTrue(ctx.exception.cached)
+        self.assertEqual(session.requests, [])
+
+    @patch("logic.graph_utils._extract_off_loop", side_effect=ValueError("katkine RDF"))
+    def test_parse_failure_is_remembered(self, mock_extract):
+        #Arrange
+        session = FakeSession(FakeResponse(200, b"<rdf"))
+
+        #Act
+        with self.assertRaises(graph_utils.FetchError):
+            asyncio.run(graph_utils._load_record(session, "Katkine"))
+
+        #Assert
+        report = graph_utils.negative_report()
+        self.assertEqual([(e["skill"], e["kind"]) for e in report], [("Katkine", "parse")])
+        self.assertIn("katkine RDF", report[0]["detail"])
+
+    def test_repeated_timeouts_are_remembered(self):
+        #Arrange
+        session = FakeSession(TimeoutResponse(), TimeoutResponse())
+
+        #Act
+        with patch.object(graph_utils, "RETRIES", 2), patch("logic.graph_utils.asyncio.sleep", AsyncMock()):
+            with self.assertRaises(graph_utils.FetchError) as ctx:
+                asyncio.run(graph_utils._fetch_rdf(session, "Aeglane"))
+
+        #Assert
+        self.assertEqual(ctx.exception.kind, "timeout")
+        self.assertEqual(self.cache.get("neg_v1:Aeglane")["kind"], "timeout")
+
+    def test_process_one_skips_known_bad_link(self):
+        #Arrange
+        self.cache.set("neg_v1:Puuduv", {"kind": "404", "detail": "", "at": time.time()})
+        session = FakeSession()
+
+        async def run():
+            q = asyncio.Queue()
+            data = {}
+            await graph_utils._process_one(session, "Puuduv", 1, data, {}, q, set())
+            return data
+
+        #Act
+        data = asyncio.run(run())
+
+        #Assert
+        self.assertEqual(data, {})
+        self.assertEqual(session.requests, [])
+
+
+CATEGORY_PAGE_1 = b"""
+  <html><body>
+      <a href="/a/Skill_One">Skill_One</a>
+      <a href="/a/Kategooria:Haridus">Category</a>
+      <a href="/index.php?title=Kategooria:Haridus:Oskus&amp;pagefrom=Skill+Two#mw-pages">j\xc3\xa4rgmine lehek\xc3\xbclg</a>
+  </body></html>
+  """
+CATEGORY_PAGE_2 = b"""
+  <html><body>
+      <a href="/a/Skill_Two">Skill_Two</a>
+      <a href="/index.php?title=Kategooria:Haridus:Oskus&amp;pageuntil=Skill+Two#mw-pages">eelmine lehek\xc3\xbclg</a>
+  </body></html>
+  """
+
+
+class CategoryPaginationTestCase(unittest.TestCase):
+
+    @patch("logic.graph_utils.requests.get")
+    def test_get_all_data_follows_next_page(self, mock_get):
+        #Arrange
+        mock_get.side_effect = [Mock(content=CATEGORY_PAGE_1), Mock(content=CATEGORY_PAGE_2)]
+
+        #Act
+        result = graph_utils.get_all_data("https://oppekava.edu.ee/a/Kategooria:Haridus:Oskus")
+
+        #Assert
+        self.assertEqual(sorted(result), ["Skill_One", "Skill_Two"])
+        next_url = mock_get.call_args_list[1].args[0]
+        self.assertEqual(next_url, "https://oppekava.edu.ee/index.php?title=Kategooria:Haridus:Oskus&pagefrom=Skill+Two#mw-pages")
+
+    @patch("logic.graph_utils._process_one")
+    def test_crawl_registry_seeds_from_all_pages(self, mock_process_one):
+        #Arrange
+        async def fake_process_one(session, skill_name, depth, data, depths, q, visited, **kwargs):
+            data[skill_name] = {"label": skill_name}
+            depths.setdefault(skill_name, depth)
+
+        mock_process_one.side_effect = fake_process_one
+        session = FakeSession(FakeResponse(200, CATEGORY_PAGE_1), FakeResponse(200, CATEGORY_PAGE_2))
+
+        #Act
+        with patch("logic.graph_utils.aiohttp.ClientSession", return_value=session), \
+                patch.object(graph_utils, "PARSE_EXECUTOR", "inline"):
+            data, depths, members = asyncio.run(graph_utils.crawl_registry_async({"oskus": "https://x/a/Kat"}))
+
+        #Assert
+        self.assertEqual(members, {"oskus": {"Skill_One", "Skill_Two"}})
+        self.assertEqual(set(data), {"Skill_One", "Skill_Two"})
+        self.assertEqual(depths["Skill_Two"], 0)
+
+
 if __name__ == '__main__':
     unittest.main()